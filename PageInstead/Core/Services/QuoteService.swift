@@ -5,6 +5,47 @@ struct QuotesData: Codable {
     let version: Int
     let lastUpdated: String
     let quotes: [BookQuote]
+    let indexes: QuoteIndexes?
+}
+
+/// Lookup indexes precomputed by the exporter (see quotes_export.py)
+struct QuoteIndexes: Codable {
+    /// Active quote IDs in file order (the scheduler's rotation order)
+    let activeIds: [Int]
+    /// Sorted tag vocabulary
+    let tags: [String]
+    let idsByTag: [String: [Int]]
+    let idsByBookId: [String: [Int]]
+    /// Newest dateAdded first, file order among equal dates
+    let recentIds: [Int]
+}
+
+extension QuoteIndexes {
+    /// Build the indexes from the quotes (when the bundle has none)
+    init(quotes: [BookQuote]) {
+        var idsByTag: [String: [Int]] = [:]
+        var idsByBookId: [String: [Int]] = [:]
+        for quote in quotes {
+            for tag in quote.tags {
+                idsByTag[tag, default: []].append(quote.id)
+            }
+            idsByBookId[quote.bookId, default: []].append(quote.id)
+        }
+
+        let recent = quotes.enumerated().sorted { lhs, rhs in
+            lhs.element.dateAdded != rhs.element.dateAdded
+                ? lhs.element.dateAdded > rhs.element.dateAdded
+                : lhs.offset < rhs.offset
+        }
+
+        self.init(
+            activeIds: quotes.filter { $0.isActive }.map { $0.id },
+            tags: idsByTag.keys.sorted(),
+            idsByTag: idsByTag,
+            idsByBookId: idsByBookId,
+            recentIds: recent.map { $0.element.id }
+        )
+    }
 }
 
 /// Service for loading and managing book quotes from JSON
@@ -14,6 +55,8 @@ class QuoteService {
 
     private var allQuotes: [BookQuote] = []
     private var quotesById: [Int: BookQuote] = [:]
+    private var activeQuotes: [BookQuote] = []
+    private var indexes = QuoteIndexes(quotes: [])
 
     private init() {
         loadQuotes()
@@ -46,6 +89,13 @@ class QuoteService {
 
             print("✅ Loaded \(allQuotes.count) quotes (version \(quotesData.version))")
 
+            if let bundled = quotesData.indexes, bundled.activeIds.allSatisfy({ quotesById[$0] != nil }) {
+                useIndexes(bundled)
+            } else {
+                print("⚠️ quotes.json has no usable indexes, building them")
+                useIndexes(QuoteIndexes(quotes: allQuotes))
+            }
+
             // Validate no duplicate IDs
             let uniqueIds = Set(allQuotes.map { $0.id })
             if uniqueIds.count != allQuotes.count {
@@ -65,9 +115,20 @@ class QuoteService {
     private func useFallbackQuotes() {
         self.allQuotes = BookQuote.fallbackQuotes
         self.quotesById = Dictionary(uniqueKeysWithValues: allQuotes.map { ($0.id, $0) })
+        useIndexes(QuoteIndexes(quotes: allQuotes))
         print("✅ Loaded \(allQuotes.count) fallback quotes")
     }
 
+    /// Answer queries from these indexes
+    private func useIndexes(_ indexes: QuoteIndexes) {
+        self.indexes = indexes
+        self.activeQuotes = quotes(withIds: indexes.activeIds)
+    }
+
+    private func quotes(withIds ids: [Int]) -> [BookQuote] {
+        return ids.compactMap { quotesById[$0] }
+    }
+
     // MARK: - Public Methods
 
     /// Get all quotes (including inactive)
@@ -77,7 +138,7 @@ class QuoteService {
 
     /// Get only active quotes (isActive = true)
     func getActiveQuotes() -> [BookQuote] {
-        return allQuotes.filter { $0.isActive }
+        return activeQuotes
     }
 
     /// Get a specific quote by ID
@@ -90,7 +151,6 @@ class QuoteService {
     /// Get a random quote from active quotes
     /// - Returns: A random active quote, or nil if no active quotes available
     func getRandomQuote() -> BookQuote? {
-        let activeQuotes = getActiveQuotes()
         return activeQuotes.randomElement()
     }
 
@@ -98,28 +158,26 @@ class QuoteService {
     /// - Parameter limit: Maximum number of quotes to return
     /// - Returns: Array of quotes sorted by date added (newest first)
     func getRecentQuotes(limit: Int = 10) -> [BookQuote] {
-        let sorted = allQuotes.sorted { $0.dateAdded > $1.dateAdded }
-        return Array(sorted.prefix(limit))
+        return quotes(withIds: Array(indexes.recentIds.prefix(limit)))
     }
 
     /// Get quotes filtered by tag
     /// - Parameter tag: The tag to filter by
     /// - Returns: Array of quotes containing the specified tag
     func getQuotes(byTag tag: String) -> [BookQuote] {
-        return allQuotes.filter { $0.tags.contains(tag) }
+        return quotes(withIds: indexes.idsByTag[tag] ?? [])
     }
 
     /// Get all unique tags across all quotes
     /// - Returns: Sorted array of unique tags
     func getAllTags() -> [String] {
-        let allTags = allQuotes.flatMap { $0.tags }
-        return Array(Set(allTags)).sorted()
+        return indexes.tags
     }
 
     /// Get quotes by book ID (multiple quotes from same book)
     /// - Parameter bookId: The book identifier
     /// - Returns: Array of quotes from the specified book
     func getQuotes(byBookId bookId: String) -> [BookQuote] {
-        return allQuotes.filter { $0.bookId == bookId }
+        return quotes(withIds: indexes.idsByBookId[bookId] ?? [])
     }
 }
@@ -4,8 +4,11 @@ Automatically select top 2 quality-scored quotes per book
 and clean up book titles (remove subtitles)
 """
 import re
-import json
 from datetime import datetime
+from highlight_records import BookRegistry, Highlight
+from diverse_selection import select_diverse_by_book, parse_diverse_arg
+from id_registry import IdRegistry, drop_duplicate_quotes
+from quotes_export import write_quotes_json, parse_merge_arg, parse_format_arg
 
 def clean_book_title(title):
     """Remove subtitle from book title"""
@@ -28,8 +31,11 @@ def clean_book_title(title):
 
     return title.strip()
 
-def parse_curation_file(filepath):
-    """Parse the QUOTES_TO_CURATE.txt file"""
+def parse_curation_file(filepath, per_book=2):
+    """Parse the QUOTES_TO_CURATE.txt file
+
+    Keeps each book's top per_book quotes by score (all when None).
+    """
     print(f"📖 Reading {filepath}...")
 
     with open(filepath, 'r', encoding='utf-8') as f:
@@ -39,6 +45,7 @@ def parse_curation_file(filepath):
     book_sections = content.split('-' * 80)
 
     books_data = []
+    registry = BookRegistry()
 
     for section in book_sections:
         if not section.strip() or 'INSTRUCTIONS:' in section:
@@ -97,78 +104,70 @@ def parse_curation_file(filepath):
                     i += 1
 
                 if quote_text:
-                    quotes.append({
-                        'text': quote_text,
-                        'quality_score': quality_score,
-                        'tags': tags if tags else ['wisdom']
-                    })
+                    quotes.append((quote_text, quality_score, tags if tags else ['wisdom']))
 
             i += 1
 
         if book_title and author and quotes:
             # Sort by quality score (highest first)
-            quotes.sort(key=lambda x: x['quality_score'], reverse=True)
+            quotes.sort(key=lambda x: x[1], reverse=True)
 
             # Take top 2
-            top2 = quotes[:2]
+            book = registry.get(book_title, author, asin)
+            top2 = [Highlight(book, text, score=score, tags=tags) for text, score, tags in quotes[:per_book]]
 
-            books_data.append({
-                'book_title': book_title,
-                'author': author,
-                'asin': asin,
-                'quotes': top2
-            })
+            books_data.append((book, top2))
 
     print(f"✅ Parsed {len(books_data)} books")
-    total_quotes = sum(len(b['quotes']) for b in books_data)
-    print(f"✅ Selected {total_quotes} quotes (top 2 per book)")
+    total_quotes = sum(len(quotes) for _, quotes in books_data)
+    if per_book is None:
+        print(f"✅ Read {total_quotes} candidate quotes")
+    else:
+        print(f"✅ Selected {total_quotes} quotes (top {per_book} per book)")
 
     return books_data
 
-def convert_to_pageinstead(books_data, output_path):
-    """Convert to PageInstead format"""
-    print("\n📤 Converting to PageInstead format...")
-
+def pageinstead_quotes(books_data, registry):
+    """PageInstead quote records for [(book, quotes)], IDs from the registry"""
     page_instead_quotes = []
-    quote_id = 1
 
-    for book in books_data:
-        for quote_data in book['quotes']:
-            # Generate book ID
-            author_slug = book['author'].lower().replace(' ', '_').replace('.', '').replace("'", '')
-            book_id = f"{author_slug}_{hash(book['book_title']) % 10000:04d}"
+    for book, quotes in books_data:
+        for quote in quotes:
+            # Stable book ID
+            book_id = registry.book_id(book.title, book.author)
 
             # Generate cover URL
             cover_url = None
-            if book['asin']:
-                cover_url = f"https://m.media-amazon.com/images/P/{book['asin']}.jpg"
+            if book.asin:
+                cover_url = f"https://m.media-amazon.com/images/P/{book.asin}.jpg"
 
             page_instead_quotes.append({
-                'id': quote_id,
-                'text': quote_data['text'],
-                'author': book['author'],
-                'bookTitle': book['book_title'],
+                'id': registry.quote_id(quote.text, book.title, book.author),
+                'text': quote.text,
+                'author': book.author,
+                'bookTitle': book.title,
                 'bookId': book_id,
-                'asin': book['asin'],
+                'asin': book.asin,
                 'coverImageURL': cover_url,
                 'isActive': True,
-                'tags': quote_data['tags'][:3],
+                'tags': quote.tags[:3],
                 'dateAdded': datetime.now().strftime('%Y-%m-%d')
             })
-            quote_id += 1
 
-    # Create final JSON structure
-    output_data = {
-        'version': 1,
-        'lastUpdated': datetime.now().strftime('%Y-%m-%d'),
-        'quotes': page_instead_quotes
-    }
+    return page_instead_quotes
 
-    # Save to file
-    with open(output_path, 'w', encoding='utf-8') as f:
-        json.dump(output_data, f, indent=2, ensure_ascii=False)
+def convert_to_pageinstead(books_data, output_path, merge=False, format_version=None):
+    """Convert to PageInstead format (merged into an existing file with merge)"""
+    print("\n📤 Converting to PageInstead format...")
+
+    registry = IdRegistry.load()
+    page_instead_quotes = drop_duplicate_quotes(pageinstead_quotes(books_data, registry))
+
+    output_data = write_quotes_json(page_instead_quotes, output_path, merge, format_version)
 
     print(f"✅ Exported {len(page_instead_quotes)} quotes to {output_path}")
+    registry.save()
+    registry.report()
 
     # Statistics
     unique_books = len(set(q['bookTitle'] for q in page_instead_quotes))
@@ -182,23 +181,39 @@ def convert_to_pageinstead(books_data, output_path):
 
     # Show sample cleaned titles
     print(f"\n📚 SAMPLE CLEANED BOOK TITLES:")
-    for book in sorted(books_data, key=lambda x: x['book_title'])[:10]:
-        print(f"  • {book['book_title']}")
+    for book, _ in sorted(books_data, key=lambda x: x[0].title)[:10]:
+        print(f"  • {book.title}")
 
     print(f"\n🎉 Ready to use in PageInstead!")
-    print(f"\nNext: cp {output_path} PageInstead/Resources/quotes.json")
+    if not merge:
+        print(f"\nNext: cp {output_path} PageInstead/Resources/quotes.json")
 
     return output_data
 
 if __name__ == '__main__':
     import sys
 
-    if len(sys.argv) < 2:
+    if len(sys.argv) < 2 or sys.argv[1].startswith('--'):
         input_file = 'QUOTES_TO_CURATE.txt'
     else:
         input_file = sys.argv[1]
 
     output_file = 'kindle_quotes_final.json'
 
-    books_data = parse_curation_file(input_file)
-    convert_to_pageinstead(books_data, output_file)
+    # --merge [QUOTES_JSON]: update the app's quotes.json in place instead
+    merge_path = parse_merge_arg(sys.argv)
+    if merge_path:
+        output_file = merge_path
+
+    # --diverse [BUDGET]: choose across books for tag/author/length coverage
+    budget = parse_diverse_arg(sys.argv)
+    if budget is None:
+        books_data = parse_curation_file(input_file)
+    else:
+        books_data = parse_curation_file(input_file, per_book=None)
+        books_data = select_diverse_by_book(books_data, budget or None)
+        total_quotes = sum(len(quotes) for _, quotes in books_data)
+        print(f"✅ Selected {total_quotes} quotes for coverage of tags, authors and lengths")
+    # --format-version 2: write the normalized, compact format (see quotes_export.py)
+    convert_to_pageinstead(books_data, output_file, merge=merge_path is not None,
+                           format_version=parse_format_arg(sys.argv))
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Batch quote scoring with NumPy
+Extracts every highlight's scoring features into arrays once, then
+evaluates the realness score (curate_real_quotes) and the quote score
+(curate_kindle_quotes) as array operations, so whole libraries can be
+re-scored in milliseconds while tuning weights
+"""
+import sys
+import time
+import numpy as np
+from readwise_ingest import has_title_and_text, iter_rows
+from highlight_records import BookRegistry, Highlight
+from highlight_features import extract_features
+from curate_kindle_quotes import INSPIRATIONAL_WORDS, READING_WORDS
+
+# Weights of RealQuoteCurator._calculate_realness_score
+REALNESS_WEIGHTS = {
+    'base': 100,
+    'complete_sentence': 30,
+    'verb': 15,
+    'article': 10,
+    'pronoun': 12,
+    'conjunction': 10,
+    'note': 50,
+    'too_short': -20,
+    'optimal_length': 25,
+    'good_length': 10,
+    'capital_and_punctuation': 15,
+    'quote_marks': 10,
+}
+
+# Weights of QuoteCurator._calculate_quote_score
+QUOTE_WEIGHTS = {
+    'base': 100,
+    'sweet_spot_length': 30,
+    'good_length': 15,
+    'note': 50,
+    'quote_marks': 10,
+    'inspirational_word': 10,
+    'reading_word': 20,
+    'complete_sentence': 15,
+    'question': -10,
+}
+
+class FeatureArrays:
+    """Scoring features of a batch of highlights, one array per feature
+
+    flags optionally maps attribute names to rules taking a feature
+    record (e.g. a curator's _is_poor_quality); each becomes one more
+    0/1 array, computed in the same pass.
+    """
+
+    def __init__(self, highlights, flags=None):
+        flags = flags or {}
+        columns = {
+            'length': [], 'has_note': [], 'ends_with_punctuation': [], 'starts_upper': [],
+            'verb_count': [], 'article_count': [], 'pronoun_count': [], 'conjunction_count': [],
+            'has_double_quote': [], 'has_single_quote': [], 'has_question': [],
+        }
+        inspirational = []
+        reading = []
+        flag_values = {name: [] for name in flags}
+
+        for h in highlights:
+            text = h.text
+            features = extract_features(text)
+            text_lower = features.lower
+
+            columns['length'].append(len(text))
+            columns['has_note'].append(bool(h.note))
+            columns['ends_with_punctuation'].append(features.ends_with_punctuation)
+            columns['starts_upper'].append(features.starts_upper)
+            columns['verb_count'].append(features.verb_count)
+            columns['article_count'].append(features.article_count)
+            columns['pronoun_count'].append(features.pronoun_count)
+            columns['conjunction_count'].append(features.conjunction_count)
+            columns['has_double_quote'].append('"' in text)
+            columns['has_single_quote'].append("'" in text)
+            columns['has_question'].append('?' in text)
+            inspirational.append([word in text_lower for word in INSPIRATIONAL_WORDS])
+            reading.append([word in text_lower for word in READING_WORDS])
+            for name, rule in flags.items():
+                flag_values[name].append(bool(rule(features)))
+
+        self.size = len(columns['length'])
+        for name, values in list(columns.items()) + list(flag_values.items()):
+            setattr(self, name, np.array(values, dtype=np.int64))
+
+        # Per-keyword hit matrices (highlights x keywords)
+        self.inspirational_hits = np.array(inspirational, dtype=np.int64).reshape(self.size, len(INSPIRATIONAL_WORDS))
+        self.reading_hits = np.array(reading, dtype=np.int64).reshape(self.size, len(READING_WORDS))
+
+def _between(values, low, high):
+    return (values >= low) & (values <= high)
+
+def realness_scores(arrays, weights=REALNESS_WEIGHTS):
+    """Vectorized _calculate_realness_score: one int64 score per highlight"""
+    length = arrays.length
+    complete = arrays.ends_with_punctuation
+
+    score = np.full(arrays.size, weights['base'], dtype=np.int64)
+    score += weights['complete_sentence'] * complete
+    score += weights['verb'] * arrays.verb_count
+    score += weights['article'] * arrays.article_count
+    score += weights['pronoun'] * arrays.pronoun_count
+    score += weights['conjunction'] * arrays.conjunction_count
+    score += weights['note'] * arrays.has_note
+    score += weights['too_short'] * (length < 40)
+    score += np.where(_between(length, 40, 120), weights['optimal_length'],
+                      np.where(_between(length, 121, 180), weights['good_length'], 0))
+    score += weights['capital_and_punctuation'] * (arrays.starts_upper & complete)
+    score += weights['quote_marks'] * (arrays.has_double_quote | arrays.has_single_quote)
+    return score
+
+def quote_scores(arrays, weights=QUOTE_WEIGHTS):
+    """Vectorized _calculate_quote_score: one int64 score per highlight"""
+    length = arrays.length
+
+    score = np.full(arrays.size, weights['base'], dtype=np.int64)
+    score += np.where(_between(length, 80, 150), weights['sweet_spot_length'],
+                      np.where(_between(length, 50, 200), weights['good_length'], 0))
+    score += weights['note'] * arrays.has_note
+    score += weights['quote_marks'] * arrays.has_double_quote
+    score += weights['inspirational_word'] * arrays.inspirational_hits.sum(axis=1)
+    score += weights['reading_word'] * arrays.reading_hits.sum(axis=1)
+    score += weights['complete_sentence'] * (arrays.starts_upper & arrays.ends_with_punctuation)
+    score += weights['question'] * arrays.has_question
+    return score
+
+def check_against_curators(highlights, realness, quote):
+    """Compare batch scores with the per-highlight scorers; returns mismatches"""
+    from curate_real_quotes import RealQuoteCurator
+    from curate_kindle_quotes import QuoteCurator
+
+    real_curator = RealQuoteCurator(None)
+    kindle_curator = QuoteCurator(None)
+
+    mismatches = 0
+    for h, batch_realness, batch_quote in zip(highlights, realness.tolist(), quote.tolist()):
+        features = extract_features(h.text)
+        if real_curator._calculate_realness_score(h, features) != batch_realness:
+            mismatches += 1
+        if kindle_curator._calculate_quote_score(h, features) != batch_quote:
+            mismatches += 1
+    return mismatches
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage: python batch_scoring.py <readwise_csv> [--check]")
+        print("\nScores every highlight with both scorers and reports timings.")
+        print("  --check   Verify batch scores equal the per-highlight scorers")
+        sys.exit(1)
+
+    csv_path = sys.argv[1]
+
+    print("📖 Loading Readwise CSV...")
+    registry = BookRegistry()
+    highlights = [
+        Highlight(registry.get(row.book_title, row.author, row.asin), row.highlight, row.note)
+        for row in iter_rows(csv_path)
+        if has_title_and_text(row)
+    ]
+    print(f"✅ Loaded {len(highlights):,} highlights")
+
+    start = time.perf_counter()
+    arrays = FeatureArrays(highlights)
+    extract_time = time.perf_counter() - start
+    print(f"\n🧮 Extracted features in {extract_time * 1000:.0f} ms")
+
+    start = time.perf_counter()
+    realness = realness_scores(arrays)
+    quote = quote_scores(arrays)
+    score_time = time.perf_counter() - start
+    print(f"⚡ Scored {arrays.size:,} highlights (both scorers) in {score_time * 1000:.1f} ms")
+
+    if arrays.size:
+        print(f"\n📊 Realness score: mean {realness.mean():.1f}, max {realness.max()}")
+        print(f"📊 Quote score: mean {quote.mean():.1f}, max {quote.max()}")
+
+    if '--check' in sys.argv:
+        print("\n🔍 Checking against the per-highlight scorers...")
+        mismatches = check_against_curators(highlights, realness, quote)
+        if mismatches:
+            print(f"❌ {mismatches} scores differ")
+            sys.exit(1)
+        print(f"✅ All {arrays.size * 2:,} scores identical")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Bounded top-k candidate selection
+Keeps only the best k highlights per book while rows stream past,
+instead of collecting every candidate and sorting the full list
+"""
+import heapq
+from itertools import count
+
+# Rank keys for the curators' Highlight candidates; smaller ranks first
+def realness_rank_key(h):
+    """Realness (highest first), then length (shortest first)"""
+    return (-h.realness, h.length)
+
+def length_rank_key(h):
+    """Length (shortest first), then score (highest first)"""
+    return (h.length, -h.score)
+
+def score_rank_key(h):
+    """Score (highest first); ties keep arrival order"""
+    return -h.score
+
+class _Entry:
+    """Heap entry ordered worst-first, so the heap root is evicted first"""
+    __slots__ = ('key', 'seq', 'item')
+
+    def __init__(self, key, seq, item):
+        self.key = key
+        self.seq = seq
+        self.item = item
+
+    def __lt__(self, other):
+        # Larger rank key is worse; on ties the later arrival is worse
+        return (self.key, self.seq) > (other.key, other.seq)
+
+class TopK:
+    """The k smallest items by rank key, ties broken by arrival order
+
+    items() matches sorted(all_items, key=rank_key)[:k] exactly, since
+    Python's sort is stable and earlier arrivals win ties here too.
+    """
+    __slots__ = ('k', 'rank_key', '_heap', '_seq')
+
+    def __init__(self, k, rank_key):
+        self.k = k
+        self.rank_key = rank_key
+        self._heap = []
+        self._seq = count()
+
+    def push(self, item):
+        if self.k <= 0:
+            return
+        entry = _Entry(self.rank_key(item), next(self._seq), item)
+        if len(self._heap) < self.k:
+            heapq.heappush(self._heap, entry)
+        elif self._heap[0] < entry:
+            # New entry beats the current worst
+            heapq.heapreplace(self._heap, entry)
+
+    def items(self):
+        """Best first"""
+        entries = sorted(self._heap, key=lambda e: (e.key, e.seq))
+        return [e.item for e in entries]
+
+    def __len__(self):
+        return len(self._heap)
+
+class BookTopK:
+    """A TopK per book plus the number of highlights seen per book"""
+
+    def __init__(self, k, rank_key):
+        self.k = k
+        self.rank_key = rank_key
+        self.tops = {}
+        self.counts = {}
+
+    def count(self, title):
+        """Record one highlight read for title (whether or not it survives)"""
+        self.counts[title] = self.counts.get(title, 0) + 1
+
+    def push(self, title, item):
+        top = self.tops.get(title)
+        if top is None:
+            top = self.tops[title] = TopK(self.k, self.rank_key)
+        top.push(item)
+
+    def curated(self, min_highlights=0):
+        """Best-first candidates for books with at least min_highlights"""
+        return {
+            title: self.tops[title].items() if title in self.tops else []
+            for title, seen in self.counts.items()
+            if seen >= min_highlights
+        }
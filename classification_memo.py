@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Persistent memo of per-highlight classification results
+The curators' filters and scores are pure functions of a highlight's
+text and note, so each (outcome, score) is stored in a shared SQLite
+file keyed by a hash of curator, rules version, text and note. Reruns
+over a mostly unchanged library look results up instead of
+re-tokenizing; least recently used entries are evicted past a size bound
+"""
+import hashlib
+import sqlite3
+
+MEMO_PATH = '.classification_memo.sqlite'
+
+# Entries kept across all curators before the least recently used go
+MAX_ENTRIES = 500_000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    key BLOB PRIMARY KEY,
+    namespace TEXT NOT NULL,
+    outcome TEXT NOT NULL,
+    score INTEGER,
+    last_used INTEGER NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS results_namespace ON results (namespace);
+CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value INTEGER NOT NULL);
+"""
+
+class ClassificationMemo:
+    """Memoized (outcome, score) results of one curator's rules
+
+    namespace and rules_version select the curator and its rule set;
+    bumping the curator's RULES_VERSION leaves old entries unreachable
+    until they are evicted. The rule set's entries are read into memory
+    up front; new results and hits are written back on close().
+    """
+
+    def __init__(self, namespace, rules_version, path=MEMO_PATH, max_entries=MAX_ENTRIES):
+        self.namespace = f'{namespace}:{rules_version}'
+        self.prefix = (self.namespace + '\x00').encode('utf-8')
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._new = []
+        self._used = set()
+
+        self.db = sqlite3.connect(path)
+        self.db.executescript(SCHEMA)
+        # Each run is one generation; eviction drops the oldest generations
+        row = self.db.execute("SELECT value FROM meta WHERE name = 'generation'").fetchone()
+        self.generation = (row[0] if row else 0) + 1
+        self.db.execute("INSERT OR REPLACE INTO meta VALUES ('generation', ?)", (self.generation,))
+
+        self.results = {
+            key: (outcome, score)
+            for key, outcome, score in self.db.execute(
+                "SELECT key, outcome, score FROM results WHERE namespace = ?", (self.namespace,)
+            )
+        }
+
+    def key(self, text, note):
+        hasher = hashlib.sha1(self.prefix)
+        hasher.update(text.encode('utf-8'))
+        hasher.update(b'\x00')
+        hasher.update((note or '').encode('utf-8'))
+        return hasher.digest()
+
+    def classify(self, h, compute):
+        """compute(h)'s (outcome, score), looked up when already memoized"""
+        key = self.key(h.text, h.note)
+        result = self.results.get(key)
+        if result is not None:
+            self.hits += 1
+            self._used.add(key)
+            return result
+
+        self.misses += 1
+        result = self.results[key] = compute(h)
+        self._new.append((key, self.namespace) + result + (self.generation,))
+        return result
+
+    def close(self):
+        """Store new results, refresh hits and evict past max_entries"""
+        with self.db:
+            self.db.executemany("INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?)", self._new)
+
+            # One set-based update refreshes every hit
+            self.db.execute("CREATE TEMP TABLE used (key BLOB PRIMARY KEY) WITHOUT ROWID")
+            self.db.executemany("INSERT OR IGNORE INTO used VALUES (?)", ((key,) for key in self._used))
+            self.db.execute(
+                "UPDATE results SET last_used = ? WHERE key IN (SELECT key FROM used)",
+                (self.generation,)
+            )
+
+            # Rarely needed, so last_used has no index to maintain on every run
+            count = self.db.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+            if count > self.max_entries:
+                self.db.execute(
+                    "DELETE FROM results WHERE key IN "
+                    "(SELECT key FROM results ORDER BY last_used LIMIT ?)",
+                    (count - self.max_entries,)
+                )
+        self.db.close()
+        self._new = []
+        self._used = set()
+
+    def report(self):
+        total = self.hits + self.misses
+        rate = self.hits / total * 100 if total else 0
+        print(f"💾 Classification memo: {self.hits:,} of {total:,} highlights reused ({rate:.0f}%)")
+
+def parse_memo_arg(argv):
+    """Read --memo [PATH] from argv; returns the memo path or None"""
+    for i, arg in enumerate(argv):
+        if arg == '--memo':
+            if i + 1 < len(argv) and not argv[i + 1].startswith('--'):
+                return argv[i + 1]
+            return MEMO_PATH
+    return None
@@ -5,38 +5,55 @@ Convert final selected Kindle highlights to PageInstead quotes.json format
 import json
 import sys
 from datetime import datetime
+from highlight_records import BookRegistry, Highlight
+from quote_tagging import match_tags
+from id_registry import IdRegistry, drop_duplicate_quotes
+from quotes_export import write_quotes_json
 
-def convert_to_pageinstead(input_json_path, output_json_path):
-    """Convert selected quotes to PageInstead format"""
-
-    print("📖 Loading selected quotes...")
+def load_selected_quotes(input_json_path):
+    """Load selected quotes as Highlight records"""
     with open(input_json_path, 'r', encoding='utf-8') as f:
         selected_quotes = json.load(f)
 
+    registry = BookRegistry()
+    return [
+        Highlight(
+            registry.get(quote.get('book_title', 'Unknown'), quote.get('author', 'Unknown'), quote.get('asin')),
+            quote['highlight']
+        )
+        for quote in selected_quotes
+    ]
+
+def convert_to_pageinstead(input_json_path, output_json_path, merge=False):
+    """Convert selected quotes to PageInstead format (merged into an existing file with merge)"""
+
+    print("📖 Loading selected quotes...")
+    selected_quotes = load_selected_quotes(input_json_path)
+
     print(f"✅ Found {len(selected_quotes)} selected quotes")
 
+    registry = IdRegistry.load()
     page_instead_quotes = []
 
-    for idx, quote in enumerate(selected_quotes, start=1):
-        # Generate book ID
-        author = quote.get('author', 'Unknown')
-        book_title = quote.get('book_title', 'Unknown')
+    for quote in selected_quotes:
+        # Stable book ID
+        author = quote.author
+        book_title = quote.book_title
 
-        author_slug = author.lower().replace(' ', '_').replace('.', '').replace("'", '')
-        book_id = f"{author_slug}_{hash(book_title) % 10000:04d}"
+        book_id = registry.book_id(book_title, author)
 
         # Generate cover URL from ASIN
-        asin = quote.get('asin')
+        asin = quote.asin
         cover_url = None
         if asin:
             cover_url = f"https://m.media-amazon.com/images/P/{asin}.jpg"
 
         # Extract tags
-        tags = extract_tags(quote['highlight'])
+        tags = extract_tags(quote.text)
 
         page_instead_quotes.append({
-            'id': idx,
-            'text': quote['highlight'],
+            'id': registry.quote_id(quote.text, book_title, author),
+            'text': quote.text,
             'author': author,
             'bookTitle': book_title,
             'bookId': book_id,
@@ -47,21 +64,16 @@ def convert_to_pageinstead(input_json_path, output_json_path):
             'dateAdded': datetime.now().strftime('%Y-%m-%d')
         })
 
-    # Create final JSON structure
-    output_data = {
-        'version': 1,
-        'lastUpdated': datetime.now().strftime('%Y-%m-%d'),
-        'quotes': page_instead_quotes
-    }
+    page_instead_quotes = drop_duplicate_quotes(page_instead_quotes)
 
-    # Save to file
-    with open(output_json_path, 'w', encoding='utf-8') as f:
-        json.dump(output_data, f, indent=2, ensure_ascii=False)
+    write_quotes_json(page_instead_quotes, output_json_path, merge)
+    registry.save()
 
     print(f"\n✅ SUCCESS!")
     print(f"📝 Created: {output_json_path}")
     print(f"📊 Total quotes: {len(page_instead_quotes)}")
     print(f"📚 Unique books: {len(set(q['bookTitle'] for q in page_instead_quotes))}")
+    registry.report()
     print(f"\n🎉 Ready to use in PageInstead!")
     print(f"\nNext steps:")
     print(f"1. Copy to: PageInstead/Resources/quotes.json")
@@ -69,25 +81,7 @@ def convert_to_pageinstead(input_json_path, output_json_path):
 
 def extract_tags(text):
     """Extract tags from quote text"""
-    tags = set()
-    text_lower = text.lower()
-
-    tag_keywords = {
-        'reading': ['read', 'reading', 'book', 'books', 'library', 'story', 'page'],
-        'life': ['life', 'living', 'alive', 'exist'],
-        'wisdom': ['wisdom', 'wise', 'knowledge', 'truth', 'understand'],
-        'love': ['love', 'heart', 'soul', 'compassion'],
-        'freedom': ['free', 'freedom', 'liberty', 'independent'],
-        'courage': ['courage', 'brave', 'strength', 'bold'],
-        'learning': ['learn', 'education', 'teach', 'study'],
-        'imagination': ['imagine', 'imagination', 'dream', 'creative'],
-        'happiness': ['happy', 'happiness', 'joy', 'delight'],
-        'inspiration': ['inspire', 'inspiration', 'hope', 'motivate']
-    }
-
-    for tag, keywords in tag_keywords.items():
-        if any(keyword in text_lower for keyword in keywords):
-            tags.add(tag)
+    tags = match_tags(text)
 
     # Default to reading if no tags
     if not tags:
@@ -96,8 +90,9 @@ def extract_tags(text):
     return sorted(list(tags))[:3]  # Max 3 tags
 
 if __name__ == "__main__":
-    if len(sys.argv) != 3:
-        print("Usage: python convert_to_pageinstead.py <input_json> <output_json>")
+    if len(sys.argv) < 3 or sys.argv[1].startswith('--') or sys.argv[2].startswith('--'):
+        print("Usage: python convert_to_pageinstead.py <input_json> <output_json> [--merge]")
+        print("\n  --merge   Update an existing output_json in place (keeps dateAdded, writes a changeset)")
         print("\nExample:")
         print("  python convert_to_pageinstead.py kindle_highlights_final_selection.json quotes.json")
         sys.exit(1)
@@ -105,4 +100,4 @@ if __name__ == "__main__":
     input_path = sys.argv[1]
     output_path = sys.argv[2]
 
-    convert_to_pageinstead(input_path, output_path)
+    convert_to_pageinstead(input_path, output_path, merge='--merge' in sys.argv)
@@ -3,24 +3,61 @@
 Curate Kindle highlights from Readwise CSV export
 Multi-stage filtering to select best 2 quotes per book
 """
-import csv
 import json
-import re
 from collections import defaultdict
 from datetime import datetime
 import sys
+from readwise_ingest import read_header, group_rows, has_title_and_text, parse_workers_arg
+from highlight_records import BookRegistry, Highlight
+from ingest_state import IngestState, parse_incremental_arg
+from highlight_cache import group_rows_cached
+from external_grouping import iter_book_groups, parse_memory_limit_arg
+from candidate_selection import TopK, score_rank_key
+from highlight_features import extract_features
+from quote_tagging import match_tags
+from parallel_curation import curate_books_parallel
+from classification_memo import ClassificationMemo, parse_memo_arg
+from diverse_selection import select_diverse_by_book, parse_diverse_arg
+from id_registry import IdRegistry, drop_duplicate_quotes
+from quotes_export import write_quotes_json, parse_merge_arg
+
+# Bump when filters or scoring change, so stored ingestion state is rebuilt
+# and memoized classifications are recomputed
+RULES_VERSION = 1
+
+# Candidates kept per book, best first
+TOP_K = 10
+
+# Keyword bonuses in _calculate_quote_score (substring matches)
+INSPIRATIONAL_WORDS = [
+    'life', 'love', 'truth', 'beauty', 'wisdom', 'freedom',
+    'happiness', 'meaning', 'purpose', 'soul', 'heart',
+    'believe', 'hope', 'dream', 'courage', 'strength'
+]
+READING_WORDS = ['read', 'book', 'story', 'write', 'word', 'page', 'library']
+
+# Column names seen across Readwise CSV formats, in priority order
+KINDLE_COLUMNS = {
+    'book_title': ['Book Title', 'Title', 'book_title'],
+    'author': ['Author', 'author', 'Book Author'],
+    'highlight': ['Highlight', 'Text', 'highlight', 'text'],
+    'note': ['Note', 'note', 'Notes'],
+    'location': ['Location', 'location'],
+    'asin': ['ASIN', 'asin', 'Book ID', 'Amazon Book ID'],
+}
 
 class QuoteCurator:
     def __init__(self, csv_path):
         self.csv_path = csv_path
         self.books = defaultdict(list)
         self.filtered_quotes = defaultdict(list)
+        self.memo = None
 
-    def load_csv(self, books_only=True, min_highlights=5):
+    def load_csv(self, books_only=True, min_highlights=5, workers=1, cache=False):
         """Load and parse the Readwise CSV"""
         print("📖 Loading Readwise CSV...")
 
-        all_items = defaultdict(list)
+        all_items = {}
         stats = {
             'books': 0,
             'articles': 0,
@@ -29,63 +66,91 @@ class QuoteCurator:
             'total_highlights': 0
         }
 
-        with open(self.csv_path, 'r', encoding='utf-8') as f:
-            reader = csv.DictReader(f)
-            self.headers = reader.fieldnames
-
-            for row in reader:
-                # Extract key fields (handle different CSV formats)
-                book_title = self._get_field(row, ['Book Title', 'Title', 'book_title'])
-                author = self._get_field(row, ['Author', 'author', 'Book Author'])
-                highlight = self._get_field(row, ['Highlight', 'Text', 'highlight', 'text'])
-                note = self._get_field(row, ['Note', 'note', 'Notes'])
-                location = self._get_field(row, ['Location', 'location'])
-                asin = self._get_field(row, ['ASIN', 'asin', 'Book ID', 'Amazon Book ID'])
-
-                if not book_title or not highlight:
-                    continue
-
-                stats['total_highlights'] += 1
-
-                # Detect source type
-                source_type = self._detect_source_type(book_title, author, asin)
-
-                all_items[book_title].append({
-                    'author': author,
-                    'highlight': highlight,
-                    'note': note,
-                    'location': location,
-                    'asin': asin,
-                    'length': len(highlight),
-                    'source_type': source_type
-                })
+        registry = BookRegistry(detect_source_type=self._detect_source_type)
+        self.headers = read_header(self.csv_path)
+
+        if cache:
+            groups = group_rows_cached(self.csv_path, KINDLE_COLUMNS, keep=has_title_and_text, workers=workers)
+        else:
+            groups = group_rows(self.csv_path, KINDLE_COLUMNS, keep=has_title_and_text, workers=workers)
+
+        for title, rows in groups.items():
+            stats['total_highlights'] += len(rows)
+
+            # Source type is detected once per book
+            all_items[title] = [
+                Highlight(registry.get(title, author, asin), highlight, note, location)
+                for _, author, highlight, asin, note, location in rows
+            ]
 
         # Count source types
         for title, highlights in all_items.items():
-            source_type = highlights[0]['source_type']
+            source_type = highlights[0].book.source_type
             stats[source_type] += 1
 
         # Filter to books only if requested
         if books_only:
             print("\n🔍 Filtering to Kindle books only...")
             for title, highlights in all_items.items():
-                source_type = highlights[0]['source_type']
+                source_type = highlights[0].book.source_type
                 if source_type == 'books' and len(highlights) >= min_highlights:
                     self.books[title] = highlights
 
             print(f"\n📊 SOURCE BREAKDOWN:")
-            print(f"  📚 Kindle Books: {stats['books']} ({sum(len(h) for t, h in all_items.items() if h[0]['source_type'] == 'books')} highlights)")
-            print(f"  📰 Articles: {stats['articles']} ({sum(len(h) for t, h in all_items.items() if h[0]['source_type'] == 'articles')} highlights)")
-            print(f"  🐦 Tweets: {stats['tweets']} ({sum(len(h) for t, h in all_items.items() if h[0]['source_type'] == 'tweets')} highlights)")
-            print(f"  ❓ Other: {stats['other']} ({sum(len(h) for t, h in all_items.items() if h[0]['source_type'] == 'other')} highlights)")
+            print(f"  📚 Kindle Books: {stats['books']} ({sum(len(h) for t, h in all_items.items() if h[0].book.source_type == 'books')} highlights)")
+            print(f"  📰 Articles: {stats['articles']} ({sum(len(h) for t, h in all_items.items() if h[0].book.source_type == 'articles')} highlights)")
+            print(f"  🐦 Tweets: {stats['tweets']} ({sum(len(h) for t, h in all_items.items() if h[0].book.source_type == 'tweets')} highlights)")
+            print(f"  ❓ Other: {stats['other']} ({sum(len(h) for t, h in all_items.items() if h[0].book.source_type == 'other')} highlights)")
             print(f"\n✅ Using: {len(self.books)} books with {min_highlights}+ highlights")
         else:
             self.books = all_items
             print(f"✅ Loaded all {len(self.books)} items")
 
+        self.highlight_counts = {title: len(h) for title, h in self.books.items()}
+
         total_kept = sum(len(h) for h in self.books.values())
         print(f"📊 Total highlights to process: {total_kept:,}")
 
+    def stage1_incremental(self, state_path, books_only=True, min_highlights=5, workers=1):
+        """Stages 0-1 for only the highlights added since the last run
+
+        Fills filtered_quotes with the same per-book top 10 as load_csv +
+        stage1_automatic_filter, merged from the ingestion state.
+        """
+        print("📖 Loading new Readwise highlights...")
+
+        state = IngestState.load(state_path, RULES_VERSION)
+        registry = BookRegistry(detect_source_type=self._detect_source_type)
+
+        groups = state.read_new_rows(self.csv_path, KINDLE_COLUMNS, keep=has_title_and_text, workers=workers)
+        print(f"✅ Found {sum(len(rows) for rows in groups.values())} new highlights in {len(groups)} items")
+
+        print("\n🔍 Stage 1: Automatic Filtering")
+        print("-" * 60)
+
+        for title, rows in groups.items():
+            highlights = [
+                Highlight(registry.get(title, author, asin), highlight, note, location)
+                for _, author, highlight, asin, note, location in rows
+            ]
+            candidates = self._select_book(highlights)
+            state.merge_book(title, rows[0], len(rows), candidates, {}, score_rank_key, TOP_K)
+
+        state.save()
+
+        # Source type comes from each book's first highlight, as in load_csv
+        book_filter = None
+        if books_only:
+            book_filter = lambda title, author, asin: self._detect_source_type(title, author, asin) == 'books'
+
+        # As in load_csv, the min-highlights cut only applies to books
+        self.filtered_quotes = state.curated(min_highlights if books_only else 0, registry, book_filter)
+        counts = state.highlight_counts()
+        self.highlight_counts = {title: counts[title] for title in self.filtered_quotes}
+
+        total_filtered = sum(len(h) for h in self.filtered_quotes.values())
+        print(f"✅ Filtered to {total_filtered} candidate quotes from {len(self.filtered_quotes)} books")
+
     def _detect_source_type(self, title, author, asin):
         """Detect if this is a book, article, tweet, etc."""
         title_lower = title.lower() if title else ''
@@ -104,70 +169,165 @@ class QuoteCurator:
 
         return 'other'
 
-    def _get_field(self, row, possible_names):
-        """Get field from row with multiple possible column names"""
-        for name in possible_names:
-            if name in row and row[name]:
-                return row[name].strip()
-        return None
+    def stage1_external(self, memory_limit_mb, books_only=True, min_highlights=5):
+        """Stages 0-1 book by book with spill-to-disk grouping
 
-    def stage1_automatic_filter(self):
-        """Stage 1: Automatic filtering to reduce 40k → ~1000"""
-        print("\n🔍 Stage 1: Automatic Filtering")
-        print("-" * 60)
+        Fills filtered_quotes with the same per-book top 10 as load_csv +
+        stage1_automatic_filter, holding one shard of rows at a time.
+        """
+        print(f"📖 Loading Readwise CSV in shards (memory limit {memory_limit_mb} MB)...")
+
+        registry = BookRegistry(detect_source_type=self._detect_source_type)
+        self.headers = read_header(self.csv_path)
+        self.highlight_counts = {}
+
+        item_counts = {'books': 0, 'articles': 0, 'tweets': 0, 'other': 0}
+        highlight_totals = {'books': 0, 'articles': 0, 'tweets': 0, 'other': 0}
 
-        for book_title, highlights in self.books.items():
-            candidates = []
+        groups = iter_book_groups(self.csv_path, KINDLE_COLUMNS, keep=has_title_and_text,
+                                  memory_limit_mb=memory_limit_mb)
+        for title, rows in groups:
+            # Source type comes from each book's first highlight, as in load_csv
+            _, author, _, asin, _, _ = rows[0]
+            source_type = registry.get(title, author, asin).source_type
+            item_counts[source_type] += 1
+            highlight_totals[source_type] += len(rows)
 
-            for h in highlights:
-                text = h['highlight']
+            if books_only and (source_type != 'books' or len(rows) < min_highlights):
+                continue
 
-                # Length filter (50-200 chars is sweet spot)
-                if len(text) < 40 or len(text) > 500:
-                    continue
+            highlights = [
+                Highlight(registry.get(title, author, asin), highlight, note, location)
+                for _, author, highlight, asin, note, location in rows
+            ]
+            self.highlight_counts[title] = len(rows)
+            self.filtered_quotes[title] = self._select_book(highlights)
 
-                # Remove non-quotes
-                if self._is_likely_not_quote(text):
-                    continue
+        if books_only:
+            print(f"\n📊 SOURCE BREAKDOWN:")
+            print(f"  📚 Kindle Books: {item_counts['books']} ({highlight_totals['books']} highlights)")
+            print(f"  📰 Articles: {item_counts['articles']} ({highlight_totals['articles']} highlights)")
+            print(f"  🐦 Tweets: {item_counts['tweets']} ({highlight_totals['tweets']} highlights)")
+            print(f"  ❓ Other: {item_counts['other']} ({highlight_totals['other']} highlights)")
+            print(f"\n✅ Using: {len(self.filtered_quotes)} books with {min_highlights}+ highlights")
+        else:
+            print(f"✅ Loaded all {len(self.filtered_quotes)} items")
 
-                # Calculate score
-                score = self._calculate_quote_score(h)
-                h['score'] = score
+        print(f"📊 Total highlights processed: {sum(self.highlight_counts.values()):,}")
 
-                candidates.append(h)
+        total_filtered = sum(len(h) for h in self.filtered_quotes.values())
+        print(f"✅ Filtered to {total_filtered} candidate quotes from {len(self.filtered_quotes)} books")
+
+    def stage1_automatic_filter(self, workers=1, dedupe=None):
+        """Stage 1: Automatic filtering to reduce 40k → ~1000
+
+        With workers > 1, books are filtered in a process pool; the
+        result is identical to the serial run. With a dedupe threshold,
+        near-duplicate candidates across the library are collapsed to
+        their best-scoring member before each book's top 10.
+        With a classification memo the run stays in-process, where memo
+        lookups are cheaper than the pool.
+        """
+        print("\n🔍 Stage 1: Automatic Filtering")
+        print("-" * 60)
 
-            # Sort by score and take top 10 per book
-            candidates.sort(key=lambda x: x['score'], reverse=True)
-            self.filtered_quotes[book_title] = candidates[:10]
+        if dedupe is not None:
+            candidates = {
+                book_title: [h for h in highlights if self._evaluate(h)]
+                for book_title, highlights in self.books.items()
+            }
+            from near_duplicates import drop_near_duplicate_candidates
+            candidates, dropped = drop_near_duplicate_candidates(candidates, score_rank_key, dedupe)
+            print(f"❌ Filtered {dropped} near-duplicates")
+
+            for book_title, highlights in candidates.items():
+                top = TopK(TOP_K, score_rank_key)
+                for h in highlights:
+                    top.push(h)
+                self.filtered_quotes[book_title] = top.items()
+        elif workers > 1 and len(self.books) > 1 and self.memo is None:
+            groups = [(title, [(h.text, h.note) for h in highlights]) for title, highlights in self.books.items()]
+            results = curate_books_parallel(_filter_chunk, groups, workers)
+
+            for book_title, highlights in self.books.items():
+                selected = []
+                for index, score in results[book_title]:
+                    h = highlights[index]
+                    h.score = score
+                    selected.append(h)
+                self.filtered_quotes[book_title] = selected
+        else:
+            for book_title, highlights in self.books.items():
+                self.filtered_quotes[book_title] = self._select_book(highlights)
 
         total_filtered = sum(len(h) for h in self.filtered_quotes.values())
         print(f"✅ Filtered to {total_filtered} candidate quotes (~{total_filtered / len(self.books):.1f} per book)")
 
-    def _is_likely_not_quote(self, text):
+    def _select_book(self, highlights):
+        """Filter and score one book's highlights, return its top 10"""
+        top = TopK(TOP_K, score_rank_key)
+
+        for h in highlights:
+            if self._evaluate(h):
+                top.push(h)
+
+        # Only the top 10 per book are ever held, best first
+        return top.items()
+
+    def _evaluate(self, h):
+        """Apply the filters to one highlight and score it; True if kept"""
+        if self.memo is not None:
+            outcome, score = self.memo.classify(h, self._classify)
+        else:
+            outcome, score = self._classify(h)
+
+        if outcome != 'kept':
+            return False
+        h.score = score
+        return True
+
+    def _classify(self, h):
+        """('kept' or 'filtered', quote score)"""
+        text = h.text
+
+        # Length filter (50-200 chars is sweet spot)
+        if len(text) < 40 or len(text) > 500:
+            return 'filtered', None
+
+        # Tokenize once; the filter and the score share the feature record
+        features = extract_features(text)
+
+        # Remove non-quotes
+        if self._is_likely_not_quote(features):
+            return 'filtered', None
+
+        # Calculate score
+        return 'kept', self._calculate_quote_score(h, features)
+
+    def _is_likely_not_quote(self, features):
         """Detect if text is likely not a good quote"""
         # Too many numbers (probably a fact/statistic)
-        if len(re.findall(r'\d+', text)) > 3:
+        if features.number_count > 3:
             return True
 
         # Starts with common non-quote patterns
-        non_quote_starts = [
+        non_quote_starts = (
             'chapter ', 'figure ', 'table ', 'see page',
             'according to', 'in the year', 'references:',
             'http://', 'https://', 'www.'
-        ]
-        text_lower = text.lower()
-        if any(text_lower.startswith(pattern) for pattern in non_quote_starts):
+        )
+        if features.lower.startswith(non_quote_starts):
             return True
 
         # Too many bullet points or lists
-        if text.count('•') > 2 or text.count('\n') > 3:
+        if features.bullet_count > 2 or features.line_breaks > 3:
             return True
 
         return False
 
-    def _calculate_quote_score(self, highlight):
+    def _calculate_quote_score(self, highlight, features):
         """Score a quote based on various factors"""
-        text = highlight['highlight']
+        text = highlight.text
         score = 100  # Base score
 
         # Length scoring (prefer 80-150 chars)
@@ -178,7 +338,7 @@ class QuoteCurator:
             score += 15
 
         # Has user note (indicates importance)
-        if highlight['note']:
+        if highlight.note:
             score += 50
 
         # Quote markers (actual dialogue/quote)
@@ -186,20 +346,14 @@ class QuoteCurator:
             score += 10
 
         # Inspirational/philosophical keywords
-        inspirational_words = [
-            'life', 'love', 'truth', 'beauty', 'wisdom', 'freedom',
-            'happiness', 'meaning', 'purpose', 'soul', 'heart',
-            'believe', 'hope', 'dream', 'courage', 'strength'
-        ]
-        text_lower = text.lower()
-        score += sum(10 for word in inspirational_words if word in text_lower)
+        text_lower = features.lower
+        score += sum(10 for word in INSPIRATIONAL_WORDS if word in text_lower)
 
         # Reading/book related (perfect for PageInstead)
-        reading_words = ['read', 'book', 'story', 'write', 'word', 'page', 'library']
-        score += sum(20 for word in reading_words if word in text_lower)
+        score += sum(20 for word in READING_WORDS if word in text_lower)
 
         # Sentence completeness (starts with capital, ends with punctuation)
-        if text and text[0].isupper() and text[-1] in '.!?"':
+        if features.starts_upper and features.ends_with_punctuation:
             score += 15
 
         # Avoid questions (usually not good standalone quotes)
@@ -224,18 +378,18 @@ class QuoteCurator:
 
             book_entry = {
                 'book_title': book_title,
-                'author': first['author'],
-                'asin': first['asin'],
-                'highlight_count': len(self.books[book_title]),
+                'author': first.author,
+                'asin': first.asin,
+                'highlight_count': self.highlight_counts[book_title],
                 'candidates': []
             }
 
             for h in highlights[:10]:  # Max 10 candidates per book
                 book_entry['candidates'].append({
-                    'text': h['highlight'],
-                    'score': h['score'],
-                    'length': h['length'],
-                    'note': h['note'],
+                    'text': h.text,
+                    'score': h.score,
+                    'length': h.length,
+                    'note': h.note,
                     'selected': False  # User will mark true for final 2
                 })
 
@@ -260,87 +414,68 @@ class QuoteCurator:
                 continue
 
             # Take top 2 by score
-            top2 = highlights[:2]
-
-            for h in top2:
-                final_quotes.append({
-                    'book_title': book_title,
-                    'author': h['author'],
-                    'highlight': h['highlight'],
-                    'asin': h['asin'],
-                    'score': h['score']
-                })
+            final_quotes.extend(highlights[:2])
 
         print(f"✅ Selected {len(final_quotes)} final quotes (2 per book)")
         return final_quotes
 
-    def export_to_pageinstead_format(self, quotes, output_path):
-        """Convert to PageInstead quotes.json format"""
+    def stage3_diverse_select(self, budget=None):
+        """Stage 3 alternative: pick across all books for tag, author and length coverage"""
+        print("\n🎯 Stage 3: Diversity-aware selection across books")
+        print("-" * 60)
+
+        books = [(title, highlights) for title, highlights in sorted(self.filtered_quotes.items()) if highlights]
+        selected = select_diverse_by_book(books, budget, tags_of=lambda h: self._extract_tags(h.text))
+        final_quotes = [h for _, highlights in selected for h in highlights]
+
+        print(f"✅ Selected {len(final_quotes)} final quotes from {len(selected)} books (max 2 per book)")
+        return final_quotes
+
+    def export_to_pageinstead_format(self, quotes, output_path, merge=False):
+        """Convert to PageInstead quotes.json format (merged into an existing file with merge)"""
         print("\n📤 Exporting to PageInstead Format")
         print("-" * 60)
 
+        registry = IdRegistry.load()
         page_instead_quotes = []
 
-        for idx, q in enumerate(quotes, start=1):
-            # Generate book ID
-            author_slug = q['author'].lower().replace(' ', '_').replace('.', '') if q['author'] else 'unknown'
-            book_id = f"{author_slug}_{hash(q['book_title']) % 10000:04d}"
+        for q in quotes:
+            # Stable book ID
+            book_id = registry.book_id(q.book_title, q.author or 'Unknown')
 
             # Generate cover URL
             cover_url = None
-            if q['asin']:
-                cover_url = f"https://m.media-amazon.com/images/P/{q['asin']}.jpg"
+            if q.asin:
+                cover_url = f"https://m.media-amazon.com/images/P/{q.asin}.jpg"
 
             # Extract tags
-            tags = self._extract_tags(q['highlight'])
+            tags = self._extract_tags(q.text)
 
             page_instead_quotes.append({
-                'id': idx,
-                'text': q['highlight'],
-                'author': q['author'] or 'Unknown',
-                'bookTitle': q['book_title'],
+                'id': registry.quote_id(q.text, q.book_title, q.author or 'Unknown'),
+                'text': q.text,
+                'author': q.author or 'Unknown',
+                'bookTitle': q.book_title,
                 'bookId': book_id,
-                'asin': q['asin'],
+                'asin': q.asin,
                 'coverImageURL': cover_url,
                 'isActive': True,
                 'tags': tags,
                 'dateAdded': datetime.now().strftime('%Y-%m-%d')
             })
 
-        # Create final JSON structure
-        output_data = {
-            'version': 1,
-            'lastUpdated': datetime.now().strftime('%Y-%m-%d'),
-            'quotes': page_instead_quotes
-        }
+        page_instead_quotes = drop_duplicate_quotes(page_instead_quotes)
 
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(output_data, f, indent=2, ensure_ascii=False)
+        write_quotes_json(page_instead_quotes, output_path, merge)
 
         print(f"✅ Exported {len(page_instead_quotes)} quotes to {output_path}")
+        registry.save()
+        registry.report()
         print(f"📝 Ready to use in PageInstead!")
 
     def _extract_tags(self, text):
         """Extract tags from quote text"""
-        tags = set()
-        text_lower = text.lower()
-
-        tag_keywords = {
-            'reading': ['read', 'reading', 'book', 'books'],
-            'life': ['life', 'living', 'alive'],
-            'wisdom': ['wisdom', 'wise', 'knowledge', 'truth'],
-            'love': ['love', 'heart', 'soul'],
-            'freedom': ['free', 'freedom', 'liberty'],
-            'courage': ['courage', 'brave', 'strength'],
-            'learning': ['learn', 'education', 'teach'],
-            'imagination': ['imagine', 'imagination', 'dream'],
-            'happiness': ['happy', 'happiness', 'joy'],
-            'inspiration': ['inspire', 'inspiration', 'hope']
-        }
-
-        for tag, keywords in tag_keywords.items():
-            if any(keyword in text_lower for keyword in keywords):
-                tags.add(tag)
+        tags = match_tags(text)
 
         # Default to reading if no tags
         if not tags:
@@ -348,6 +483,20 @@ class QuoteCurator:
 
         return sorted(list(tags))[:3]  # Max 3 tags
 
+def _filter_chunk(chunk):
+    """Worker: stage 1 for each (title, [(text, note)]) group
+
+    Returns title -> [(index, score)] of the top 10, index being the
+    highlight's position in its book.
+    """
+    curator = QuoteCurator(None)
+    results = {}
+    for title, items in chunk:
+        highlights = [Highlight(None, text, note) for text, note in items]
+        positions = {id(h): i for i, h in enumerate(highlights)}
+        results[title] = [(positions[id(h)], h.score) for h in curator._select_book(highlights)]
+    return results
+
 def main():
     if len(sys.argv) < 2:
         print("Usage: python curate_kindle_quotes.py <readwise_csv> [options]")
@@ -356,6 +505,14 @@ def main():
         print("  --review            Export for manual review (default)")
         print("  --all-sources       Include articles/tweets (not just books)")
         print("  --min-highlights N  Minimum highlights per book (default: 5)")
+        print("  --workers N         Parse the CSV with N processes (0 = all cores)")
+        print("  --incremental [F]   Only process highlights added since the last run")
+        print("  --cache             Reuse parsed highlights cached from an earlier run")
+        print("  --memory-limit MB   Group books via temporary shard files to cap memory")
+        print("  --dedupe [T]        Drop near-duplicate highlights (overlap >= T, default 0.7)")
+        print("  --memo [PATH]       Reuse classifications memoized by earlier runs (SQLite)")
+        print("  --diverse [N]       With --auto, pick N quotes across books for tag/author/length coverage")
+        print("  --merge [JSON]      With --auto, update quotes.json in place (keeps dateAdded, writes a changeset)")
         print("\nExamples:")
         print("  python curate_kindle_quotes.py readwise.csv")
         print("  python curate_kindle_quotes.py readwise.csv --auto")
@@ -376,18 +533,54 @@ def main():
                 print("Error: --min-highlights must be followed by a number")
                 sys.exit(1)
 
+    workers = parse_workers_arg(sys.argv)
+
+    state_path = parse_incremental_arg(sys.argv, 'curation_state_kindle.json')
+    memory_limit_mb = parse_memory_limit_arg(sys.argv)
+    dedupe = None
+    if '--dedupe' in sys.argv:
+        # near_duplicates needs NumPy; only load it when deduping
+        from near_duplicates import parse_dedupe_arg
+        dedupe = parse_dedupe_arg(sys.argv)
+    if dedupe is not None and (state_path or memory_limit_mb):
+        print("⚠️  --dedupe needs the full library in memory; ignored with --incremental/--memory-limit")
+
     curator = QuoteCurator(csv_path)
-    curator.load_csv(books_only=not all_sources, min_highlights=min_highlights)
-    curator.stage1_automatic_filter()
+    memo_path = parse_memo_arg(sys.argv)
+    if memo_path:
+        curator.memo = ClassificationMemo('kindle', RULES_VERSION, memo_path)
+    if state_path:
+        curator.stage1_incremental(state_path, books_only=not all_sources,
+                                   min_highlights=min_highlights, workers=workers)
+    elif memory_limit_mb:
+        curator.stage1_external(memory_limit_mb, books_only=not all_sources,
+                                min_highlights=min_highlights)
+    else:
+        curator.load_csv(books_only=not all_sources, min_highlights=min_highlights,
+                         workers=workers, cache='--cache' in sys.argv)
+        curator.stage1_automatic_filter(workers=workers, dedupe=dedupe)
 
+    if curator.memo is not None:
+        curator.memo.report()
+        curator.memo.close()
+
+    diverse_budget = parse_diverse_arg(sys.argv)
     if auto_mode:
-        # Quick mode: auto-select top 2
-        final_quotes = curator.stage3_auto_select_top2()
-        curator.export_to_pageinstead_format(
-            final_quotes,
-            'kindle_highlights_curated.json'
-        )
-        print("\n✅ Complete! Import 'kindle_highlights_curated.json' into PageInstead")
+        # Quick mode: auto-select top 2 (or a diverse set across books)
+        if diverse_budget is not None:
+            final_quotes = curator.stage3_diverse_select(diverse_budget or None)
+        else:
+            final_quotes = curator.stage3_auto_select_top2()
+        merge_path = parse_merge_arg(sys.argv)
+        if merge_path:
+            curator.export_to_pageinstead_format(final_quotes, merge_path, merge=True)
+            print(f"\n✅ Complete! Updated '{merge_path}'")
+        else:
+            curator.export_to_pageinstead_format(
+                final_quotes,
+                'kindle_highlights_curated.json'
+            )
+            print("\n✅ Complete! Import 'kindle_highlights_curated.json' into PageInstead")
     else:
         # Review mode: export candidates for manual selection
         curator.stage2_export_for_review('kindle_highlights_review.json')
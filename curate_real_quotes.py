@@ -3,238 +3,406 @@
 Curate REAL quotes - filter out chapter headings and section titles
 Prefer short, meaningful quotes with complete thoughts
 """
-import csv
 import sys
 import re
 from collections import defaultdict
+from readwise_ingest import group_rows, is_kindle_book_row, iter_rows, parse_workers_arg
+from highlight_records import BookRegistry, Highlight
+from ingest_state import IngestState, parse_incremental_arg
+from highlight_cache import group_rows_cached
+from external_grouping import iter_book_groups, parse_memory_limit_arg
+from candidate_selection import BookTopK, TopK, realness_rank_key
+from highlight_features import extract_features
+from quote_tagging import format_tag_options, match_tags
+from parallel_curation import curate_books_parallel
+from classification_memo import ClassificationMemo, parse_memo_arg
+
+# Bump when filters or scoring change, so stored ingestion state is rebuilt
+# and memoized classifications are recomputed
+RULES_VERSION = 1
+
+# Candidates kept per book, best first
+TOP_K = 6
+
+# Kept highlights a learned ranker scores together while streaming
+RANKER_BATCH = 8192
+
+# Heading patterns that need a digit to match
+HEADING_NUMBER_PATTERN = re.compile(r'\b(chapter|part|section|phase|step)\s+\d+')
+NUMBERED_HEADING_PATTERN = re.compile(r'^\d+[\.:]\s+[A-Z]')
 
 class RealQuoteCurator:
     def __init__(self, csv_path):
         self.csv_path = csv_path
         self.books = defaultdict(list)
+        self.memo = None
+        self.ranker = None
 
-    def load_csv(self, min_highlights=5):
+    def load_csv(self, min_highlights=5, workers=1, cache=False):
         """Load and parse the Readwise CSV, books only"""
         print("📖 Loading Readwise CSV...")
 
-        all_items = defaultdict(list)
+        registry = BookRegistry()
 
-        with open(self.csv_path, 'r', encoding='utf-8') as f:
-            reader = csv.DictReader(f)
+        # Books only (has ASIN)
+        if cache:
+            groups = group_rows_cached(self.csv_path, keep=is_kindle_book_row, workers=workers)
+        else:
+            groups = group_rows(self.csv_path, keep=is_kindle_book_row, workers=workers)
 
-            for row in reader:
-                book_title = self._get_field(row, ['Book Title', 'Title'])
-                author = self._get_field(row, ['Book Author', 'Author'])
-                highlight = self._get_field(row, ['Highlight', 'Text'])
-                asin = self._get_field(row, ['Amazon Book ID', 'ASIN'])
-                note = self._get_field(row, ['Note'])
-
-                if not book_title or not highlight:
-                    continue
+        # Filter to books with enough highlights
+        for title, rows in groups.items():
+            if len(rows) >= min_highlights:
+                self.books[title] = [
+                    Highlight(registry.get(title, author, asin), highlight, note)
+                    for _, author, highlight, asin, note, _ in rows
+                ]
 
-                # Books only (has ASIN)
-                if not asin or len(asin) != 10:
-                    continue
+        print(f"✅ Loaded {len(self.books)} books with {min_highlights}+ highlights")
 
-                all_items[book_title].append({
-                    'author': author,
-                    'highlight': highlight,
-                    'asin': asin,
-                    'note': note,
-                    'length': len(highlight),
-                })
+    def load_incremental(self, state_path, min_highlights=5, workers=1):
+        """Filter and score only highlights added since the last run
 
-        # Filter to books with enough highlights
-        for title, highlights in all_items.items():
-            if len(highlights) >= min_highlights:
-                self.books[title] = highlights
+        Returns the same per-book top 6 as load_csv + select_real_quotes,
+        merged from the candidates stored in the ingestion state.
+        """
+        print("📖 Loading new Readwise highlights...")
 
-        print(f"✅ Loaded {len(self.books)} books with {min_highlights}+ highlights")
+        state = IngestState.load(state_path, self.rules_version())
+        registry = BookRegistry()
 
-    def _get_field(self, row, possible_names):
-        """Get field from row with multiple possible column names"""
-        for name in possible_names:
-            if name in row and row[name]:
-                return row[name].strip()
-        return None
+        groups = state.read_new_rows(self.csv_path, keep=is_kindle_book_row, workers=workers)
+        print(f"✅ Found {sum(len(rows) for rows in groups.values())} new highlights in {len(groups)} books")
 
-    def select_real_quotes(self):
-        """Select real quotes - filter out chapter headings"""
         print("\n🔍 Analyzing quotes for quality...")
+        for title, rows in groups.items():
+            highlights = [
+                Highlight(registry.get(title, author, asin), highlight, note)
+                for _, author, highlight, asin, note, _ in rows
+            ]
+            stats = self._new_stats()
+            candidates = self._select_book(highlights, stats)
+            state.merge_book(title, rows[0], len(rows), candidates, stats, realness_rank_key, TOP_K)
+
+        state.save()
+
+        curated = state.curated(min_highlights, registry)
+        self._print_selection(curated, state.total_stats(min_highlights))
+        return curated
+
+    def select_external(self, memory_limit_mb, min_highlights=5):
+        """Load and select book by book with spill-to-disk grouping
+
+        Same result as load_csv + select_real_quotes, but only one shard
+        of rows plus the selected top 6 per book are held in memory.
+        """
+        print(f"📖 Loading Readwise CSV in shards (memory limit {memory_limit_mb} MB)...")
 
+        registry = BookRegistry()
         curated = {}
-        stats = {
-            'total_highlights': 0,
-            'filtered_chapter_headings': 0,
-            'filtered_too_short': 0,
-            'filtered_too_long': 0,
-            'filtered_poor_quality': 0,
-            'kept': 0
-        }
+        stats = self._new_stats()
 
-        for book_title, highlights in self.books.items():
-            candidates = []
+        groups = iter_book_groups(self.csv_path, keep=is_kindle_book_row, memory_limit_mb=memory_limit_mb)
+        for title, rows in groups:
+            if len(rows) < min_highlights:
+                continue
+            highlights = [
+                Highlight(registry.get(title, author, asin), highlight, note)
+                for _, author, highlight, asin, note, _ in rows
+            ]
+            curated[title] = self._select_book(highlights, stats)
 
-            for h in highlights:
-                text = h['highlight']
-                stats['total_highlights'] += 1
+        print(f"✅ Loaded {len(curated)} books with {min_highlights}+ highlights")
 
-                # Length filters
-                if len(text) < 25:  # Too short
-                    stats['filtered_too_short'] += 1
-                    continue
-                if len(text) > 250:  # Too long for shield
-                    stats['filtered_too_long'] += 1
-                    continue
+        print("\n🔍 Analyzing quotes for quality...")
+        self._print_selection(curated, stats)
+        return curated
 
-                # Detect chapter headings/section titles
-                if self._is_chapter_heading(text):
-                    stats['filtered_chapter_headings'] += 1
-                    continue
+    def select_streaming(self, min_highlights=5):
+        """Load, filter, score and select in one pass over the CSV
 
-                # Quality check
-                if self._is_poor_quality(text):
-                    stats['filtered_poor_quality'] += 1
-                    continue
+        Same result as load_csv + select_real_quotes, but only a bounded
+        top 6 per book is kept while rows are read.
+        """
+        print("📖 Loading Readwise CSV...")
 
-                # Calculate "realness" score
-                realness_score = self._calculate_realness_score(h)
-                h['realness'] = realness_score
-                h['score'] = realness_score
+        registry = BookRegistry()
+        tops = BookTopK(TOP_K, realness_rank_key)
+        book_stats = {}
+        pending = []
+
+        for row in iter_rows(self.csv_path):
+            if not is_kindle_book_row(row):
+                continue
+            title = row.book_title
+            stats = book_stats.get(title)
+            if stats is None:
+                stats = book_stats[title] = self._new_stats()
+
+            tops.count(title)
+            h = Highlight(registry.get(title, row.author, row.asin), row.highlight, row.note)
+            if not self._evaluate(h, stats):
+                continue
+            if self.ranker is None:
+                tops.push(title, h)
+            else:
+                # Scored in batches; each book's pushes keep their order
+                pending.append((title, h))
+                if len(pending) >= RANKER_BATCH:
+                    self._push_ranked(tops, pending)
+        if pending:
+            self._push_ranked(tops, pending)
+
+        curated = tops.curated(min_highlights)
+        print(f"✅ Loaded {len(curated)} books with {min_highlights}+ highlights")
 
-                candidates.append(h)
-                stats['kept'] += 1
+        print("\n🔍 Analyzing quotes for quality...")
 
-            # Sort by realness (highest first), then length (shortest first)
-            candidates.sort(key=lambda x: (-x['realness'], x['length']))
+        stats = self._new_stats()
+        for title in curated:
+            for key, value in book_stats[title].items():
+                stats[key] += value
 
-            # Take top 6
-            curated[book_title] = candidates[:6]
+        self._print_selection(curated, stats)
+        return curated
+
+    def select_real_quotes(self, workers=1, dedupe=None):
+        """Select real quotes - filter out chapter headings
+
+        With workers > 1, books are curated (and their tags suggested) in
+        a process pool; the result is identical to the serial run. With a
+        dedupe threshold, near-duplicate candidates across the library are
+        collapsed to their best-ranked member before each book's top 6.
+        With a classification memo the run stays in-process, where memo
+        lookups are cheaper than the pool; so does a learned ranker, which
+        scores the whole library's candidates in one batch.
+        """
+        print("\n🔍 Analyzing quotes for quality...")
+
+        curated = {}
+        stats = self._new_stats()
+
+        if workers > 1 and len(self.books) > 1 and dedupe is None and self.memo is None and self.ranker is None:
+            groups = [(title, [(h.text, h.note) for h in highlights]) for title, highlights in self.books.items()]
+            results = curate_books_parallel(_curate_chunk, groups, workers)
+
+            for book_title, highlights in self.books.items():
+                picks, book_stats = results[book_title]
+                selected = []
+                for index, realness, tags in picks:
+                    h = highlights[index]
+                    h.realness = h.score = realness
+                    h.tags = tags
+                    selected.append(h)
+                curated[book_title] = selected
+                for key, value in book_stats.items():
+                    stats[key] += value
+        else:
+            candidates = {
+                book_title: [h for h in highlights if self._evaluate(h, stats)]
+                for book_title, highlights in self.books.items()
+            }
+            self._rank_learned([h for highlights in candidates.values() for h in highlights])
+
+            if dedupe is not None:
+                from near_duplicates import drop_near_duplicate_candidates
+                candidates, dropped = drop_near_duplicate_candidates(candidates, realness_rank_key, dedupe)
+                stats['filtered_near_duplicates'] = dropped
+                stats['kept'] -= dropped
+
+            for book_title, highlights in candidates.items():
+                top = TopK(TOP_K, realness_rank_key)
+                for h in highlights:
+                    top.push(h)
+                curated[book_title] = top.items()
+
+        self._print_selection(curated, stats)
+        return curated
+
+    def rules_version(self):
+        """RULES_VERSION, tied to the learned ranker's weights when one is used"""
+        if self.ranker is None:
+            return RULES_VERSION
+        return f'{RULES_VERSION}+{self.ranker.digest}'
+
+    def _new_stats(self):
+        return {
+            'total_highlights': 0,
+            'filtered_chapter_headings': 0,
+            'filtered_too_short': 0,
+            'filtered_too_long': 0,
+            'filtered_poor_quality': 0,
+            'kept': 0
+        }
 
+    def _select_book(self, highlights, stats):
+        """Filter and score one book's highlights, return its top 6"""
+        kept = [h for h in highlights if self._evaluate(h, stats)]
+        self._rank_learned(kept)
+        top = TopK(TOP_K, realness_rank_key)
+        for h in kept:
+            top.push(h)
+        return top.items()
+
+    def _rank_learned(self, highlights):
+        """Replace kept highlights' scores with the learned ranker's, in one batch"""
+        if self.ranker is None or not highlights:
+            return
+        scores = self.ranker.score_texts([h.text for h in highlights], [h.note for h in highlights])
+        for h, score in zip(highlights, scores.tolist()):
+            h.realness = score
+            h.score = score
+
+    def _push_ranked(self, tops, pending):
+        """Rank pending (title, highlight) pairs together, then push them in order"""
+        self._rank_learned([h for _, h in pending])
+        for title, h in pending:
+            tops.push(title, h)
+        pending.clear()
+
+    def _evaluate(self, h, stats):
+        """Apply the filters to one highlight and score it; True if kept"""
+        stats['total_highlights'] += 1
+        if self.memo is not None:
+            outcome, realness_score = self.memo.classify(h, self._classify)
+        else:
+            outcome, realness_score = self._classify(h)
+
+        stats[outcome] += 1
+        if outcome != 'kept':
+            return False
+
+        h.realness = realness_score
+        h.score = realness_score
+        return True
+
+    def _classify(self, h):
+        """(stats key of the filter that rejects h or 'kept', realness score)"""
+        text = h.text
+
+        # Length filters
+        if len(text) < 25:  # Too short
+            return 'filtered_too_short', None
+        if len(text) > 250:  # Too long for shield
+            return 'filtered_too_long', None
+
+        # Tokenize once; every rule below reads the same feature record
+        features = extract_features(text)
+
+        # Detect chapter headings/section titles
+        if self._is_chapter_heading(features):
+            return 'filtered_chapter_headings', None
+
+        # Quality check
+        if self._is_poor_quality(features):
+            return 'filtered_poor_quality', None
+
+        # Calculate "realness" score; a learned ranker scores kept
+        # highlights afterwards, in batches (see _rank_learned)
+        if self.ranker is not None:
+            return 'kept', None
+        return 'kept', self._calculate_realness_score(h, features)
+
+    def _print_selection(self, curated, stats):
         print(f"\n📊 FILTERING STATS:")
-        print(f"  Total highlights processed: {stats['total_highlights']}")
-        print(f"  ❌ Filtered chapter headings: {stats['filtered_chapter_headings']}")
-        print(f"  ❌ Filtered too short: {stats['filtered_too_short']}")
-        print(f"  ❌ Filtered too long: {stats['filtered_too_long']}")
-        print(f"  ❌ Filtered poor quality: {stats['filtered_poor_quality']}")
-        print(f"  ✅ Kept high-quality quotes: {stats['kept']}")
+        print(f"  Total highlights processed: {stats.get('total_highlights', 0)}")
+        print(f"  ❌ Filtered chapter headings: {stats.get('filtered_chapter_headings', 0)}")
+        print(f"  ❌ Filtered too short: {stats.get('filtered_too_short', 0)}")
+        print(f"  ❌ Filtered too long: {stats.get('filtered_too_long', 0)}")
+        print(f"  ❌ Filtered poor quality: {stats.get('filtered_poor_quality', 0)}")
+        if 'filtered_near_duplicates' in stats:
+            print(f"  ❌ Filtered near-duplicates: {stats['filtered_near_duplicates']}")
+        print(f"  ✅ Kept high-quality quotes: {stats.get('kept', 0)}")
 
         total = sum(len(quotes) for quotes in curated.values())
         avg_per_book = total / len(curated) if curated else 0
         print(f"\n✅ Selected {total} quotes (~{avg_per_book:.1f} per book)")
 
-        return curated
-
-    def _is_chapter_heading(self, text):
+    def _is_chapter_heading(self, features):
         """Detect if text is a chapter heading or section title"""
-        text_stripped = text.strip()
-        text_lower = text_stripped.lower()
+        text_stripped = features.stripped
+        text_lower = features.stripped_lower
 
         # Pattern 1: Starts with chapter/part/section keywords
-        heading_keywords = [
+        heading_keywords = (
             'chapter ', 'part ', 'section ', 'phase ', 'step ',
             'lesson ', 'appendix', 'introduction', 'conclusion',
             'preface', 'foreword', 'prologue', 'epilogue'
-        ]
-        if any(text_lower.startswith(kw) for kw in heading_keywords):
+        )
+        if text_lower.startswith(heading_keywords):
             return True
 
         # Pattern 2: Contains chapter/part mid-text with numbers
-        if re.search(r'\b(chapter|part|section|phase|step)\s+\d+', text_lower):
+        if features.digit_count and HEADING_NUMBER_PATTERN.search(text_lower):
             return True
 
         # Pattern 3: Starts with just a number and colon/period
-        if re.match(r'^\d+[\.:]\s+[A-Z]', text_stripped):
+        if features.digit_count and NUMBERED_HEADING_PATTERN.match(text_stripped):
             return True
 
         # Pattern 4: All caps or mostly caps (likely heading)
         if len(text_stripped) < 100:  # Only check short text
-            uppercase_count = sum(1 for c in text_stripped if c.isupper())
-            letter_count = sum(1 for c in text_stripped if c.isalpha())
-            if letter_count > 0 and uppercase_count / letter_count > 0.7:
+            if features.uppercase_ratio > 0.7:
                 return True
 
         # Pattern 5: Title Case with no ending punctuation (likely heading)
-        words = text_stripped.split()
-        if len(words) <= 8 and not text_stripped[-1] in '.!?"':
+        if features.word_count <= 8 and not text_stripped[-1] in '.!?"':
+            words = text_stripped.split()
             # Check if Title Case (most words start with capital)
             capitalized = sum(1 for w in words if w and w[0].isupper())
             if capitalized >= len(words) * 0.7:
                 return True
 
         # Pattern 6: Very short with no verbs (likely heading)
-        if len(text_stripped) < 60:
-            # Common verbs
-            common_verbs = ['is', 'are', 'was', 'were', 'be', 'been', 'being',
-                           'have', 'has', 'had', 'do', 'does', 'did',
-                           'will', 'would', 'should', 'could', 'can', 'may',
-                           'get', 'make', 'take', 'think', 'know', 'see',
-                           'come', 'go', 'say', 'find', 'give', 'tell', 'feel']
-            has_verb = any(verb in text_lower.split() for verb in common_verbs)
-            if not has_verb:
-                return True
+        if len(text_stripped) < 60 and not features.has_heading_verb:
+            return True
 
         return False
 
-    def _is_poor_quality(self, text):
+    def _is_poor_quality(self, features):
         """Filter out poor quality quotes"""
         # Too many numbers (likely statistics/references)
-        digit_count = sum(1 for c in text if c.isdigit())
-        if digit_count > 10:
+        if features.digit_count > 10:
             return True
 
         # Starts with URLs or references
-        bad_starts = ['http', 'www.', 'see page', 'figure ', 'table ']
-        if any(text.lower().startswith(s) for s in bad_starts):
+        bad_starts = ('http', 'www.', 'see page', 'figure ', 'table ')
+        if features.lower.startswith(bad_starts):
             return True
 
         # Too many line breaks (likely list/formatting)
-        if text.count('\n') > 3:
+        if features.line_breaks > 3:
             return True
 
         # Too many bullet points or dashes
-        if text.count('•') > 2 or text.count('\n-') > 2:
+        if features.bullet_count > 2 or features.dash_lines > 2:
             return True
 
         return False
 
-    def _calculate_realness_score(self, highlight):
+    def _calculate_realness_score(self, highlight, features):
         """Score how 'real' a quote is (higher = better actual quote)"""
         score = 100
-        text = highlight['highlight']
-        text_lower = text.lower()
+        text = highlight.text
 
         # Bonus for complete sentences (ends with punctuation)
-        if text and text[-1] in '.!?"':
+        if features.ends_with_punctuation:
             score += 30
 
         # Bonus for having verbs (indicates complete thought)
-        common_verbs = ['is', 'are', 'was', 'were', 'be', 'been',
-                       'have', 'has', 'had', 'do', 'does', 'did',
-                       'will', 'would', 'should', 'could', 'can',
-                       'make', 'take', 'get', 'think', 'know', 'need',
-                       'want', 'become', 'learn', 'create', 'build']
-        verb_count = sum(1 for verb in common_verbs if f' {verb} ' in f' {text_lower} ')
-        score += verb_count * 15
+        score += features.verb_count * 15
 
         # Bonus for articles (a, an, the) - indicates natural language
-        article_count = (text_lower.count(' a ') +
-                        text_lower.count(' an ') +
-                        text_lower.count(' the '))
-        score += article_count * 10
+        score += features.article_count * 10
 
         # Bonus for pronouns - indicates direct communication
-        pronouns = ['you', 'your', 'i', 'we', 'our', 'they', 'them']
-        pronoun_count = sum(1 for p in pronouns if f' {p} ' in f' {text_lower} ')
-        score += pronoun_count * 12
+        score += features.pronoun_count * 12
 
         # Bonus for conjunctions - indicates complex thought
-        conjunctions = ['and', 'but', 'or', 'because', 'if', 'when', 'while', 'although']
-        conjunction_count = sum(1 for c in conjunctions if f' {c} ' in f' {text_lower} ')
-        score += conjunction_count * 10
+        score += features.conjunction_count * 10
 
         # Bonus for user note (they found it meaningful)
-        if highlight['note']:
+        if highlight.note:
             score += 50
 
         # Penalty for being too short (incomplete thought)
@@ -248,7 +416,7 @@ class RealQuoteCurator:
             score += 10
 
         # Bonus for starting with capital and ending with punctuation
-        if text and text[0].isupper() and text[-1] in '.!?"':
+        if features.starts_upper and features.ends_with_punctuation:
             score += 15
 
         # Bonus for quote marks (dialogue or cited quote)
@@ -281,9 +449,7 @@ class RealQuoteCurator:
             f.write("- Your highlights that meant something to you\n")
             f.write("\n")
             f.write("TAG OPTIONS:\n")
-            f.write("business, leadership, strategy, creativity, success, wisdom, life,\n")
-            f.write("learning, courage, discipline, inspiration, reading, thinking,\n")
-            f.write("communication, power, decision, freedom, love, happiness\n")
+            f.write(format_tag_options())
             f.write("\n")
             f.write("=" * 80 + "\n")
             f.write("\n")
@@ -294,8 +460,8 @@ class RealQuoteCurator:
                 if not quotes:
                     continue
 
-                author = quotes[0]['author']
-                asin = quotes[0]['asin']
+                author = quotes[0].author
+                asin = quotes[0].asin
 
                 f.write(f"BOOK: {book_title}\n")
                 f.write(f"AUTHOR: {author}\n")
@@ -304,15 +470,18 @@ class RealQuoteCurator:
 
                 for i, q in enumerate(quotes, 1):
                     # Suggest tags
-                    suggested_tags = self._suggest_tags(q['highlight'], book_title)
+                    if q.tags is not None:
+                        suggested_tags = q.tags
+                    else:
+                        suggested_tags = self._suggest_tags(q.text, book_title)
 
                     f.write(f"QUOTE {i}:\n")
-                    f.write(f"{q['highlight']}\n")
+                    f.write(f"{q.text}\n")
                     f.write(f"\n")
-                    f.write(f"LENGTH: {q['length']} chars | QUALITY SCORE: {q['realness']}\n")
+                    f.write(f"LENGTH: {q.length} chars | QUALITY SCORE: {q.realness}\n")
                     f.write(f"TAGS: {', '.join(suggested_tags)}\n")
-                    if q['note']:
-                        f.write(f"YOUR NOTE: {q['note']}\n")
+                    if q.note:
+                        f.write(f"YOUR NOTE: {q.note}\n")
                     f.write("\n")
 
                 f.write("-" * 80 + "\n")
@@ -327,34 +496,7 @@ class RealQuoteCurator:
 
     def _suggest_tags(self, text, book_title=''):
         """Suggest tags based on content"""
-        tags = set()
-        text_lower = text.lower()
-
-        tag_keywords = {
-            'business': ['business', 'company', 'startup', 'entrepreneur', 'customer', 'product', 'market'],
-            'leadership': ['lead', 'leader', 'manage', 'team', 'ceo', 'executive', 'organization'],
-            'strategy': ['strategy', 'plan', 'goal', 'vision', 'mission'],
-            'creativity': ['creative', 'create', 'innovation', 'design', 'invent', 'original'],
-            'success': ['success', 'achieve', 'accomplish', 'win', 'excel'],
-            'wisdom': ['wisdom', 'knowledge', 'truth', 'understand', 'principle', 'insight'],
-            'life': ['life', 'living', 'people', 'human', 'world'],
-            'learning': ['learn', 'education', 'teach', 'skill', 'practice'],
-            'courage': ['courage', 'brave', 'strength', 'risk', 'fear', 'bold'],
-            'discipline': ['discipline', 'focus', 'habit', 'routine', 'consistent'],
-            'inspiration': ['inspire', 'motivate', 'hope', 'aspire'],
-            'reading': ['read', 'book', 'story', 'page', 'write', 'author'],
-            'thinking': ['think', 'thought', 'mind', 'idea', 'reflect', 'consider'],
-            'communication': ['communicate', 'speak', 'talk', 'listen', 'say', 'tell'],
-            'power': ['power', 'influence', 'control', 'authority'],
-            'decision': ['decide', 'choice', 'choose', 'judgment'],
-            'freedom': ['free', 'freedom', 'liberty', 'independent'],
-            'love': ['love', 'heart', 'soul', 'passion', 'care'],
-            'happiness': ['happy', 'joy', 'delight', 'pleasure'],
-        }
-
-        for tag, keywords in tag_keywords.items():
-            if any(keyword in text_lower for keyword in keywords):
-                tags.add(tag)
+        tags = match_tags(text)
 
         # Fallback
         if not tags:
@@ -362,16 +504,68 @@ class RealQuoteCurator:
 
         return sorted(list(tags))[:3]
 
+def _curate_chunk(chunk):
+    """Worker: select and tag the top 6 of each (title, [(text, note)]) group
+
+    Returns title -> ([(index, realness, tags)], stats), index being the
+    highlight's position in its book.
+    """
+    curator = RealQuoteCurator(None)
+    results = {}
+    for title, items in chunk:
+        highlights = [Highlight(None, text, note) for text, note in items]
+        positions = {id(h): i for i, h in enumerate(highlights)}
+        stats = curator._new_stats()
+        picks = [
+            (positions[id(h)], h.realness, curator._suggest_tags(h.text, title))
+            for h in curator._select_book(highlights, stats)
+        ]
+        results[title] = (picks, stats)
+    return results
+
 def main():
     if len(sys.argv) < 2:
-        print("Usage: python curate_real_quotes.py <readwise_csv>")
+        print("Usage: python curate_real_quotes.py <readwise_csv> [--workers N] [--incremental [STATE]] [--cache] [--memory-limit MB] [--dedupe [THRESHOLD]] [--memo [PATH]] [--model [PATH]]")
+        print("\n--model ranks with a learned model (see learned_scorer.py), scoring kept highlights")
+        print("in NumPy batches; selection then runs in-process, so --workers only speeds up loading.")
         sys.exit(1)
 
     csv_path = sys.argv[1]
+    workers = parse_workers_arg(sys.argv)
+    state_path = parse_incremental_arg(sys.argv, 'curation_state_real.json')
+    memory_limit_mb = parse_memory_limit_arg(sys.argv)
+    dedupe = None
+    if '--dedupe' in sys.argv:
+        # near_duplicates needs NumPy; only load it when deduping
+        from near_duplicates import parse_dedupe_arg
+        dedupe = parse_dedupe_arg(sys.argv)
+    if dedupe is not None and (state_path or memory_limit_mb):
+        print("⚠️  --dedupe needs the full library in memory; ignored with --incremental/--memory-limit")
 
     curator = RealQuoteCurator(csv_path)
-    curator.load_csv(min_highlights=5)
-    curated = curator.select_real_quotes()
+    if '--model' in sys.argv:
+        # learned_scorer needs NumPy; only load it when ranking with a model
+        from learned_scorer import LinearQuoteScorer, parse_model_arg
+        model_path = parse_model_arg(sys.argv)
+        curator.ranker = LinearQuoteScorer.load(model_path)
+        print(f"🧠 Ranking with learned model {model_path}")
+        if workers > 1:
+            print("⚠️  --model scores in batches in-process; --workers only applies to loading")
+    memo_path = parse_memo_arg(sys.argv)
+    if memo_path:
+        curator.memo = ClassificationMemo('real', curator.rules_version(), memo_path)
+    if state_path:
+        curated = curator.load_incremental(state_path, min_highlights=5, workers=workers)
+    elif memory_limit_mb:
+        curated = curator.select_external(memory_limit_mb, min_highlights=5)
+    elif workers > 1 or '--cache' in sys.argv or dedupe is not None:
+        curator.load_csv(min_highlights=5, workers=workers, cache='--cache' in sys.argv)
+        curated = curator.select_real_quotes(workers=workers, dedupe=dedupe)
+    else:
+        curated = curator.select_streaming(min_highlights=5)
+    if curator.memo is not None:
+        curator.memo.report()
+        curator.memo.close()
     curator.export_for_manual_curation(curated, 'QUOTES_TO_CURATE.txt')
 
 if __name__ == "__main__":
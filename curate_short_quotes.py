@@ -3,126 +3,263 @@
 Curate SHORT quotes from Readwise - prioritize brevity for shield UI
 Select 6 shortest high-quality quotes per book for manual review
 """
-import csv
 import sys
 from collections import defaultdict
+from readwise_ingest import group_rows, is_kindle_book_row, iter_rows, parse_workers_arg
+from highlight_records import BookRegistry, Highlight
+from ingest_state import IngestState, parse_incremental_arg
+from highlight_cache import group_rows_cached
+from external_grouping import iter_book_groups, parse_memory_limit_arg
+from candidate_selection import BookTopK, TopK, length_rank_key
+from highlight_features import extract_features
+from quote_tagging import TagMatcher, format_tag_options, match_tags
+from parallel_curation import curate_books_parallel
+from classification_memo import ClassificationMemo, parse_memo_arg
+
+# Bump when filters or scoring change, so stored ingestion state is rebuilt
+# and memoized classifications are recomputed
+RULES_VERSION = 1
+
+# Candidates kept per book, best first
+TOP_K = 6
+
+# Book-title tag used when a quote matches no tag (first match wins)
+BOOK_FALLBACK_TAGS = TagMatcher({
+    'business': ['business', 'company'],
+    'leadership': ['lead', 'power'],
+})
 
 class ShortQuoteCurator:
     def __init__(self, csv_path):
         self.csv_path = csv_path
         self.books = defaultdict(list)
+        self.memo = None
 
-    def load_csv(self, min_highlights=5):
+    def load_csv(self, min_highlights=5, workers=1, cache=False):
         """Load and parse the Readwise CSV, books only"""
         print("📖 Loading Readwise CSV...")
 
-        all_items = defaultdict(list)
+        registry = BookRegistry()
 
-        with open(self.csv_path, 'r', encoding='utf-8') as f:
-            reader = csv.DictReader(f)
+        # Books only (has ASIN)
+        if cache:
+            groups = group_rows_cached(self.csv_path, keep=is_kindle_book_row, workers=workers)
+        else:
+            groups = group_rows(self.csv_path, keep=is_kindle_book_row, workers=workers)
 
-            for row in reader:
-                book_title = self._get_field(row, ['Book Title', 'Title'])
-                author = self._get_field(row, ['Book Author', 'Author'])
-                highlight = self._get_field(row, ['Highlight', 'Text'])
-                asin = self._get_field(row, ['Amazon Book ID', 'ASIN'])
-                note = self._get_field(row, ['Note'])
-
-                if not book_title or not highlight:
-                    continue
+        # Filter to books with enough highlights
+        for title, rows in groups.items():
+            if len(rows) >= min_highlights:
+                self.books[title] = [
+                    Highlight(registry.get(title, author, asin), highlight, note)
+                    for _, author, highlight, asin, note, _ in rows
+                ]
 
-                # Books only (has ASIN)
-                if not asin or len(asin) != 10:
-                    continue
+        print(f"✅ Loaded {len(self.books)} books with {min_highlights}+ highlights")
 
-                all_items[book_title].append({
-                    'author': author,
-                    'highlight': highlight,
-                    'asin': asin,
-                    'note': note,
-                    'length': len(highlight),
-                })
+    def load_incremental(self, state_path, min_highlights=5, workers=1):
+        """Filter and score only highlights added since the last run
 
-        # Filter to books with enough highlights
-        for title, highlights in all_items.items():
-            if len(highlights) >= min_highlights:
-                self.books[title] = highlights
+        Returns the same per-book top 6 as load_csv + select_short_quotes,
+        merged from the candidates stored in the ingestion state.
+        """
+        print("📖 Loading new Readwise highlights...")
 
-        print(f"✅ Loaded {len(self.books)} books with {min_highlights}+ highlights")
+        state = IngestState.load(state_path, RULES_VERSION)
+        registry = BookRegistry()
 
-    def _get_field(self, row, possible_names):
-        """Get field from row with multiple possible column names"""
-        for name in possible_names:
-            if name in row and row[name]:
-                return row[name].strip()
-        return None
+        groups = state.read_new_rows(self.csv_path, keep=is_kindle_book_row, workers=workers)
+        print(f"✅ Found {sum(len(rows) for rows in groups.values())} new highlights in {len(groups)} books")
 
-    def select_short_quotes(self):
-        """Select 6 shortest high-quality quotes per book"""
         print("\n🔍 Filtering and ranking by length...")
+        for title, rows in groups.items():
+            highlights = [
+                Highlight(registry.get(title, author, asin), highlight, note)
+                for _, author, highlight, asin, note, _ in rows
+            ]
+            candidates = self._select_book(highlights)
+            state.merge_book(title, rows[0], len(rows), candidates, {}, length_rank_key, TOP_K)
+
+        state.save()
+
+        curated = state.curated(min_highlights, registry)
+        self._print_selection(curated)
+        return curated
 
+    def select_external(self, memory_limit_mb, min_highlights=5):
+        """Load and select book by book with spill-to-disk grouping
+
+        Same result as load_csv + select_short_quotes, but only one shard
+        of rows plus the selected 6 per book are held in memory.
+        """
+        print(f"📖 Loading Readwise CSV in shards (memory limit {memory_limit_mb} MB)...")
+
+        registry = BookRegistry()
         curated = {}
 
-        for book_title, highlights in self.books.items():
-            candidates = []
+        groups = iter_book_groups(self.csv_path, keep=is_kindle_book_row, memory_limit_mb=memory_limit_mb)
+        for title, rows in groups:
+            if len(rows) < min_highlights:
+                continue
+            highlights = [
+                Highlight(registry.get(title, author, asin), highlight, note)
+                for _, author, highlight, asin, note, _ in rows
+            ]
+            curated[title] = self._select_book(highlights)
 
-            for h in highlights:
-                text = h['highlight']
+        print(f"✅ Loaded {len(curated)} books with {min_highlights}+ highlights")
 
-                # Quality filters
-                if len(text) < 20:  # Too short, incomplete
-                    continue
-                if len(text) > 300:  # Too long for shield UI
-                    continue
-                if self._is_poor_quality(text):
-                    continue
+        print("\n🔍 Filtering and ranking by length...")
+        self._print_selection(curated)
+        return curated
 
-                # Calculate quality score (higher = better)
-                score = self._calculate_quality_score(h)
-                h['score'] = score
+    def select_streaming(self, min_highlights=5):
+        """Load, filter, score and select in one pass over the CSV
 
-                candidates.append(h)
+        Same result as load_csv + select_short_quotes, but only a bounded
+        6 shortest per book are kept while rows are read.
+        """
+        print("📖 Loading Readwise CSV...")
 
-            # Sort by length (shortest first), then by score (highest first)
-            candidates.sort(key=lambda x: (x['length'], -x['score']))
+        registry = BookRegistry()
+        tops = BookTopK(TOP_K, length_rank_key)
 
-            # Take top 6 shortest
-            curated[book_title] = candidates[:6]
+        for row in iter_rows(self.csv_path):
+            if not is_kindle_book_row(row):
+                continue
+            title = row.book_title
+            tops.count(title)
+            h = Highlight(registry.get(title, row.author, row.asin), row.highlight, row.note)
+            if self._evaluate(h):
+                tops.push(title, h)
 
+        curated = tops.curated(min_highlights)
+        print(f"✅ Loaded {len(curated)} books with {min_highlights}+ highlights")
+
+        print("\n🔍 Filtering and ranking by length...")
+        self._print_selection(curated)
+        return curated
+
+    def select_short_quotes(self, workers=1, dedupe=None):
+        """Select 6 shortest high-quality quotes per book
+
+        With workers > 1, books are curated (and their tags suggested) in
+        a process pool; the result is identical to the serial run. With a
+        dedupe threshold, near-duplicate candidates across the library are
+        collapsed to their best-ranked member before each book's top 6.
+        With a classification memo the run stays in-process, where memo
+        lookups are cheaper than the pool.
+        """
+        print("\n🔍 Filtering and ranking by length...")
+
+        curated = {}
+
+        if dedupe is not None:
+            candidates = {
+                book_title: [h for h in highlights if self._evaluate(h)]
+                for book_title, highlights in self.books.items()
+            }
+            from near_duplicates import drop_near_duplicate_candidates
+            candidates, dropped = drop_near_duplicate_candidates(candidates, length_rank_key, dedupe)
+            print(f"❌ Filtered {dropped} near-duplicates")
+
+            for book_title, highlights in candidates.items():
+                top = TopK(TOP_K, length_rank_key)
+                for h in highlights:
+                    top.push(h)
+                curated[book_title] = top.items()
+        elif workers > 1 and len(self.books) > 1 and self.memo is None:
+            groups = [(title, [(h.text, h.note) for h in highlights]) for title, highlights in self.books.items()]
+            results = curate_books_parallel(_curate_chunk, groups, workers)
+
+            for book_title, highlights in self.books.items():
+                selected = []
+                for index, score, tags in results[book_title]:
+                    h = highlights[index]
+                    h.score = score
+                    h.tags = tags
+                    selected.append(h)
+                curated[book_title] = selected
+        else:
+            for book_title, highlights in self.books.items():
+                curated[book_title] = self._select_book(highlights)
+
+        self._print_selection(curated)
+        return curated
+
+    def _select_book(self, highlights):
+        """Filter and score one book's highlights, return its 6 shortest"""
+        top = TopK(TOP_K, length_rank_key)
+        for h in highlights:
+            if self._evaluate(h):
+                top.push(h)
+        return top.items()
+
+    def _evaluate(self, h):
+        """Apply the filters to one highlight and score it; True if kept"""
+        if self.memo is not None:
+            outcome, score = self.memo.classify(h, self._classify)
+        else:
+            outcome, score = self._classify(h)
+
+        if outcome != 'kept':
+            return False
+        h.score = score
+        return True
+
+    def _classify(self, h):
+        """('kept' or 'filtered', quality score)"""
+        text = h.text
+
+        # Quality filters
+        if len(text) < 20:  # Too short, incomplete
+            return 'filtered', None
+        if len(text) > 300:  # Too long for shield UI
+            return 'filtered', None
+
+        # Tokenize once; the filter and the score share the feature record
+        features = extract_features(text)
+        if self._is_poor_quality(features):
+            return 'filtered', None
+
+        # Calculate quality score (higher = better)
+        return 'kept', self._calculate_quality_score(h, features)
+
+    def _print_selection(self, curated):
         total = sum(len(quotes) for quotes in curated.values())
         avg_per_book = total / len(curated) if curated else 0
         print(f"✅ Selected {total} quotes (~{avg_per_book:.1f} per book)")
 
-        return curated
-
-    def _is_poor_quality(self, text):
+    def _is_poor_quality(self, features):
         """Filter out poor quality quotes"""
+        text = features.text
+
         # Too many numbers (statistics/facts)
-        if text.count('0') + text.count('1') + text.count('2') + text.count('3') > 5:
+        if features.digit_count > 5 and text.count('0') + text.count('1') + text.count('2') + text.count('3') > 5:
             return True
 
         # Starts with non-quote patterns
-        bad_starts = ['chapter ', 'figure ', 'table ', 'http', 'www.']
-        if any(text.lower().startswith(s) for s in bad_starts):
+        bad_starts = ('chapter ', 'figure ', 'table ', 'http', 'www.')
+        if features.lower.startswith(bad_starts):
             return True
 
         # Too many line breaks (lists)
-        if text.count('\n') > 2:
+        if features.line_breaks > 2:
             return True
 
         return False
 
-    def _calculate_quality_score(self, highlight):
+    def _calculate_quality_score(self, highlight, features):
         """Score quote quality (not used for ranking, just for tie-breaking)"""
         score = 100
-        text = highlight['highlight']
+        text = highlight.text
 
         # Has user note = important
-        if highlight['note']:
+        if highlight.note:
             score += 50
 
         # Complete sentence
-        if text and text[0].isupper() and text[-1] in '.!?"':
+        if features.starts_upper and features.ends_with_punctuation:
             score += 20
 
         # Quote marks (actual dialogue)
@@ -131,7 +268,8 @@ class ShortQuoteCurator:
 
         # Inspirational keywords
         good_words = ['life', 'wisdom', 'success', 'lead', 'create', 'think']
-        score += sum(10 for word in good_words if word in text.lower())
+        text_lower = features.lower
+        score += sum(10 for word in good_words if word in text_lower)
 
         return score
 
@@ -152,9 +290,7 @@ class ShortQuoteCurator:
             f.write("5. Run: python3 finalize_quotes.py QUOTES_TO_CURATE.txt\n")
             f.write("\n")
             f.write("TAG OPTIONS:\n")
-            f.write("business, leadership, strategy, creativity, success, wisdom, life,\n")
-            f.write("learning, courage, discipline, inspiration, reading, thinking,\n")
-            f.write("communication, power, decision, freedom, love, happiness\n")
+            f.write(format_tag_options())
             f.write("\n")
             f.write("=" * 80 + "\n")
             f.write("\n")
@@ -165,8 +301,8 @@ class ShortQuoteCurator:
                 if not quotes:
                     continue
 
-                author = quotes[0]['author']
-                asin = quotes[0]['asin']
+                author = quotes[0].author
+                asin = quotes[0].asin
 
                 f.write(f"BOOK: {book_title}\n")
                 f.write(f"AUTHOR: {author}\n")
@@ -175,15 +311,18 @@ class ShortQuoteCurator:
 
                 for i, q in enumerate(quotes, 1):
                     # Suggest tags
-                    suggested_tags = self._suggest_tags(q['highlight'], book_title)
+                    if q.tags is not None:
+                        suggested_tags = q.tags
+                    else:
+                        suggested_tags = self._suggest_tags(q.text, book_title)
 
                     f.write(f"QUOTE {i}:\n")
-                    f.write(f"{q['highlight']}\n")
+                    f.write(f"{q.text}\n")
                     f.write(f"\n")
-                    f.write(f"LENGTH: {q['length']} chars\n")
+                    f.write(f"LENGTH: {q.length} chars\n")
                     f.write(f"TAGS: {', '.join(suggested_tags)}\n")
-                    if q['note']:
-                        f.write(f"YOUR NOTE: {q['note']}\n")
+                    if q.note:
+                        f.write(f"YOUR NOTE: {q.note}\n")
                     f.write("\n")
 
                 f.write("-" * 80 + "\n")
@@ -198,57 +337,64 @@ class ShortQuoteCurator:
 
     def _suggest_tags(self, text, book_title=''):
         """Suggest tags based on content"""
-        tags = set()
-        text_lower = text.lower()
-        book_lower = book_title.lower()
-
-        tag_keywords = {
-            'business': ['business', 'company', 'startup', 'entrepreneur', 'customer', 'product'],
-            'leadership': ['lead', 'leader', 'manage', 'team', 'ceo', 'executive'],
-            'strategy': ['strategy', 'plan', 'goal', 'vision'],
-            'creativity': ['creative', 'create', 'innovation', 'design', 'invent'],
-            'success': ['success', 'achieve', 'accomplish', 'win'],
-            'wisdom': ['wisdom', 'knowledge', 'truth', 'understand', 'principle'],
-            'life': ['life', 'living', 'people', 'human'],
-            'learning': ['learn', 'education', 'teach', 'skill'],
-            'courage': ['courage', 'brave', 'strength', 'risk', 'fear'],
-            'discipline': ['discipline', 'focus', 'habit', 'routine'],
-            'inspiration': ['inspire', 'motivate', 'hope'],
-            'reading': ['read', 'book', 'story', 'page'],
-            'thinking': ['think', 'thought', 'mind', 'idea'],
-            'communication': ['communicate', 'speak', 'talk', 'listen'],
-            'power': ['power', 'influence', 'control'],
-            'decision': ['decide', 'choice', 'choose'],
-            'freedom': ['free', 'freedom', 'liberty', 'independent'],
-            'love': ['love', 'heart', 'soul', 'passion'],
-            'happiness': ['happy', 'joy', 'delight'],
-        }
-
-        for tag, keywords in tag_keywords.items():
-            if any(keyword in text_lower for keyword in keywords):
-                tags.add(tag)
+        tags = match_tags(text)
 
         # Fallback based on book title
         if not tags:
-            if 'business' in book_lower or 'company' in book_lower:
-                tags.add('business')
-            elif 'lead' in book_lower or 'power' in book_lower:
-                tags.add('leadership')
-            else:
-                tags.add('wisdom')
+            tags.add(BOOK_FALLBACK_TAGS.first_match(book_title, 'wisdom'))
 
         return sorted(list(tags))[:3]
 
+def _curate_chunk(chunk):
+    """Worker: select and tag the 6 shortest of each (title, [(text, note)]) group
+
+    Returns title -> [(index, score, tags)], index being the highlight's
+    position in its book.
+    """
+    curator = ShortQuoteCurator(None)
+    results = {}
+    for title, items in chunk:
+        highlights = [Highlight(None, text, note) for text, note in items]
+        positions = {id(h): i for i, h in enumerate(highlights)}
+        results[title] = [
+            (positions[id(h)], h.score, curator._suggest_tags(h.text, title))
+            for h in curator._select_book(highlights)
+        ]
+    return results
+
 def main():
     if len(sys.argv) < 2:
-        print("Usage: python curate_short_quotes.py <readwise_csv>")
+        print("Usage: python curate_short_quotes.py <readwise_csv> [--workers N] [--incremental [STATE]] [--cache] [--memory-limit MB] [--dedupe [THRESHOLD]] [--memo [PATH]]")
         sys.exit(1)
 
     csv_path = sys.argv[1]
+    workers = parse_workers_arg(sys.argv)
+    state_path = parse_incremental_arg(sys.argv, 'curation_state_short.json')
+    memory_limit_mb = parse_memory_limit_arg(sys.argv)
+    dedupe = None
+    if '--dedupe' in sys.argv:
+        # near_duplicates needs NumPy; only load it when deduping
+        from near_duplicates import parse_dedupe_arg
+        dedupe = parse_dedupe_arg(sys.argv)
+    if dedupe is not None and (state_path or memory_limit_mb):
+        print("⚠️  --dedupe needs the full library in memory; ignored with --incremental/--memory-limit")
 
     curator = ShortQuoteCurator(csv_path)
-    curator.load_csv(min_highlights=5)
-    curated = curator.select_short_quotes()
+    memo_path = parse_memo_arg(sys.argv)
+    if memo_path:
+        curator.memo = ClassificationMemo('short', RULES_VERSION, memo_path)
+    if state_path:
+        curated = curator.load_incremental(state_path, min_highlights=5, workers=workers)
+    elif memory_limit_mb:
+        curated = curator.select_external(memory_limit_mb, min_highlights=5)
+    elif workers > 1 or '--cache' in sys.argv or dedupe is not None:
+        curator.load_csv(min_highlights=5, workers=workers, cache='--cache' in sys.argv)
+        curated = curator.select_short_quotes(workers=workers, dedupe=dedupe)
+    else:
+        curated = curator.select_streaming(min_highlights=5)
+    if curator.memo is not None:
+        curator.memo.report()
+        curator.memo.close()
     curator.export_for_manual_curation(curated, 'QUOTES_TO_CURATE.txt')
 
 if __name__ == "__main__":
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Global diversity-aware quote selection
+Instead of every book independently keeping its top 2, the shipped set
+is chosen across all books at once under a total budget and a per-book
+cap, maximizing quality score plus coverage of tags, authors and length
+buckets. Coverage has diminishing returns (square root of each group's
+count), so the objective is submodular and lazy-greedy evaluation only
+re-scores the few candidates near the top of a priority queue
+"""
+import sys
+import time
+import heapq
+from math import sqrt
+
+# Most quotes any one book may contribute
+PER_BOOK_CAP = 2
+
+# Objective weights: quality (min-max normalized to 0..1) and the value
+# of the first quote in a group; the n-th adds sqrt(n) - sqrt(n - 1)
+DIVERSITY_WEIGHTS = {
+    'score': 1.0,
+    'tag': 0.15,
+    'author': 0.4,
+    'length': 0.2,
+}
+
+# Upper bounds (chars) of the length buckets; longer quotes are 'long'
+LENGTH_BUCKETS = [(80, 'short'), (150, 'medium')]
+
+def length_bucket(length):
+    for limit, name in LENGTH_BUCKETS:
+        if length <= limit:
+            return name
+    return 'long'
+
+def _groups(h, tags_of):
+    """(family, group) pairs a highlight covers"""
+    groups = [('tag', tag) for tag in dict.fromkeys(tags_of(h))]
+    groups.append(('author', h.author or 'Unknown'))
+    groups.append(('length', length_bucket(h.length)))
+    return groups
+
+def select_diverse(highlights, budget, per_book=PER_BOOK_CAP, tags_of=None, weights=DIVERSITY_WEIGHTS):
+    """Lazy-greedy selection of up to budget highlights, at most per_book per book
+
+    tags_of(h) gives a highlight's tags (default h.tags). Returns the
+    selected highlights in input order.
+    """
+    tags_of = tags_of or (lambda h: h.tags or [])
+    if not highlights or budget <= 0:
+        return []
+
+    scores = [h.score or 0 for h in highlights]
+    low, high = min(scores), max(scores)
+    span = high - low
+    quality = [weights['score'] * ((s - low) / span if span else 1.0) for s in scores]
+    groups = [_groups(h, tags_of) for h in highlights]
+
+    counts = {}
+    def gain(i):
+        total = quality[i]
+        for group in groups[i]:
+            n = counts.get(group, 0)
+            total += weights[group[0]] * (sqrt(n + 1) - sqrt(n))
+        return total
+
+    # Max-heap of gain upper bounds; gains only shrink as the set grows,
+    # so a candidate re-evaluated this round that stays on top is the best
+    heap = [(-gain(i), i, 0) for i in range(len(highlights))]
+    heapq.heapify(heap)
+    taken = {}
+    selected = []
+    while heap and len(selected) < budget:
+        _, i, evaluated = heapq.heappop(heap)
+        book = highlights[i].book_title
+        if taken.get(book, 0) >= per_book:
+            continue
+        if evaluated != len(selected):
+            heapq.heappush(heap, (-gain(i), i, len(selected)))
+            continue
+
+        selected.append(i)
+        taken[book] = taken.get(book, 0) + 1
+        for group in groups[i]:
+            counts[group] = counts.get(group, 0) + 1
+
+    return [highlights[i] for i in sorted(selected)]
+
+def select_diverse_by_book(books, budget=None, per_book=PER_BOOK_CAP, tags_of=None, weights=DIVERSITY_WEIGHTS):
+    """select_diverse over [(book, highlights)]; returns the same shape
+
+    budget defaults to per_book quotes per book. Books keep their order
+    and their quotes stay best-first; books with no selection are dropped.
+    """
+    if budget is None:
+        budget = per_book * len(books)
+    flat = [h for _, highlights in books for h in highlights]
+    chosen = {id(h) for h in select_diverse(flat, budget, per_book, tags_of, weights)}
+
+    selected = []
+    for book, highlights in books:
+        kept = [h for h in highlights if id(h) in chosen]
+        if kept:
+            selected.append((book, kept))
+    return selected
+
+def coverage(highlights, tags_of=None):
+    """Distinct tags and authors covered by highlights"""
+    tags_of = tags_of or (lambda h: h.tags or [])
+    return {
+        'tags': len({tag for h in highlights for tag in tags_of(h)}),
+        'authors': len({h.author for h in highlights}),
+    }
+
+def parse_diverse_arg(argv):
+    """Read --diverse [BUDGET] from argv
+
+    Returns None without the flag, 0 for the default budget (PER_BOOK_CAP
+    per book), else the budget.
+    """
+    for i, arg in enumerate(argv):
+        if arg == '--diverse':
+            if i + 1 < len(argv) and not argv[i + 1].startswith('--'):
+                try:
+                    return int(argv[i + 1])
+                except ValueError:
+                    print("Error: --diverse budget must be a number of quotes")
+                    sys.exit(1)
+            return 0
+    return None
+
+def main():
+    from auto_select_top2 import parse_curation_file
+
+    if len(sys.argv) < 2:
+        print("Usage: python diverse_selection.py <QUOTES_TO_CURATE.txt> [--diverse BUDGET] [--per-book N]")
+        print("\nCompares top 2 per book with global diversity-aware selection.")
+        sys.exit(1)
+
+    input_file = sys.argv[1]
+    budget = parse_diverse_arg(sys.argv) or None
+    per_book = PER_BOOK_CAP
+    if '--per-book' in sys.argv:
+        per_book = int(sys.argv[sys.argv.index('--per-book') + 1])
+
+    books = parse_curation_file(input_file, per_book=None)
+    candidates = [h for _, quotes in books for h in quotes]
+    top = [h for _, quotes in books for h in quotes[:per_book]]
+
+    start = time.perf_counter()
+    diverse = [h for _, quotes in select_diverse_by_book(books, budget, per_book) for h in quotes]
+    elapsed = time.perf_counter() - start
+    print(f"\n⚡ Selected {len(diverse)} of {len(candidates)} candidates in {elapsed * 1000:.1f} ms")
+
+    for name, quotes in [(f'Top {per_book} per book', top), ('Diverse', diverse)]:
+        covered = coverage(quotes)
+        mean_score = sum(h.score for h in quotes) / len(quotes) if quotes else 0
+        print(f"\n📊 {name}: {len(quotes)} quotes, mean score {mean_score:.0f}")
+        print(f"  🏷️  Tags: {covered['tags']}  ✍️  Authors: {covered['authors']}")
+        lengths = {}
+        for h in quotes:
+            bucket = length_bucket(h.length)
+            lengths[bucket] = lengths.get(bucket, 0) + 1
+        print("  📏 Lengths: " + ', '.join(f'{bucket} ({lengths.get(bucket, 0)})' for bucket in ['short', 'medium', 'long']))
+        tag_counts = {}
+        for h in quotes:
+            for tag in h.tags:
+                tag_counts[tag] = tag_counts.get(tag, 0) + 1
+        top_tags = sorted(tag_counts.items(), key=lambda item: -item[1])[:5]
+        print("  Most common tags: " + ', '.join(f'{tag} ({n})' for tag, n in top_tags))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Memory-bounded grouping of Readwise highlights by book
+Rows are partitioned by book into temporary shard files, then each shard
+is grouped on its own, so peak memory stays near a configurable cap
+however large the export is
+"""
+import math
+import os
+import pickle
+import sys
+import tempfile
+import zlib
+from readwise_ingest import READWISE_COLUMNS, ReadwiseRow, iter_rows
+
+# Rough per-row cost of a ReadwiseRow on top of its string contents
+ROW_OVERHEAD_BYTES = 400
+
+def _row_size(row):
+    return ROW_OVERHEAD_BYTES + sum(len(v) for v in row if v)
+
+def iter_book_groups(csv_path, columns=READWISE_COLUMNS, keep=None, memory_limit_mb=256):
+    """Yield (book_title, rows) one book at a time using spill-to-disk shards
+
+    Books come out shard by shard (books within a shard in first-seen
+    order); rows within a book keep file order. Only one shard is held
+    in memory while grouping.
+    """
+    memory_limit = memory_limit_mb * 1024 * 1024
+
+    # Size shards so one shard's rows fit in half the budget
+    estimated = os.path.getsize(csv_path) * 3
+    shard_count = max(1, math.ceil(estimated / (memory_limit / 2)))
+
+    with tempfile.TemporaryDirectory(prefix='readwise_shards_') as tmp_dir:
+        shard_paths = [os.path.join(tmp_dir, f'shard_{i:04d}.pkl') for i in range(shard_count)]
+        buffers = [[] for _ in range(shard_count)]
+        buffered = 0
+
+        for row in iter_rows(csv_path, columns):
+            if keep is not None and not keep(row):
+                continue
+            shard = zlib.crc32((row.book_title or '').encode('utf-8')) % shard_count
+            buffers[shard].append(tuple(row))
+            buffered += _row_size(row)
+
+            # Spill every buffer once the write-side half of the budget is used
+            if buffered >= memory_limit / 2:
+                _spill(shard_paths, buffers)
+                buffered = 0
+
+        _spill(shard_paths, buffers)
+
+        for path in shard_paths:
+            if not os.path.exists(path):
+                continue
+            groups = {}
+            for row in _read_shard(path):
+                rows = groups.get(row.book_title)
+                if rows is None:
+                    groups[row.book_title] = rows = []
+                rows.append(row)
+            os.remove(path)
+
+            for title, rows in groups.items():
+                yield title, rows
+            del groups
+
+def _spill(shard_paths, buffers):
+    """Append each non-empty buffer to its shard file and clear it"""
+    for path, buffer in zip(shard_paths, buffers):
+        if buffer:
+            with open(path, 'ab') as f:
+                pickle.dump(buffer, f, protocol=pickle.HIGHEST_PROTOCOL)
+            buffer.clear()
+
+def _read_shard(path):
+    """Read back every batch spilled to one shard file, in write order"""
+    with open(path, 'rb') as f:
+        while True:
+            try:
+                batch = pickle.load(f)
+            except EOFError:
+                return
+            for values in batch:
+                yield ReadwiseRow._make(values)
+
+def parse_memory_limit_arg(argv):
+    """Read --memory-limit MB from argv; returns None when absent"""
+    for i, arg in enumerate(argv):
+        if arg == '--memory-limit' and i + 1 < len(argv):
+            try:
+                return int(argv[i + 1])
+            except ValueError:
+                print("Error: --memory-limit must be followed by a number (MB)")
+                sys.exit(1)
+    return None
@@ -3,9 +3,11 @@
 Convert manually curated TXT file to PageInstead quotes.json format
 """
 import sys
-import json
 import re
 from datetime import datetime
+from highlight_records import BookRegistry, Highlight
+from id_registry import IdRegistry, drop_duplicate_quotes
+from quotes_export import write_quotes_json, parse_merge_arg, parse_format_arg
 
 def parse_curated_txt(filepath):
     """Parse the manually edited TXT file"""
@@ -18,6 +20,7 @@ def parse_curated_txt(filepath):
     book_sections = content.split('-' * 80)
 
     quotes = []
+    registry = BookRegistry()
     current_book = None
     current_author = None
     current_asin = None
@@ -69,60 +72,50 @@ def parse_curated_txt(filepath):
 
                 # Only add if we have valid data
                 if quote_text and current_book and current_author:
-                    quotes.append({
-                        'text': quote_text,
-                        'author': current_author,
-                        'book_title': current_book,
-                        'asin': current_asin,
-                        'tags': tags if tags else ['wisdom']
-                    })
+                    book = registry.get(current_book, current_author, current_asin)
+                    quotes.append(Highlight(book, quote_text, tags=tags if tags else ['wisdom']))
 
             i += 1
 
     print(f"✅ Parsed {len(quotes)} quotes")
     return quotes
 
-def convert_to_pageinstead(quotes, output_path):
-    """Convert to PageInstead format"""
+def convert_to_pageinstead(quotes, output_path, merge=False, format_version=None):
+    """Convert to PageInstead format (merged into an existing file with merge)"""
     print("\n📤 Converting to PageInstead format...")
 
+    registry = IdRegistry.load()
     page_instead_quotes = []
 
-    for idx, q in enumerate(quotes, start=1):
-        # Generate book ID
-        author_slug = q['author'].lower().replace(' ', '_').replace('.', '').replace("'", '')
-        book_id = f"{author_slug}_{hash(q['book_title']) % 10000:04d}"
+    for q in quotes:
+        # Stable book ID
+        book_id = registry.book_id(q.book_title, q.author)
 
         # Generate cover URL
         cover_url = None
-        if q['asin']:
-            cover_url = f"https://m.media-amazon.com/images/P/{q['asin']}.jpg"
+        if q.asin:
+            cover_url = f"https://m.media-amazon.com/images/P/{q.asin}.jpg"
 
         page_instead_quotes.append({
-            'id': idx,
-            'text': q['text'],
-            'author': q['author'],
-            'bookTitle': q['book_title'],
+            'id': registry.quote_id(q.text, q.book_title, q.author),
+            'text': q.text,
+            'author': q.author,
+            'bookTitle': q.book_title,
             'bookId': book_id,
-            'asin': q['asin'],
+            'asin': q.asin,
             'coverImageURL': cover_url,
             'isActive': True,
-            'tags': q['tags'][:3],  # Max 3 tags
+            'tags': q.tags[:3],  # Max 3 tags
             'dateAdded': datetime.now().strftime('%Y-%m-%d')
         })
 
-    # Create final JSON structure
-    output_data = {
-        'version': 1,
-        'lastUpdated': datetime.now().strftime('%Y-%m-%d'),
-        'quotes': page_instead_quotes
-    }
+    page_instead_quotes = drop_duplicate_quotes(page_instead_quotes)
 
-    # Save to file
-    with open(output_path, 'w', encoding='utf-8') as f:
-        json.dump(output_data, f, indent=2, ensure_ascii=False)
+    write_quotes_json(page_instead_quotes, output_path, merge, format_version)
 
     print(f"✅ Exported {len(page_instead_quotes)} quotes to {output_path}")
+    registry.save()
+    registry.report()
 
     # Statistics
     unique_books = len(set(q['bookTitle'] for q in page_instead_quotes))
@@ -135,15 +128,22 @@ def convert_to_pageinstead(quotes, output_path):
     print(f"  Quotes per book: {len(page_instead_quotes) / unique_books:.1f}")
 
     print(f"\n🎉 Ready to use in PageInstead!")
-    print(f"\nNext: cp {output_path} PageInstead/Resources/quotes.json")
+    if not merge:
+        print(f"\nNext: cp {output_path} PageInstead/Resources/quotes.json")
 
 if __name__ == '__main__':
-    if len(sys.argv) != 2:
-        print("Usage: python finalize_quotes.py QUOTES_TO_CURATE.txt")
+    if len(sys.argv) < 2 or sys.argv[1].startswith('--'):
+        print("Usage: python finalize_quotes.py QUOTES_TO_CURATE.txt [--merge [QUOTES_JSON]] [--format-version 1|2]")
+        print("\n  --merge             Update quotes.json in place (keeps dateAdded, writes a changeset)")
+        print("  --format-version N  Write format 1 (default) or the normalized, compact 2")
         sys.exit(1)
 
     input_path = sys.argv[1]
     output_path = 'kindle_quotes_final.json'
+    merge_path = parse_merge_arg(sys.argv)
+    if merge_path:
+        output_path = merge_path
 
     quotes = parse_curated_txt(input_path)
-    convert_to_pageinstead(quotes, output_path)
+    convert_to_pageinstead(quotes, output_path, merge=merge_path is not None,
+                           format_version=parse_format_arg(sys.argv))
@@ -5,6 +5,8 @@ Generate complete quotes.json with books, ASINs, and cover URLs
 
 import json
 from datetime import datetime
+from quote_tagging import match_tags
+from id_registry import IdRegistry
 
 # All collected quotes
 QUOTES_RAW = [
@@ -359,34 +361,11 @@ def clean_author_name(author):
     """Normalize author names"""
     return author.strip()
 
-def create_book_id(author, book_title):
-    """Create a unique book ID"""
-    author_slug = author.lower().replace(" ", "_").replace(".", "")
-    return f"{author_slug}_{hash(book_title) % 10000:04d}"
-
 def extract_tags(quote_text):
     """Extract relevant tags from quote text"""
-    tags = set()
-
-    keywords = {
-        "reading": ["read", "reading"],
-        "books": ["book", "books", "library", "libraries"],
-        "life": ["life", "lives", "living"],
-        "wisdom": ["wisdom", "wise", "knowledge"],
-        "imagination": ["imagination", "imagine", "dream"],
-        "learning": ["learn", "education", "teach"],
-        "freedom": ["free", "freedom", "liberty"],
-        "magic": ["magic", "magical"],
-        "friendship": ["friend", "friendship"],
-        "adventure": ["adventure", "journey", "travel"],
-    }
+    tags = match_tags(quote_text)
 
-    quote_lower = quote_text.lower()
-    for tag, words in keywords.items():
-        if any(word in quote_lower for word in words):
-            tags.add(tag)
-
-    # Ensure at least "reading" or "books" tag
+    # Ensure at least "reading" tag
     if not tags:
         tags.add("reading")
 
@@ -406,12 +385,28 @@ def generate_quotes_json():
             seen_quotes.add(normalized)
             unique_quotes.append((quote_text, author))
 
+    # Remove near-variants of the same quote, keeping the fullest wording
+    # (near_duplicates needs NumPy; without it only exact copies are removed)
+    try:
+        from near_duplicates import drop_near_duplicates
+    except ImportError:
+        near_variants = None
+        print("⚠️  NumPy is not installed, skipping near-variant removal")
+    else:
+        unique_quotes, near_variants = drop_near_duplicates(
+            unique_quotes, lambda quote: quote[0], lambda quote: -len(quote[0])
+        )
+
     print(f"Total quotes collected: {len(QUOTES_RAW)}")
-    print(f"Unique quotes after deduplication: {len(unique_quotes)}")
+    if near_variants is None:
+        print(f"Unique quotes after deduplication: {len(unique_quotes)}")
+    else:
+        print(f"Unique quotes after deduplication: {len(unique_quotes)} ({near_variants} near-variants removed)")
 
     # Generate quote entries
+    registry = IdRegistry.load()
     quotes = []
-    for idx, (quote_text, author) in enumerate(unique_quotes, start=1):
+    for quote_text, author in unique_quotes:
         author = clean_author_name(author)
 
         # Get book and ASIN for this author
@@ -423,11 +418,11 @@ def generate_quotes_json():
             asin = "B00XXXXXX0"
 
         quote_entry = {
-            "id": idx,
+            "id": registry.quote_id(quote_text, book_title, author),
             "text": quote_text,
             "author": author,
             "bookTitle": book_title,
-            "bookId": create_book_id(author, book_title),
+            "bookId": registry.book_id(book_title, author),
             "asin": asin,
             "coverImageURL": generate_cover_url(asin),
             "isActive": True,
@@ -437,6 +432,9 @@ def generate_quotes_json():
 
         quotes.append(quote_entry)
 
+    registry.save()
+    registry.report()
+
     # Create final JSON structure
     quotes_json = {
         "version": 1,
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+On-disk columnar cache of parsed Readwise highlights
+Entries are keyed by the export's content hash, so a changed export
+simply misses the cache; repeat runs memory-map the columns instead of
+re-parsing the CSV
+"""
+import hashlib
+import json
+import mmap
+import os
+import struct
+from array import array
+from readwise_ingest import READWISE_COLUMNS, ROW_FIELDS, ReadwiseRow, group_rows
+
+CACHE_DIR = '.highlight_cache'
+CACHE_MAGIC = b'HLCACHE1'
+CACHE_VERSION = 2
+
+def columns_key(columns):
+    """Short hash of a column mapping (different tools parse differently)"""
+    return hashlib.sha1(json.dumps(columns, sort_keys=True).encode('utf-8')).hexdigest()[:12]
+
+def cache_key(csv_path, columns):
+    """Content hash of the export plus the column mapping used to parse it"""
+    hasher = hashlib.sha1()
+    hasher.update(f'{CACHE_VERSION}:{columns_key(columns)}\n'.encode('utf-8'))
+    with open(csv_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+def write_cache(path, rows, source, columns_id):
+    """Write each field as a text blob, each value's end offset and its None positions
+
+    Values are located by offset rather than a separator, so any text
+    (NUL included) round-trips.
+
+    Low-cardinality fields (title, author, ASIN) are dictionary encoded,
+    which also leaves each distinct value as a single shared string.
+    """
+    sections = []
+    columns = []
+    for field_index in range(len(ROW_FIELDS)):
+        values = [row[field_index] for row in rows]
+
+        # Book metadata repeats on every row: store distinct values + codes
+        distinct = list(dict.fromkeys(values))
+        if len(distinct) * 2 < len(values):
+            codes = {v: i for i, v in enumerate(distinct)}
+            encoded = array('I', [codes[v] for v in values])
+            values = distinct
+        else:
+            encoded = None
+
+        nulls = array('Q', [i for i, v in enumerate(values) if v is None])
+        # Offsets count characters, so the blob decodes once and slices
+        ends = array('Q')
+        end = 0
+        for v in values:
+            end += len(v or '')
+            ends.append(end)
+        text = ''.join(v or '' for v in values).encode('utf-8')
+
+        columns.append([len(sections), len(sections) + 1, len(sections) + 2, len(sections) + 3 if encoded else None])
+        sections.extend([nulls.tobytes(), text, ends.tobytes()])
+        if encoded:
+            sections.append(encoded.tobytes())
+
+    # Section table: (offset, length) of each blob relative to the data start
+    table = []
+    position = 0
+    for blob in sections:
+        table.append([position, len(blob)])
+        position += len(blob)
+
+    meta = json.dumps({
+        'version': CACHE_VERSION,
+        'rows': len(rows),
+        'fields': list(ROW_FIELDS),
+        'columns': columns,
+        'sections': table,
+        'source': source,
+        'columns_key': columns_id,
+    }).encode('utf-8')
+
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(CACHE_MAGIC)
+        f.write(struct.pack('<I', len(meta)))
+        f.write(meta)
+        for blob in sections:
+            f.write(blob)
+    os.replace(tmp_path, path)
+
+def read_cache(path):
+    """Memory-map a cache file and rebuild its ReadwiseRow records"""
+    with open(path, 'rb') as f:
+        data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    try:
+        if data[:len(CACHE_MAGIC)] != CACHE_MAGIC:
+            return None
+        start = len(CACHE_MAGIC)
+        (meta_len,) = struct.unpack_from('<I', data, start)
+        meta = json.loads(data[start + 4:start + 4 + meta_len])
+        if meta.get('version') != CACHE_VERSION or meta['fields'] != list(ROW_FIELDS):
+            return None
+        base = start + 4 + meta_len
+
+        def section(index):
+            offset, length = meta['sections'][index]
+            return data[base + offset:base + offset + length]
+
+        field_values = []
+        for nulls_index, text_index, ends_index, codes_index in meta['columns']:
+            text = section(text_index).decode('utf-8')
+            ends = array('Q')
+            ends.frombytes(section(ends_index))
+            starts = [0] + ends[:-1].tolist()
+            values = [text[start:end] for start, end in zip(starts, ends)]
+            nulls = array('Q')
+            nulls.frombytes(section(nulls_index))
+            for i in nulls:
+                values[i] = None
+            if codes_index is not None:
+                codes = array('I')
+                codes.frombytes(section(codes_index))
+                values = [values[c] for c in codes]
+            field_values.append(values)
+    finally:
+        data.close()
+
+    return list(map(ReadwiseRow._make, zip(*field_values)))
+
+def group_rows_cached(csv_path, columns=READWISE_COLUMNS, keep=None, workers=1, cache_dir=CACHE_DIR):
+    """group_rows() backed by the columnar cache
+
+    Rows are cached in grouped order (books in first-seen order), which
+    regroups to exactly what group_rows() returns for the same export.
+    """
+    key = cache_key(csv_path, columns)
+    columns_id = columns_key(columns)
+    path = os.path.join(cache_dir, f'{key}.hlc')
+
+    rows = read_cache(path) if os.path.exists(path) else None
+    if rows is not None:
+        print(f"⚡ Using cached highlights ({len(rows):,} rows)")
+    else:
+        groups = group_rows(csv_path, columns, None, workers)
+        rows = [row for book_rows in groups.values() for row in book_rows]
+
+        os.makedirs(cache_dir, exist_ok=True)
+        source = os.path.abspath(csv_path)
+        _prune_entries(cache_dir, source, columns_id)
+        write_cache(path, rows, source, columns_id)
+        print(f"💾 Cached {len(rows):,} parsed highlights in {path}")
+
+    grouped = {}
+    for row in rows:
+        if keep is not None and not keep(row):
+            continue
+        book_rows = grouped.get(row.book_title)
+        if book_rows is None:
+            grouped[row.book_title] = book_rows = []
+        book_rows.append(row)
+    return grouped
+
+def _prune_entries(cache_dir, source, columns_id):
+    """Drop stale cache entries built from an earlier version of source"""
+    for name in os.listdir(cache_dir):
+        if not name.endswith('.hlc'):
+            continue
+        path = os.path.join(cache_dir, name)
+        try:
+            with open(path, 'rb') as f:
+                if f.read(len(CACHE_MAGIC)) != CACHE_MAGIC:
+                    continue
+                (meta_len,) = struct.unpack('<I', f.read(4))
+                meta = json.loads(f.read(meta_len))
+        except (OSError, ValueError, struct.error):
+            continue
+        if meta.get('source') == source and meta.get('columns_key') == columns_id:
+            os.remove(path)
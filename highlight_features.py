@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Per-highlight feature extraction shared by the curators' rules
+Each highlight is lowercased and tokenized once; filters and scorers read
+the resulting feature record instead of re-scanning the text per keyword
+"""
+import re
+import string
+
+# Word lists behind the realness score (counted once per distinct word)
+REALNESS_VERBS = frozenset([
+    'is', 'are', 'was', 'were', 'be', 'been',
+    'have', 'has', 'had', 'do', 'does', 'did',
+    'will', 'would', 'should', 'could', 'can',
+    'make', 'take', 'get', 'think', 'know', 'need',
+    'want', 'become', 'learn', 'create', 'build',
+])
+PRONOUNS = frozenset(['you', 'your', 'i', 'we', 'our', 'they', 'them'])
+CONJUNCTIONS = frozenset(['and', 'but', 'or', 'because', 'if', 'when', 'while', 'although'])
+
+# Verbs whose absence marks a short text as a likely heading
+HEADING_VERBS = frozenset([
+    'is', 'are', 'was', 'were', 'be', 'been', 'being',
+    'have', 'has', 'had', 'do', 'does', 'did',
+    'will', 'would', 'should', 'could', 'can', 'may',
+    'get', 'make', 'take', 'think', 'know', 'see',
+    'come', 'go', 'say', 'find', 'give', 'tell', 'feel',
+])
+
+NUMBER_PATTERN = re.compile(r'\d+')
+NON_ASCII_PATTERN = re.compile(r'[^\x00-\x7f]')
+
+def _class_table():
+    """Byte table mapping ASCII to U (upper), l (lower), 0 (digit) or space"""
+    table = bytearray(b' ' * 256)
+    for chars, mark in ((string.ascii_uppercase, 'U'), (string.ascii_lowercase, 'l'), (string.digits, '0')):
+        for c in chars:
+            table[ord(c)] = ord(mark)
+    return bytes(table)
+
+# str.isupper/isalpha/isdigit agree with these classes on ASCII characters
+CHAR_CLASSES = _class_table()
+
+class HighlightFeatures:
+    """Everything the curators' rules read about one highlight's text
+
+    tokens are the single-space separated pieces of the lowercased text,
+    so `word in tokens` is exactly the old `f' {word} ' in f' {text_lower} '`
+    test. word_count and has_heading_verb follow str.split() instead.
+    """
+    __slots__ = (
+        'text', 'lower', 'stripped', 'stripped_lower', 'tokens',
+        'word_count', 'verb_count', 'pronoun_count', 'article_count',
+        'conjunction_count', 'has_heading_verb', 'digit_count',
+        'number_count', 'uppercase_ratio', 'ends_with_punctuation',
+        'starts_upper', 'line_breaks', 'bullet_count', 'dash_lines',
+    )
+
+    def __init__(self, text):
+        lower = text.lower()
+        pieces = lower.split(' ')
+        tokens = set(pieces)
+
+        self.text = text
+        self.lower = lower
+        self.stripped = text.strip()
+        self.stripped_lower = lower.strip()
+        self.tokens = tokens
+
+        self.verb_count = len(REALNESS_VERBS & tokens)
+        self.pronoun_count = len(PRONOUNS & tokens)
+        self.conjunction_count = len(CONJUNCTIONS & tokens)
+        # Non-overlapping substring counts, as the realness score always used
+        self.article_count = lower.count(' a ') + lower.count(' an ') + lower.count(' the ')
+
+        # With no whitespace but plain spaces, split() is split(' ') minus empties
+        if lower.isprintable():
+            self.word_count = len(pieces) - pieces.count('')
+            self.has_heading_verb = not HEADING_VERBS.isdisjoint(tokens)
+        else:
+            words = lower.split()
+            self.word_count = len(words)
+            self.has_heading_verb = not HEADING_VERBS.isdisjoint(words)
+
+        self._count_characters(text)
+
+        self.ends_with_punctuation = bool(text) and text[-1] in '.!?"'
+        self.starts_upper = bool(text) and text[0].isupper()
+        self.line_breaks = text.count('\n')
+        self.bullet_count = text.count('•')
+        self.dash_lines = text.count('\n-')
+
+    def _count_characters(self, text):
+        """Digit, number-run and uppercase-letter stats in a couple of C passes"""
+        # Non-ASCII characters become '?', which classes as "other"
+        classes = text.encode('ascii', 'replace').translate(CHAR_CLASSES)
+        uppercase = classes.count(b'U')
+        letters = uppercase + classes.count(b'l')
+        digits = classes.count(b'0')
+        exact_runs = True
+
+        if not text.isascii():
+            for c in NON_ASCII_PATTERN.findall(text):
+                uppercase += c.isupper()
+                letters += c.isalpha()
+                if c.isdigit():
+                    digits += 1
+                    exact_runs = False
+
+        if not digits:
+            number_count = 0
+        elif exact_runs:
+            runs = classes.replace(b'U', b' ').replace(b'l', b' ')
+            number_count = runs.count(b' 0') + runs.startswith(b'0')
+        else:
+            number_count = len(NUMBER_PATTERN.findall(text))
+
+        # Leading/trailing whitespace holds no letters, so text == stripped here
+        self.digit_count = digits
+        self.number_count = number_count
+        self.uppercase_ratio = uppercase / letters if letters else 0
+
+def extract_features(text):
+    """Tokenize a highlight once and compute its feature record"""
+    return HighlightFeatures(text)
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Compact highlight records shared by the curators and exporters
+Book metadata (title, author, ASIN) is interned and stored once per book
+"""
+import sys
+
+class Book:
+    """Per-book metadata shared by all highlights of that book"""
+    __slots__ = ('title', 'author', 'asin', 'source_type')
+
+    def __init__(self, title, author, asin, source_type=None):
+        self.title = title
+        self.author = author
+        self.asin = asin
+        self.source_type = source_type
+
+    def __repr__(self):
+        return f"Book({self.title!r}, {self.author!r}, {self.asin!r})"
+
+class Highlight:
+    """A single highlight; author/title/ASIN live on the shared Book"""
+    __slots__ = ('book', 'text', 'note', 'location', 'score', 'realness', 'tags')
+
+    def __init__(self, book, text, note=None, location=None, score=0, tags=None):
+        self.book = book
+        self.text = text
+        self.note = note
+        self.location = location
+        self.score = score
+        self.realness = 0
+        self.tags = tags
+
+    @property
+    def book_title(self):
+        return self.book.title
+
+    @property
+    def author(self):
+        return self.book.author
+
+    @property
+    def asin(self):
+        return self.book.asin
+
+    @property
+    def length(self):
+        return len(self.text)
+
+    def __repr__(self):
+        return f"Highlight({self.book.title!r}, {self.text[:40]!r})"
+
+def _intern(value):
+    return sys.intern(value) if value else value
+
+class BookRegistry:
+    """Hands out one shared Book per (title, author, asin)"""
+
+    def __init__(self, detect_source_type=None):
+        self._books = {}
+        self._detect_source_type = detect_source_type
+
+    def get(self, title, author, asin):
+        key = (title, author, asin)
+        book = self._books.get(key)
+        if book is None:
+            title, author, asin = _intern(title), _intern(author), _intern(asin)
+            source_type = None
+            if self._detect_source_type:
+                source_type = self._detect_source_type(title, author, asin)
+            book = Book(title, author, asin, source_type)
+            self._books[key] = book
+        return book
+
+    def __len__(self):
+        return len(self._books)
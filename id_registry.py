@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Persistent registry of book and quote IDs
+IDs are assigned once from content fingerprints (normalized author,
+title and quote text) and stored in quote_id_registry.json, so rebuilds
+reuse them instead of deriving bookIds from Python's per-process string
+hash or numbering quotes by output position. Book IDs keep the
+author_slug_NNNN format; quote IDs are never reused
+"""
+import sys
+import json
+import os
+import hashlib
+from quotes_export import QUOTES_PATH, load_quotes_json
+
+REGISTRY_PATH = 'quote_id_registry.json'
+REGISTRY_VERSION = 1
+
+def _normalize(value):
+    return ' '.join((value or '').split()).casefold()
+
+def _digest(*parts):
+    return hashlib.sha1('\x00'.join(parts).encode('utf-8')).hexdigest()[:16]
+
+def book_fingerprint(title, author):
+    return _digest(_normalize(author), _normalize(title))
+
+def quote_fingerprint(text, title, author):
+    return _digest(book_fingerprint(title, author), _normalize(text))
+
+def author_slug(author):
+    slug = (author or '').lower().replace(' ', '_').replace('.', '').replace("'", '')
+    return slug or 'unknown'
+
+class IdRegistry:
+    """Book and quote IDs by fingerprint, loaded from and saved to path"""
+
+    def __init__(self, path=REGISTRY_PATH):
+        self.path = path
+        self.books = {}
+        self.quotes = {}
+        self.next_quote_id = 1
+        self.new_books = 0
+        self.new_quotes = 0
+        self._book_ids = set()
+        self._quote_ids = set()
+
+    @classmethod
+    def load(cls, path=REGISTRY_PATH):
+        registry = cls(path)
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') != REGISTRY_VERSION:
+                print(f"Error: {path} is registry version {data.get('version')}, expected {REGISTRY_VERSION}")
+                sys.exit(1)
+            registry.books = data['books']
+            registry.quotes = data['quotes']
+            registry.next_quote_id = data['next_quote_id']
+            registry._book_ids = set(registry.books.values())
+            registry._quote_ids = set(registry.quotes.values())
+        return registry
+
+    def save(self):
+        data = {
+            'version': REGISTRY_VERSION,
+            'next_quote_id': self.next_quote_id,
+            'books': self.books,
+            'quotes': self.quotes,
+        }
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2, sort_keys=True)
+            f.write('\n')
+        os.replace(tmp_path, self.path)
+
+    def book_id(self, title, author):
+        """The book's ID, registering one (slug + title digest) if new"""
+        fingerprint = book_fingerprint(title, author)
+        book_id = self.books.get(fingerprint)
+        if book_id is not None:
+            return book_id
+
+        # Probe past IDs already held by other books of the same author slug
+        number = int(fingerprint[:8], 16) % 10000
+        while f"{author_slug(author)}_{number:04d}" in self._book_ids:
+            number = (number + 1) % 10000
+        book_id = f"{author_slug(author)}_{number:04d}"
+        self._register_book(fingerprint, book_id)
+        return book_id
+
+    def quote_id(self, text, title, author):
+        """The quote's ID, registering the next unused one if new"""
+        fingerprint = quote_fingerprint(text, title, author)
+        quote_id = self.quotes.get(fingerprint)
+        if quote_id is not None:
+            return quote_id
+
+        while self.next_quote_id in self._quote_ids:
+            self.next_quote_id += 1
+        quote_id = self.next_quote_id
+        self._register_quote(fingerprint, quote_id)
+        return quote_id
+
+    def assign(self, records):
+        """Set 'id' and 'bookId' of PageInstead quote records in place"""
+        for record in records:
+            record['bookId'] = self.book_id(record['bookTitle'], record['author'])
+            record['id'] = self.quote_id(record['text'], record['bookTitle'], record['author'])
+        return records
+
+    def adopt(self, records):
+        """Register the IDs existing quote records already use
+
+        Records whose IDs are taken by different content keep their
+        registered (or a fresh) ID instead. Returns the number adopted.
+        """
+        adopted = 0
+        for record in records:
+            fingerprint = book_fingerprint(record['bookTitle'], record['author'])
+            if fingerprint not in self.books and record['bookId'] not in self._book_ids:
+                self._register_book(fingerprint, record['bookId'])
+
+            fingerprint = quote_fingerprint(record['text'], record['bookTitle'], record['author'])
+            if fingerprint not in self.quotes and record['id'] not in self._quote_ids:
+                self._register_quote(fingerprint, record['id'])
+                adopted += 1
+        return adopted
+
+    def _register_book(self, fingerprint, book_id):
+        self.books[fingerprint] = book_id
+        self._book_ids.add(book_id)
+        self.new_books += 1
+
+    def _register_quote(self, fingerprint, quote_id):
+        self.quotes[fingerprint] = quote_id
+        self._quote_ids.add(quote_id)
+        self.next_quote_id = max(self.next_quote_id, quote_id + 1)
+        self.new_quotes += 1
+
+    def report(self):
+        print(f"🔖 ID registry {self.path}: {self.new_books} new books, {self.new_quotes} new quotes "
+              f"({len(self.books)} books, {len(self.quotes)} quotes in total)")
+
+def drop_duplicate_quotes(records):
+    """Keep the first record per quote ID (the same text from the same book)"""
+    seen = set()
+    unique = []
+    for record in records:
+        if record['id'] not in seen:
+            seen.add(record['id'])
+            unique.append(record)
+    if len(unique) < len(records):
+        print(f"⚠️  Dropped {len(records) - len(unique)} duplicate quotes (same text and book)")
+    return unique
+
+def main():
+    if len(sys.argv) < 2 or sys.argv[1] not in ('adopt', 'check'):
+        print("Usage: python id_registry.py adopt|check [quotes.json] [--registry PATH]")
+        print("\n  adopt   Register the IDs a quotes.json already uses (keeps shipped IDs stable)")
+        print("  check   Verify a quotes.json uses the registered IDs")
+        sys.exit(1)
+
+    command = sys.argv[1]
+    quotes_path = QUOTES_PATH
+    if len(sys.argv) > 2 and not sys.argv[2].startswith('--'):
+        quotes_path = sys.argv[2]
+    registry_path = REGISTRY_PATH
+    if '--registry' in sys.argv:
+        registry_path = sys.argv[sys.argv.index('--registry') + 1]
+
+    records = load_quotes_json(quotes_path)[0]['quotes']
+    registry = IdRegistry.load(registry_path)
+
+    if command == 'adopt':
+        adopted = registry.adopt(records)
+        registry.save()
+        print(f"✅ Adopted {adopted} of {len(records)} quote IDs from {quotes_path}")
+        registry.report()
+        return
+
+    mismatches = 0
+    for record in records:
+        book_id = registry.books.get(book_fingerprint(record['bookTitle'], record['author']))
+        quote_id = registry.quotes.get(quote_fingerprint(record['text'], record['bookTitle'], record['author']))
+        if quote_id != record['id'] or book_id != record['bookId']:
+            mismatches += 1
+    if mismatches:
+        print(f"❌ {mismatches} of {len(records)} quotes are unregistered or use other IDs")
+        sys.exit(1)
+    print(f"✅ All {len(records)} quotes use their registered IDs")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Persistent ingestion state for incremental curation runs
+Remembers which highlights were already filtered and scored, and keeps
+the best candidates per book so later runs only process new rows
+"""
+import hashlib
+import json
+import os
+from highlight_records import Book, Highlight
+from readwise_ingest import READWISE_COLUMNS, group_byte_range, group_rows
+
+STATE_VERSION = 1
+
+def highlight_fingerprint(title, row):
+    """Stable fingerprint of a highlight (edited text or notes count as new)"""
+    parts = (title, row.author, row.asin, row.highlight, row.note, row.location)
+    key = '\x1f'.join(p or '' for p in parts)
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()[:16]
+
+class IngestState:
+    """Per-curator record of processed highlights and per-book candidates
+
+    seen maps highlight fingerprint -> times processed, and books maps title -> {'author', 'asin', 'count', 'stats', 'candidates'}
+    where author/asin come from the book's first row, count is the number
+    of highlights seen, stats is the curator's filter funnel and
+    candidates is the current top-k as [author, asin, text, note,
+    location, score, realness] lists.
+    """
+
+    def __init__(self, path, rules_version):
+        self.path = path
+        self.rules_version = rules_version
+        self.source = {}
+        self.seen = {}
+        self.books = {}
+
+    @classmethod
+    def load(cls, path, rules_version):
+        """Load saved state, starting fresh if missing or built by other rules"""
+        state = cls(path, rules_version)
+        if not os.path.exists(path):
+            print(f"🆕 No ingestion state at {path}, processing everything")
+            return state
+
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+
+        if data.get('version') != STATE_VERSION or data.get('rules_version') != rules_version:
+            print(f"♻️  Ingestion state at {path} was built by other rules, processing everything")
+            return state
+
+        state.source = data['source']
+        state.seen = data['seen']
+        state.books = data['books']
+        print(f"📂 Loaded ingestion state: {sum(state.seen.values()):,} highlights already processed")
+        return state
+
+    def save(self):
+        data = {
+            'version': STATE_VERSION,
+            'rules_version': self.rules_version,
+            'source': self.source,
+            'seen': self.seen,
+            'books': self.books,
+        }
+        with open(self.path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+
+    def read_new_rows(self, csv_path, columns=READWISE_COLUMNS, keep=None, workers=1):
+        """Group rows not processed before by book title
+
+        When the export only grew (the previously processed bytes are an
+        unchanged prefix) just the appended tail is parsed; otherwise the
+        whole file is parsed and known rows are skipped by fingerprint.
+        """
+        size = os.path.getsize(csv_path)
+        prefix_size = self.source.get('size', 0)
+        hasher = hashlib.sha1()
+        tail_start = None
+
+        with open(csv_path, 'rb') as f:
+            if 0 < prefix_size <= size:
+                _hash_bytes(f, hasher, prefix_size)
+                if hasher.hexdigest() == self.source.get('sha1'):
+                    f.seek(prefix_size - 1)
+                    if f.read(1) == b'\n':
+                        tail_start = prefix_size
+            else:
+                prefix_size = 0
+            f.seek(prefix_size)
+            _hash_bytes(f, hasher, size - prefix_size)
+
+        if tail_start is not None:
+            groups = group_byte_range(csv_path, tail_start, size, columns, keep)
+        else:
+            groups = group_rows(csv_path, columns, keep, workers)
+
+        # Count occurrences, so repeated identical highlights stay distinct
+        new_groups = {}
+        occurrences = {}
+        for title, rows in groups.items():
+            new_rows = []
+            for row in rows:
+                fingerprint = highlight_fingerprint(title, row)
+                occurrence = occurrences.get(fingerprint, 0) + 1
+                occurrences[fingerprint] = occurrence
+                # Rows in an appended tail are new by construction
+                if tail_start is not None or occurrence > self.seen.get(fingerprint, 0):
+                    new_rows.append(row)
+            if new_rows:
+                new_groups[title] = new_rows
+
+        for fingerprint, occurrence in occurrences.items():
+            if tail_start is not None:
+                occurrence += self.seen.get(fingerprint, 0)
+            if occurrence > self.seen.get(fingerprint, 0):
+                self.seen[fingerprint] = occurrence
+
+        self.source = {'size': size, 'sha1': hasher.hexdigest()}
+        return new_groups
+
+    def merge_book(self, title, first_row, new_count, candidates, stats, rank_key, top_k):
+        """Fold a book's new rows into its stored count, funnel and top-k"""
+        book = self.books.get(title)
+        if book is None:
+            book = self.books[title] = {
+                'author': first_row.author,
+                'asin': first_row.asin,
+                'count': 0,
+                'stats': {},
+                'candidates': [],
+            }
+
+        book['count'] += new_count
+        for key, value in stats.items():
+            book['stats'][key] = book['stats'].get(key, 0) + value
+
+        # Stored candidates come first, so the stable sort keeps file order on ties
+        merged = self._highlights(title, book, None) + candidates
+        merged.sort(key=rank_key)
+        book['candidates'] = [
+            [h.author, h.asin, h.text, h.note, h.location, h.score, h.realness]
+            for h in merged[:top_k]
+        ]
+
+    def curated(self, min_highlights, registry, book_filter=None):
+        """Stored top-k per book, for books with enough highlights"""
+        curated = {}
+        for title, book in self.books.items():
+            if book['count'] < min_highlights:
+                continue
+            if book_filter and not book_filter(title, book['author'], book['asin']):
+                continue
+            curated[title] = self._highlights(title, book, registry)
+        return curated
+
+    def total_stats(self, min_highlights, book_filter=None):
+        """Summed filter funnel over the books curated() returns"""
+        totals = {}
+        for title, book in self.books.items():
+            if book['count'] < min_highlights:
+                continue
+            if book_filter and not book_filter(title, book['author'], book['asin']):
+                continue
+            for key, value in book['stats'].items():
+                totals[key] = totals.get(key, 0) + value
+        return totals
+
+    def highlight_counts(self):
+        """Highlights seen so far per book"""
+        return {title: book['count'] for title, book in self.books.items()}
+
+    def _highlights(self, title, book, registry):
+        """Rebuild a book's stored candidates as Highlight records"""
+        highlights = []
+        for author, asin, text, note, location, score, realness in book['candidates']:
+            if registry is not None:
+                owner = registry.get(title, author, asin)
+            else:
+                owner = Book(title, author, asin)
+            h = Highlight(owner, text, note, location, score)
+            h.realness = realness
+            highlights.append(h)
+        return highlights
+
+def _hash_bytes(f, hasher, length, block=1 << 20):
+    """Feed the next length bytes of f into hasher"""
+    while length > 0:
+        chunk = f.read(min(block, length))
+        if not chunk:
+            break
+        hasher.update(chunk)
+        length -= len(chunk)
+
+def parse_incremental_arg(argv, default_path):
+    """Read --incremental [STATE] from argv; returns the state path or None"""
+    for i, arg in enumerate(argv):
+        if arg == '--incremental':
+            if i + 1 < len(argv) and not argv[i + 1].startswith('--'):
+                return argv[i + 1]
+            return default_path
+    return None
@@ -0,0 +1,560 @@
+#!/usr/bin/env python3
+"""
+Learned quote scorer trained on past curation decisions
+Candidates exported to QUOTES_TO_CURATE.txt are the examples and the
+ones kept in kindle_quotes_final.json the positives. A linear model over
+word unigram/bigram counts and the realness score's structural features
+is fit to each book's picks, starting from (and regularized toward) the
+hand-tuned realness weights. Batches are tokenized in one pass and scored
+with NumPy; `curate_real_quotes.py --model` ranks with the model
+"""
+import sys
+import time
+import string
+import hashlib
+import numpy as np
+from highlight_features import CONJUNCTIONS, PRONOUNS, REALNESS_VERBS, extract_features
+
+MODEL_PATH = 'quote_scorer.npz'
+CANDIDATES_PATH = 'QUOTES_TO_CURATE.txt'
+FINAL_PATH = 'kindle_quotes_final.json'
+
+# Bump when featurization changes; older models are refused
+FEATURE_VERSION = 1
+
+# N-grams must occur in this many training texts to enter the vocabulary
+MIN_COUNT = 2
+
+# Training: full-batch AdaGrad on the within-book softmax loss, with L2
+# pulling n-gram weights toward 0 and structural weights toward the prior.
+# Weaker penalties overfit the few hundred past picks: held-out picks fall
+# below the prior's (the realness score's)
+EPOCHS = 300
+LEARNING_RATE = 0.2
+L2 = 30.0
+DENSE_L2 = 100.0
+
+# Realness points per unit of model output in the prior
+PRIOR_SCALE = 10
+
+# Largest first x second word bigram table scored by lookup; bigger
+# vocabularies fall back to binary search
+MAX_BIGRAM_TABLE = 1 << 22
+
+# Book-grouped folds for the held-out evaluation
+FOLDS = 5
+
+# Picks per book in QUOTES_TO_CURATE.txt
+PICKS_PER_BOOK = 2
+
+# N-gram words are runs of UTF-8 bytes between ASCII punctuation/whitespace
+# and the commonest typographic punctuation
+SEPARATORS = bytes(32 if chr(b) in string.punctuation + string.whitespace else b for b in range(256))
+TYPOGRAPHIC = [c.encode('utf-8') for c in '‘’“”—–…•']
+
+# Separates texts in a batch; survives tokenization as its own token
+TEXT_BREAK = '\x1f'
+
+# Counted exactly as the realness score counts them (HighlightFeatures)
+WORD_CLASSES = [REALNESS_VERBS, PRONOUNS, CONJUNCTIONS]
+
+STRUCTURAL_FEATURES = [
+    'length_under_40', 'length_40_120', 'length_121_180', 'length_over_180',
+    'complete_sentence', 'starts_upper', 'capital_and_punctuation',
+    'quote_marks', 'question', 'line_breaks',
+    'verbs', 'pronouns', 'conjunctions', 'articles', 'words', 'numbers', 'note',
+]
+
+def _prior():
+    # Hand-tuned realness weights (batch_scoring.REALNESS_WEIGHTS) per feature;
+    # the export has no notes, so the note weight keeps its prior
+    from batch_scoring import REALNESS_WEIGHTS as w
+    return np.array([
+        w['too_short'], w['optimal_length'], w['good_length'], 0,
+        w['complete_sentence'], 0, w['capital_and_punctuation'], w['quote_marks'], 0, 0,
+        w['verb'], w['pronoun'], w['conjunction'], w['article'], 0, 0, w['note'],
+    ], dtype=np.float64) / PRIOR_SCALE
+
+def ngram_words(lower):
+    """N-gram words (bytes) of lowercased text"""
+    data = lower.encode('utf-8')
+    for mark in TYPOGRAPHIC:
+        data = data.replace(mark, b' ')
+    return data.translate(SEPARATORS).split()
+
+def structural_row(text, note, features, words):
+    """STRUCTURAL_FEATURES of one highlight from its feature record"""
+    length = len(text)
+    return [
+        length < 40,
+        40 <= length <= 120,
+        121 <= length <= 180,
+        length > 180,
+        features.ends_with_punctuation,
+        features.starts_upper,
+        features.starts_upper and features.ends_with_punctuation,
+        '"' in text or "'" in text,
+        '?' in text,
+        features.line_breaks,
+        features.verb_count,
+        features.pronoun_count,
+        features.conjunction_count,
+        features.article_count,
+        len(words),
+        sum(word.isdigit() for word in words),
+        bool(note),
+    ]
+
+class Batch:
+    """Texts tokenized together, for n-gram ids and structural columns
+
+    The joined texts are split on spaces once; only distinct
+    space-separated tokens are lowercased, classified and broken into
+    n-gram words, then expanded back to every position with NumPy.
+    Lowercasing never makes or removes a space, so this matches
+    splitting each lowercased text.
+    """
+
+    def __init__(self, texts, notes=None):
+        self.size = len(texts)
+        raw = f' {TEXT_BREAK} '.join(texts).split(' ')
+
+        raw_index = {token: i for i, token in enumerate(dict.fromkeys(raw))}
+        raw_ids = np.fromiter(map(raw_index.__getitem__, raw), dtype=np.int64, count=len(raw))
+        # Lowercase each distinct token once; tokens that differ in case merge
+        distinct = list(dict.fromkeys(token.lower() for token in raw_index))
+        lower_index = {token: i for i, token in enumerate(distinct)}
+        raw_ids = np.array([lower_index[token.lower()] for token in raw_index], dtype=np.int64)[raw_ids]
+        raw_index = lower_index
+        text_of_raw = np.cumsum(raw_ids == raw_index.get(TEXT_BREAK, -1))
+
+        # N-gram words of each distinct token, flattened
+        words = {}
+        token_words = []
+        word_counts = []
+        for token in distinct:
+            ids = [words.setdefault(word, len(words)) for word in ngram_words(token)]
+            token_words.extend(ids)
+            word_counts.append(len(ids))
+        token_words = np.array(token_words, dtype=np.int64)
+        word_counts = np.array(word_counts, dtype=np.int64)
+        word_starts = np.cumsum(word_counts) - word_counts
+
+        lengths = word_counts[raw_ids]
+        offsets = np.repeat(word_starts[raw_ids] - (np.cumsum(lengths) - lengths), lengths)
+        ids = token_words[offsets + np.arange(int(lengths.sum()))] if len(offsets) else offsets
+        text_of = np.repeat(text_of_raw, lengths)
+
+        breaks = ids == words.get(TEXT_BREAK.encode('utf-8'), -1)
+        self.words = list(words)
+        self.index = words
+        self.ids = ids[~breaks]
+        self.text_of = text_of[~breaks]
+        # Adjacent words of the same text
+        self.pair_mask = self.text_of[1:] == self.text_of[:-1]
+
+        columns = [self.per_text(np.ones(len(self.ids)))]
+        numeric = np.array([word.isdigit() for word in self.words], dtype=np.float64)
+        columns.append(self.per_text(numeric[self.ids]) if len(self.ids) else np.zeros(self.size))
+
+        # Distinct members of each word class among the space-split tokens,
+        # via a texts x class-words presence matrix
+        class_words = {word: i for i, word in enumerate(sorted(set().union(*WORD_CLASSES)))}
+        class_word_of = np.array([class_words.get(token, -1) for token in distinct], dtype=np.int64)[raw_ids]
+        hits = class_word_of >= 0
+        present = np.zeros((self.size + 1, len(class_words)), dtype=bool)
+        present[text_of_raw[hits], class_word_of[hits]] = True
+        class_columns = [
+            present[:self.size, [class_words[word] for word in word_class]].sum(axis=1)
+            for word_class in WORD_CLASSES
+        ]
+
+        articles = self._article_counts(raw_ids, raw_index, text_of_raw)
+
+        lengths = np.array([len(t) for t in texts], dtype=np.int64)
+        complete = np.array([t.endswith(('.', '!', '?', '"')) for t in texts], dtype=bool)
+        upper = np.array([t[:1].isupper() for t in texts], dtype=bool)
+        self.dense = np.column_stack([
+            lengths < 40,
+            (lengths >= 40) & (lengths <= 120),
+            (lengths >= 121) & (lengths <= 180),
+            lengths > 180,
+            complete,
+            upper,
+            complete & upper,
+            ['"' in t or "'" in t for t in texts],
+            ['?' in t for t in texts],
+            [t.count('\n') for t in texts],
+            *class_columns,
+            articles,
+            *columns,
+            [bool(note) for note in notes] if notes is not None else np.zeros(self.size),
+        ]).astype(np.float64) if texts else np.zeros((0, len(STRUCTURAL_FEATURES)))
+
+    def _article_counts(self, raw_ids, raw_index, text_of_raw):
+        """lower.count(' a ') + ' an ' + ' the ' of every text, from its tokens
+
+        A token counts when spaces surround it inside its text; of a run of
+        adjacent equal tokens every other one does, as the non-overlapping
+        substring count shares the space between them.
+        """
+        counts = np.zeros(self.size)
+        breaks = raw_ids == raw_index.get(TEXT_BREAK, -1)
+        inner = np.ones(len(raw_ids), dtype=bool)
+        if len(inner):
+            inner[0] = inner[-1] = False
+        inner[1:] &= ~breaks[:-1]
+        inner[:-1] &= ~breaks[1:]
+        for article in ('a', 'an', 'the'):
+            positions = np.flatnonzero(inner & (raw_ids == raw_index.get(article, -1)))
+            if not len(positions):
+                continue
+            starts = np.flatnonzero(np.r_[True, np.diff(positions) != 1])
+            run_lengths = np.diff(np.r_[starts, len(positions)])
+            counts += np.bincount(text_of_raw[positions[starts]], weights=(run_lengths + 1) // 2, minlength=self.size)[:self.size]
+        return counts
+
+    def per_text(self, values):
+        return np.bincount(self.text_of, weights=values, minlength=self.size)
+
+    def pair_codes(self):
+        """Bigram codes first_id * words + second_id of adjacent words"""
+        return self.ids[:-1][self.pair_mask] * len(self.words) + self.ids[1:][self.pair_mask]
+
+class LinearQuoteScorer:
+    """Linear model: n-gram count weights + weights of standardized structure"""
+
+    def __init__(self, vocabulary, gram_weights, dense_weights, mean, scale):
+        self.vocabulary = list(vocabulary)
+        self.gram_weights = np.asarray(gram_weights, dtype=np.float64)
+        self.dense_weights = np.asarray(dense_weights, dtype=np.float64)
+        self.mean = np.asarray(mean, dtype=np.float64)
+        self.scale = np.asarray(scale, dtype=np.float64)
+
+        # Folded for inference: n-gram bytes -> weight, and standardization
+        # absorbed into the dense weights and an offset
+        self.lookup = {
+            gram.encode('utf-8'): weight
+            for gram, weight in zip(self.vocabulary, self.gram_weights.tolist()) if weight
+        }
+        self.folded_dense = self.dense_weights / self.scale
+        self.offset = -float(self.folded_dense @ self.mean)
+
+        # For batches: ids for the model's n-gram words, unigram weights by
+        # id, and bigram weights by (rank of first word, rank of second word)
+        self.word_ids = {}
+        unigrams = []
+        bigrams = []
+        for gram, weight in self.lookup.items():
+            first, _, second = gram.partition(b' ')
+            first = self.word_ids.setdefault(first, len(self.word_ids))
+            if second:
+                bigrams.append((first, self.word_ids.setdefault(second, len(self.word_ids)), weight))
+            else:
+                unigrams.append((first, weight))
+        firsts = {}
+        seconds = {}
+        for first, second, _ in bigrams:
+            firsts.setdefault(first, len(firsts))
+            seconds.setdefault(second, len(seconds))
+
+        # One extra slot each, so word id -1 (not in the model) finds 0 / -1
+        self.unigram_weights = np.zeros(len(self.word_ids) + 1)
+        self.first_rank = np.full(len(self.word_ids) + 1, -1, dtype=np.int64)
+        self.second_rank = np.full(len(self.word_ids) + 1, -1, dtype=np.int64)
+        for word, weight in unigrams:
+            self.unigram_weights[word] = weight
+        self.first_rank[list(firsts)] = list(firsts.values())
+        self.second_rank[list(seconds)] = list(seconds.values())
+
+        self.bigram_width = len(seconds)
+        codes = np.array([firsts[first] * len(seconds) + seconds[second] for first, second, _ in bigrams], dtype=np.int64)
+        weights = np.array([weight for _, _, weight in bigrams], dtype=np.float64)
+        if len(firsts) * len(seconds) <= MAX_BIGRAM_TABLE:
+            self.bigram_table = np.zeros(len(firsts) * len(seconds))
+            self.bigram_table[codes] = weights
+        else:
+            self.bigram_table = None
+            order = np.argsort(codes)
+            self.bigram_codes = codes[order]
+            self.bigram_weights = weights[order]
+
+        hasher = hashlib.sha1()
+        for array in (self.gram_weights, self.dense_weights, self.mean, self.scale):
+            hasher.update(array.tobytes())
+        hasher.update('\n'.join(self.vocabulary).encode('utf-8'))
+        self.digest = hasher.hexdigest()[:12]
+
+    def logits(self, batch):
+        """Model outputs of every text in a Batch"""
+        model_id = np.array([self.word_ids.get(word, -1) for word in batch.words], dtype=np.int64)
+        grams = batch.per_text(self.unigram_weights[model_id][batch.ids])
+
+        # Adjacent words of a text that are a model bigram's first and second
+        firsts = self.first_rank[model_id][batch.ids[:-1][batch.pair_mask]]
+        seconds = self.second_rank[model_id][batch.ids[1:][batch.pair_mask]]
+        candidates = (firsts >= 0) & (seconds >= 0)
+        pairs = firsts[candidates] * self.bigram_width + seconds[candidates]
+        if self.bigram_table is not None:
+            pair_weights = self.bigram_table[pairs]
+        else:
+            positions = np.minimum(np.searchsorted(self.bigram_codes, pairs), len(self.bigram_codes) - 1)
+            pair_weights = np.where(self.bigram_codes[positions] == pairs, self.bigram_weights[positions], 0.0)
+
+        pair_texts = batch.text_of[1:][batch.pair_mask]
+        grams = grams + np.bincount(pair_texts[candidates], weights=pair_weights, minlength=batch.size)
+        return self.offset + grams + batch.dense @ self.folded_dense
+
+    def score_texts(self, texts, notes=None):
+        """Integer scores (model output x 100) of many texts; an int64 array"""
+        return _to_scores(self.logits(Batch(texts, notes)))
+
+    def score(self, highlight, features=None):
+        """Score of one highlight, in place of its realness score"""
+        text = highlight.text
+        if features is None:
+            features = extract_features(text)
+        words = ngram_words(features.lower)
+        lookup = self.lookup
+        value = sum(lookup.get(word, 0.0) for word in words)
+        value += sum(lookup.get(a + b' ' + b, 0.0) for a, b in zip(words, words[1:]))
+        value += float(np.dot(self.folded_dense, structural_row(text, highlight.note, features, words)))
+        return int(_to_scores(np.array([self.offset + value]))[0])
+
+    def save(self, path):
+        np.savez_compressed(
+            path,
+            feature_version=np.array(FEATURE_VERSION),
+            vocabulary=np.array(self.vocabulary, dtype=str),
+            gram_weights=self.gram_weights,
+            dense_weights=self.dense_weights,
+            mean=self.mean,
+            scale=self.scale,
+        )
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as data:
+            if int(data['feature_version']) != FEATURE_VERSION:
+                print(f"Error: {path} was trained with other features; retrain with learned_scorer.py train")
+                sys.exit(1)
+            return cls(
+                data['vocabulary'].tolist(), data['gram_weights'], data['dense_weights'],
+                data['mean'], data['scale'],
+            )
+
+def _to_scores(logits):
+    return np.rint(logits * 100).astype(np.int64)
+
+def load_examples(candidates_path=CANDIDATES_PATH, final_path=FINAL_PATH):
+    """(book_title, text, kept) for every exported candidate
+
+    Kept quotes are matched by text: finalizing may rename books.
+    """
+    from finalize_quotes import parse_curated_txt
+    from quotes_export import load_quotes_json
+
+    kept = {q['text'] for q in load_quotes_json(final_path)[0]['quotes']}
+
+    examples = []
+    seen = set()
+    for q in parse_curated_txt(candidates_path):
+        if q.text not in seen:
+            seen.add(q.text)
+            examples.append((q.book_title, q.text, q.text in kept))
+    return examples
+
+def train(texts, labels, groups, epochs=EPOCHS):
+    """Fit a LinearQuoteScorer to texts with 0/1 kept labels
+
+    groups gives each text's book (any hashable); the loss is the
+    softmax over each book's candidates, since picks are per book.
+    """
+    batch = Batch(texts)
+    words = len(batch.words)
+
+    # Unigram codes are word ids, bigram codes follow after all words
+    codes = np.concatenate([batch.ids, words + batch.pair_codes()])
+    rows = np.concatenate([batch.text_of, batch.text_of[1:][batch.pair_mask]])
+    keys, counts = np.unique(rows * (words + words * words) + codes, return_counts=True)
+    rows, codes = np.divmod(keys, words + words * words)
+
+    # Vocabulary: codes found in MIN_COUNT or more texts
+    distinct, document_frequency = np.unique(codes, return_counts=True)
+    vocabulary_codes = distinct[document_frequency >= MIN_COUNT]
+    keep = np.isin(codes, vocabulary_codes)
+    rows, columns, values = rows[keep], np.searchsorted(vocabulary_codes, codes[keep]), counts[keep].astype(np.float64)
+
+    def gram(code):
+        if code < words:
+            return batch.words[code].decode('utf-8')
+        first, second = divmod(code - words, words)
+        return (batch.words[first] + b' ' + batch.words[second]).decode('utf-8')
+    vocabulary = [gram(code) for code in vocabulary_codes.tolist()]
+
+    dense = batch.dense
+    mean = dense.mean(axis=0) if batch.size else np.zeros(len(STRUCTURAL_FEATURES))
+    scale = dense.std(axis=0) if batch.size else np.ones(len(STRUCTURAL_FEATURES))
+    scale[scale == 0] = 1
+    dense = (dense - mean) / scale
+
+    group_index = {}
+    group_of = np.array([group_index.setdefault(g, len(group_index)) for g in groups], dtype=np.int64)
+    y = np.asarray(labels, dtype=np.float64)
+    picks = np.bincount(group_of, weights=y, minlength=len(group_index))[group_of]
+    n = max(len(y), 1)
+
+    gram_weights = np.zeros(len(vocabulary))
+    prior = _prior() * scale
+    dense_weights = prior.copy()
+    gram_history = np.zeros_like(gram_weights)
+    dense_history = np.zeros_like(dense_weights)
+
+    for _ in range(epochs):
+        logits = dense @ dense_weights + np.bincount(rows, weights=gram_weights[columns] * values, minlength=len(y))
+
+        # Softmax within each book
+        top = np.full(len(group_index), -np.inf)
+        np.maximum.at(top, group_of, logits)
+        weights = np.exp(logits - top[group_of])
+        probabilities = weights / np.bincount(group_of, weights=weights, minlength=len(group_index))[group_of]
+        residual = (picks * probabilities - y) / n
+
+        gram_gradient = np.bincount(columns, weights=residual[rows] * values, minlength=len(vocabulary)) + L2 * gram_weights
+        dense_gradient = dense.T @ residual + DENSE_L2 * (dense_weights - prior)
+
+        gram_history += gram_gradient ** 2
+        dense_history += dense_gradient ** 2
+        gram_weights -= LEARNING_RATE * gram_gradient / (np.sqrt(gram_history) + 1e-8)
+        dense_weights -= LEARNING_RATE * dense_gradient / (np.sqrt(dense_history) + 1e-8)
+
+    return LinearQuoteScorer(vocabulary, gram_weights, dense_weights, mean, scale)
+
+def picks_found(examples, scores):
+    """Kept quotes that rank in their book's top PICKS_PER_BOOK by score"""
+    books = {}
+    for (title, text, kept), score in zip(examples, scores):
+        books.setdefault(title, []).append((-score, len(text), kept))
+    return sum(
+        sum(kept for _, _, kept in sorted(ranked)[:PICKS_PER_BOOK])
+        for ranked in books.values()
+    )
+
+def realness_baseline(examples):
+    """Hand-tuned realness scores of the examples (no notes in the export)"""
+    from curate_real_quotes import RealQuoteCurator
+    from highlight_records import Highlight
+
+    curator = RealQuoteCurator(None)
+    return [
+        curator._calculate_realness_score(Highlight(None, text), extract_features(text))
+        for _, text, _ in examples
+    ]
+
+def cross_validate(examples, folds=FOLDS):
+    """Held-out scores of every example from book-grouped folds"""
+    titles = sorted({title for title, _, _ in examples})
+    fold_of = {title: i % folds for i, title in enumerate(titles)}
+    scores = [0] * len(examples)
+    for fold in range(folds):
+        train_set = [e for e in examples if fold_of[e[0]] != fold]
+        test_indices = [i for i, e in enumerate(examples) if fold_of[e[0]] == fold]
+        if not train_set or not test_indices:
+            continue
+        model = train(*zip(*[(text, kept, title) for title, text, kept in train_set]))
+        held_out = model.score_texts([examples[i][1] for i in test_indices])
+        for i, score in zip(test_indices, held_out.tolist()):
+            scores[i] = score
+    return scores
+
+def parse_path_arg(argv, flag, default):
+    if flag in argv:
+        return argv[argv.index(flag) + 1]
+    return default
+
+def parse_model_arg(argv):
+    """Read --model [PATH] from argv; returns the model path or None"""
+    for i, arg in enumerate(argv):
+        if arg == '--model':
+            if i + 1 < len(argv) and not argv[i + 1].startswith('--'):
+                return argv[i + 1]
+            return MODEL_PATH
+    return None
+
+def main():
+    if len(sys.argv) < 2 or sys.argv[1] not in ('train', 'score'):
+        print("Usage: python learned_scorer.py train [--candidates TXT] [--final JSON] [--model PATH] [--force]")
+        print("       python learned_scorer.py score <readwise_csv> [--model PATH] [--check]")
+        print("\ntrain  Fit the model on past curation decisions and report held-out picks")
+        print("       The model is saved only if it finds more held-out picks than the")
+        print("       realness score; --force saves it anyway")
+        print("score  Batch-score every highlight of an export and report timings")
+        print("       --check verifies batch scores equal the one-at-a-time scorer")
+        print("Rank curation with it: python curate_real_quotes.py <readwise_csv> --model [PATH]")
+        sys.exit(1)
+
+    model_path = parse_path_arg(sys.argv, '--model', MODEL_PATH)
+
+    if sys.argv[1] == 'train':
+        examples = load_examples(
+            parse_path_arg(sys.argv, '--candidates', CANDIDATES_PATH),
+            parse_path_arg(sys.argv, '--final', FINAL_PATH),
+        )
+        positives = sum(kept for _, _, kept in examples)
+        books = len({title for title, _, _ in examples})
+        print(f"✅ {len(examples)} candidates from {books} books, {positives} kept")
+
+        print(f"\n🔍 Evaluating on {FOLDS} book-grouped folds...")
+        baseline = picks_found(examples, realness_baseline(examples))
+        found = picks_found(examples, cross_validate(examples))
+        print(f"  Realness score: {baseline} of {positives} kept quotes in top {PICKS_PER_BOOK}")
+        print(f"  Learned model:  {found} of {positives} kept quotes in top {PICKS_PER_BOOK} ({found - baseline:+d} vs realness)")
+        if found <= baseline:
+            if '--force' not in sys.argv:
+                print("\n⚠️  The learned model does not beat the realness score; not saving it (--force to save anyway)")
+                sys.exit(1)
+            print("\n⚠️  The learned model does not beat the realness score; saving it anyway (--force)")
+
+        print("\n🧮 Training on all candidates...")
+        start = time.perf_counter()
+        model = train(*zip(*[(text, kept, title) for title, text, kept in examples]))
+        print(f"✅ Trained in {time.perf_counter() - start:.2f}s ({len(model.vocabulary):,} n-grams)")
+
+        ranked = sorted(zip(model.dense_weights.tolist(), STRUCTURAL_FEATURES), reverse=True)
+        print("\n📊 Structural weights (standardized):")
+        for weight, name in ranked:
+            print(f"  {name:25} {weight:+.3f}")
+
+        model.save(model_path)
+        print(f"\n💾 Saved model to {model_path}")
+    else:
+        if len(sys.argv) < 3:
+            print("Usage: python learned_scorer.py score <readwise_csv> [--model PATH] [--check]")
+            sys.exit(1)
+        from readwise_ingest import has_title_and_text, iter_rows
+        from highlight_records import Highlight
+
+        model = LinearQuoteScorer.load(model_path)
+        texts = [row.highlight for row in iter_rows(sys.argv[2]) if has_title_and_text(row)]
+        print(f"✅ Loaded {len(texts):,} highlights")
+
+        start = time.perf_counter()
+        scores = model.score_texts(texts)
+        elapsed = time.perf_counter() - start
+        print(f"⚡ Scored {len(texts):,} highlights in {elapsed * 1000:.0f} ms")
+        if len(scores):
+            print(f"📊 Score: mean {scores.mean():.1f}, max {scores.max()}")
+
+        if '--check' in sys.argv:
+            print("\n🔍 Checking against the one-at-a-time scorer...")
+            mismatches = sum(
+                model.score(Highlight(None, text)) != score
+                for text, score in zip(texts, scores.tolist())
+            )
+            if mismatches:
+                print(f"❌ {mismatches} scores differ")
+                sys.exit(1)
+            print(f"✅ All {len(texts):,} scores identical")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""
+Near-duplicate detection for highlights and quotes
+Texts are reduced to word-bigram shingles, summarized with MinHash
+signatures (computed for the whole corpus at once with NumPy) and
+bucketed with locality-sensitive hashing; only texts sharing a bucket
+are compared exactly, so clustering stays roughly linear in corpus size
+"""
+import re
+import sys
+import time
+import zlib
+import numpy as np
+from readwise_ingest import has_title_and_text, iter_rows
+
+# Share of the smaller text's shingles that must appear in the other text
+DEFAULT_THRESHOLD = 0.7
+
+# Texts with fewer shingles than this only match exact copies
+MIN_SHINGLES = 3
+
+# 42 bands of 3 rows: pairs with Jaccard ~0.3 (a short highlight inside a
+# longer re-highlight) still share a bucket most of the time
+LSH_BANDS = 42
+LSH_ROWS = 3
+NUM_PERM = LSH_BANDS * LSH_ROWS
+
+# Fixed seed, so signatures and clusters are the same on every run
+SEED = 20240611
+
+WORD_PATTERN = re.compile(r'[^\W_]+')
+
+def shingles(text):
+    """Word bigrams of the normalized text (single words for one-word texts)"""
+    words = WORD_PATTERN.findall(text.lower())
+    if len(words) < 2:
+        return frozenset(words)
+    return frozenset(f'{a} {b}' for a, b in zip(words, words[1:]))
+
+def _hash_shingles(shingle_set):
+    return [zlib.crc32(s.encode('utf-8')) for s in shingle_set]
+
+def minhash_signatures(shingle_sets, num_perm=NUM_PERM, block=1 << 20):
+    """MinHash signature matrix (texts x num_perm, uint32) for non-empty sets
+
+    Uses multiply-shift hashing h(x) = ((a*x + b) mod 2^64) >> 32 with
+    odd a, evaluated for all shingles of all texts in vectorized blocks.
+    """
+    rng = np.random.default_rng(SEED)
+    a = rng.integers(1, 1 << 63, size=num_perm, dtype=np.uint64) | np.uint64(1)
+    b = rng.integers(0, 1 << 63, size=num_perm, dtype=np.uint64)
+
+    hashes = [_hash_shingles(s) for s in shingle_sets]
+    lengths = np.fromiter((len(h) for h in hashes), dtype=np.int64, count=len(hashes))
+    values = np.fromiter((v for h in hashes for v in h), dtype=np.uint64, count=int(lengths.sum()))
+    starts = np.concatenate(([0], np.cumsum(lengths)[:-1])) if len(lengths) else lengths
+
+    signatures = np.empty((len(hashes), num_perm), dtype=np.uint32)
+
+    # Whole texts per block, so each block reduces to complete signatures
+    first = 0
+    while first < len(hashes):
+        last = first + 1
+        while last < len(hashes) and starts[last] - starts[first] + lengths[last] <= block:
+            last += 1
+        lo = starts[first]
+        hi = starts[last - 1] + lengths[last - 1]
+        chunk = values[lo:hi]
+        offsets = starts[first:last] - lo
+        with np.errstate(over='ignore'):
+            for p in range(num_perm):
+                hashed = (a[p] * chunk + b[p]) >> np.uint64(32)
+                signatures[first:last, p] = np.minimum.reduceat(hashed, offsets)
+        first = last
+
+    return signatures
+
+def candidate_pairs(signatures, bands=LSH_BANDS, rows=LSH_ROWS):
+    """Index pairs (i < j) whose signatures agree on at least one band"""
+    pairs = set()
+    count = len(signatures)
+    if count < 2:
+        return pairs
+
+    for band in range(bands):
+        part = signatures[:, band * rows:(band + 1) * rows]
+        keys = np.ascontiguousarray(part).view(np.dtype((np.void, part.dtype.itemsize * rows))).ravel()
+        order = np.argsort(keys, kind='stable')
+        sorted_keys = keys[order]
+        # Runs of equal keys are the band's buckets; only shared ones matter
+        boundaries = np.flatnonzero(sorted_keys[1:] != sorted_keys[:-1]) + 1
+        starts = np.concatenate(([0], boundaries))
+        ends = np.concatenate((boundaries, [count]))
+        for start, end in zip(starts[ends - starts > 1].tolist(), ends[ends - starts > 1].tolist()):
+            members = sorted(order[start:end].tolist())
+            for x, i in enumerate(members):
+                for j in members[x + 1:]:
+                    pairs.add((i, j))
+    return pairs
+
+def is_near_duplicate(a, b, threshold=DEFAULT_THRESHOLD):
+    """Exact check on two shingle sets: overlap with the smaller one"""
+    smaller = min(len(a), len(b))
+    if smaller < MIN_SHINGLES:
+        return a == b
+    return len(a & b) / smaller >= threshold
+
+def near_duplicate_clusters(texts, threshold=DEFAULT_THRESHOLD, preference=None):
+    """Groups of indices into texts that overlap as near-duplicates
+
+    Texts are visited in preference order (indices, best first; input
+    order by default). Each joins the best earlier representative it is
+    a near-duplicate of, or becomes a representative itself. Every member
+    is thus checked against its cluster's representative directly: the
+    overlap is asymmetric, so a short text inside two long ones must not
+    chain them together. Only groups with two or more members are
+    returned, each sorted, in order of their first member. Identical
+    texts (after normalization) always cluster.
+    """
+    # Exact copies share one slot and are hashed once
+    slot_of = {}
+    slots = []
+    text_slot = [None] * len(texts)
+    for i, text in enumerate(texts):
+        s = shingles(text)
+        if not s:
+            continue
+        slot = slot_of.get(s)
+        if slot is None:
+            slot = slot_of[s] = len(slots)
+            slots.append(s)
+        text_slot[i] = slot
+
+    neighbors = [[] for _ in slots]
+    if len(slots) > 1:
+        signatures = minhash_signatures(slots)
+        for x, y in candidate_pairs(signatures):
+            neighbors[x].append(y)
+            neighbors[y].append(x)
+
+    # Representative text per slot, and each representative's members
+    representative = {}
+    clusters = {}
+    rank = {}
+    for i in (range(len(texts)) if preference is None else preference):
+        slot = text_slot[i]
+        if slot is None:
+            continue
+        rank[i] = len(rank)
+        matches = [representative[slot]] if slot in representative else []
+        matches += [representative[other] for other in neighbors[slot]
+                    if other in representative and is_near_duplicate(slots[slot], slots[other], threshold)]
+        if matches:
+            clusters[min(matches, key=rank.get)].append(i)
+        else:
+            representative[slot] = i
+            clusters[i] = [i]
+
+    return sorted(sorted(members) for members in clusters.values() if len(members) > 1)
+
+def drop_near_duplicates(items, text_of, rank_key, threshold=DEFAULT_THRESHOLD):
+    """Keep only the best member (smallest rank_key, then earliest) per cluster
+
+    Returns (kept_items, dropped_count) with kept items in input order.
+    """
+    preference = sorted(range(len(items)), key=lambda i: (rank_key(items[i]), i))
+    clusters = near_duplicate_clusters([text_of(item) for item in items], threshold, preference)
+    dropped = set()
+    for members in clusters:
+        best = min(members, key=lambda i: (rank_key(items[i]), i))
+        dropped.update(i for i in members if i != best)
+    kept = [item for i, item in enumerate(items) if i not in dropped]
+    return kept, len(dropped)
+
+def drop_near_duplicate_candidates(candidates, rank_key, threshold=DEFAULT_THRESHOLD):
+    """drop_near_duplicates over every book's candidates at once
+
+    candidates maps book title -> highlights; near-duplicates are found
+    across books too. Returns (new mapping, dropped_count).
+    """
+    flat = [(title, h) for title, highlights in candidates.items() for h in highlights]
+    kept, dropped = drop_near_duplicates(flat, lambda item: item[1].text, lambda item: rank_key(item[1]), threshold)
+
+    deduped = {title: [] for title in candidates}
+    for title, h in kept:
+        deduped[title].append(h)
+    return deduped, dropped
+
+def parse_dedupe_arg(argv):
+    """Read --dedupe [THRESHOLD] from argv; returns the threshold or None"""
+    for i, arg in enumerate(argv):
+        if arg == '--dedupe':
+            if i + 1 < len(argv) and not argv[i + 1].startswith('--'):
+                try:
+                    return float(argv[i + 1])
+                except ValueError:
+                    print("Error: --dedupe threshold must be a number between 0 and 1")
+                    sys.exit(1)
+            return DEFAULT_THRESHOLD
+    return None
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage: python near_duplicates.py <readwise_csv> [--dedupe THRESHOLD] [--show N]")
+        print("\nReports near-duplicate highlight clusters across the whole export.")
+        sys.exit(1)
+
+    csv_path = sys.argv[1]
+    threshold = parse_dedupe_arg(sys.argv) or DEFAULT_THRESHOLD
+    show = 10
+    if '--show' in sys.argv:
+        show = int(sys.argv[sys.argv.index('--show') + 1])
+
+    print("📖 Loading Readwise CSV...")
+    rows = [row for row in iter_rows(csv_path) if has_title_and_text(row)]
+    print(f"✅ Loaded {len(rows):,} highlights")
+
+    print(f"\n🔍 Clustering near-duplicates (threshold {threshold})...")
+    start = time.perf_counter()
+    clusters = near_duplicate_clusters([row.highlight for row in rows], threshold)
+    elapsed = time.perf_counter() - start
+
+    duplicates = sum(len(members) - 1 for members in clusters)
+    print(f"✅ {len(clusters):,} clusters, {duplicates:,} redundant highlights ({elapsed:.1f}s)")
+
+    for members in clusters[:show]:
+        print("\n" + "-" * 60)
+        for i in members[:5]:
+            row = rows[i]
+            print(f"  [{row.book_title}] {row.highlight[:100]}")
+        if len(members) > 5:
+            print(f"  ... and {len(members) - 5} more")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+"""
+Process-pool curation across books
+Books are independent, so their groups are split into chunks of similar
+total size and curated in worker processes; results are keyed by book so
+callers rebuild output in the original book order
+"""
+import heapq
+from concurrent.futures import ProcessPoolExecutor
+
+# Chunks per worker, so one slow chunk doesn't leave the others idle
+CHUNKS_PER_WORKER = 4
+
+def balanced_chunks(groups, parts):
+    """Split (book_title, items) groups into up to parts chunks of similar size
+
+    Largest books go first, each onto the currently lightest chunk.
+    Sorting is stable and ties pick the lowest chunk, so the split is
+    deterministic.
+    """
+    loads = [(0, i) for i in range(max(parts, 1))]
+    chunks = [[] for _ in loads]
+    for title, items in sorted(groups, key=lambda group: -len(group[1])):
+        load, i = heapq.heappop(loads)
+        chunks[i].append((title, items))
+        heapq.heappush(loads, (load + len(items), i))
+    return [chunk for chunk in chunks if chunk]
+
+def curate_books_parallel(worker, groups, workers):
+    """Run worker over balanced chunks of groups in a process pool
+
+    worker is a module-level function taking a chunk and returning a
+    dict keyed by book title; the merged dict is returned.
+    """
+    chunks = balanced_chunks(groups, workers * CHUNKS_PER_WORKER)
+    results = {}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for partial in pool.map(worker, chunks):
+            results.update(partial)
+    return results
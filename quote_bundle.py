@@ -0,0 +1,302 @@
+#!/usr/bin/env python3
+"""
+Compact binary quote bundle, an export target next to quotes.json
+Strings (text, titles, authors, tags, dates...) are deduplicated into one
+UTF-8 string table; quotes and books are fixed-width records that refer
+to it by index. Every section is 4-byte aligned and located through the
+header, so a reader can memory-map the file and decode a single quote
+(by position, by ID or by place in the active rotation) without
+touching the rest. A CRC32 over the file guards against truncation
+
+Layout (little-endian):
+  header      magic, version, counts, lastUpdated string, CRC32
+  sections    (offset, length) of each section below, from file start
+  records     per quote: id, text, book, cover, dateAdded, tag range, flags
+  books       per book: bookId, title, author, asin
+  tag refs    string indices, sliced by each record's tag range
+  id index    (id, position) pairs sorted by id
+  active      positions of active quotes, in file (rotation) order
+  offsets     string_count + 1 byte offsets into the string blob
+  strings     UTF-8 string blob
+"""
+import sys
+import mmap
+import os
+import struct
+import zlib
+from quotes_export import QUOTES_PATH, cover_url, load_quotes_json
+
+BUNDLE_PATH = 'PageInstead/Resources/quotes.bin'
+BUNDLE_MAGIC = b'PIQUOTES'
+BUNDLE_VERSION = 1
+
+HEADER = struct.Struct('<8sHHIIIII')
+SECTIONS = ['records', 'books', 'tag_refs', 'id_index', 'active', 'string_offsets', 'strings']
+SECTION = struct.Struct('<II')
+DATA_START = HEADER.size + SECTION.size * len(SECTIONS)
+CHECKSUM_OFFSET = HEADER.size - 4
+
+# id, text, book, cover, dateAdded, first tag ref, tag count, flags
+RECORD = struct.Struct('<IIIIIIHH')
+# bookId, title, author, asin
+BOOK = struct.Struct('<IIII')
+ID_ENTRY = struct.Struct('<II')
+UINT32 = struct.Struct('<I')
+
+# String index sentinels for None and for the cover URL derived from the ASIN
+NO_STRING = 0xFFFFFFFF
+DERIVED_COVER = 0xFFFFFFFE
+
+FLAG_ACTIVE = 1
+
+class BundleError(Exception):
+    """A bundle file that is not valid (bad magic, version or checksum)"""
+
+def _checksum(data):
+    """CRC32 of the file with the checksum field itself read as zero"""
+    crc = zlib.crc32(data[:CHECKSUM_OFFSET])
+    crc = zlib.crc32(b'\x00\x00\x00\x00', crc)
+    return zlib.crc32(data[CHECKSUM_OFFSET + 4:], crc)
+
+def build_bundle(doc):
+    """Bundle bytes for a version 1 layout quotes document"""
+    strings = []
+    string_index = {}
+
+    def intern(value):
+        if value is None:
+            return NO_STRING
+        index = string_index.get(value)
+        if index is None:
+            index = string_index[value] = len(strings)
+            strings.append(value)
+        return index
+
+    last_updated = intern(doc['lastUpdated'])
+    books = []
+    book_index = {}
+    records = bytearray()
+    tag_refs = bytearray()
+    active = bytearray()
+    tag_count = 0
+
+    for position, quote in enumerate(doc['quotes']):
+        book_key = (quote['bookId'], quote['bookTitle'], quote['author'], quote['asin'])
+        if book_key not in book_index:
+            book_index[book_key] = len(books)
+            books.append(BOOK.pack(*(intern(value) for value in book_key)))
+
+        cover = quote['coverImageURL']
+        cover = DERIVED_COVER if cover is not None and cover == cover_url(quote['asin']) else intern(cover)
+
+        for tag in quote['tags']:
+            tag_refs += UINT32.pack(intern(tag))
+        records += RECORD.pack(
+            quote['id'], intern(quote['text']), book_index[book_key], cover, intern(quote['dateAdded']),
+            tag_count, len(quote['tags']), FLAG_ACTIVE if quote['isActive'] else 0
+        )
+        tag_count += len(quote['tags'])
+        if quote['isActive']:
+            active += UINT32.pack(position)
+
+    id_index = b''.join(
+        ID_ENTRY.pack(quote['id'], position)
+        for position, quote in sorted(enumerate(doc['quotes']), key=lambda item: item[1]['id'])
+    )
+
+    blob = bytearray()
+    offsets = bytearray()
+    for value in strings:
+        offsets += UINT32.pack(len(blob))
+        blob += value.encode('utf-8')
+    offsets += UINT32.pack(len(blob))
+
+    sections = [records, b''.join(books), tag_refs, id_index, active, offsets, blob]
+    table = bytearray()
+    body = bytearray()
+    for section in sections:
+        table += SECTION.pack(DATA_START + len(body), len(section))
+        body += section
+
+    data = bytearray(HEADER.pack(BUNDLE_MAGIC, BUNDLE_VERSION, 0, len(doc['quotes']), len(books),
+                                 len(strings), last_updated, 0))
+    data += table
+    data += body
+    struct.pack_into('<I', data, CHECKSUM_OFFSET, _checksum(data))
+    return bytes(data)
+
+def write_bundle(doc, path):
+    """Write the bundle for a version 1 layout document; returns its size"""
+    data = build_bundle(doc)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+    return len(data)
+
+class QuoteBundle:
+    """Reference reader: memory-maps a bundle and decodes quotes on demand
+
+    Quotes come back as version 1 records (the same dicts quotes.json
+    holds). Use as a context manager, or close() when done.
+    """
+
+    def __init__(self, path, verify=True):
+        with open(path, 'rb') as f:
+            self.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            self._read_header(verify)
+        except (BundleError, struct.error):
+            self.data.close()
+            raise
+
+    def _read_header(self, verify):
+        data = self.data
+        if len(data) < DATA_START:
+            raise BundleError("file is too short for a quote bundle")
+        magic, version, _, self.quote_count, self.book_count, self.string_count, last_updated, checksum = \
+            HEADER.unpack_from(data, 0)
+        if magic != BUNDLE_MAGIC:
+            raise BundleError("not a quote bundle")
+        if version != BUNDLE_VERSION:
+            raise BundleError(f"bundle version {version}, expected {BUNDLE_VERSION}")
+        if verify and _checksum(data) != checksum:
+            raise BundleError("checksum mismatch")
+
+        self.sections = {}
+        for i, name in enumerate(SECTIONS):
+            offset, length = SECTION.unpack_from(data, HEADER.size + i * SECTION.size)
+            if offset + length > len(data):
+                raise BundleError(f"section {name} runs past the end of the file")
+            self.sections[name] = offset
+        self.active_count = SECTION.unpack_from(data, HEADER.size + SECTIONS.index('active') * SECTION.size)[1] // 4
+        self.last_updated = self.string(last_updated)
+
+    def close(self):
+        self.data.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return self.quote_count
+
+    def string(self, index):
+        if index == NO_STRING:
+            return None
+        start, end = struct.unpack_from('<II', self.data, self.sections['string_offsets'] + index * 4)
+        base = self.sections['strings']
+        return self.data[base + start:base + end].decode('utf-8')
+
+    def quote(self, position):
+        """The quote at position (file order)"""
+        if not 0 <= position < self.quote_count:
+            raise IndexError(position)
+        quote_id, text, book, cover, date_added, first_tag, tag_count, flags = \
+            RECORD.unpack_from(self.data, self.sections['records'] + position * RECORD.size)
+        book_id, title, author, asin = BOOK.unpack_from(self.data, self.sections['books'] + book * BOOK.size)
+        asin = self.string(asin)
+        tag_base = self.sections['tag_refs'] + first_tag * 4
+        return {
+            'id': quote_id,
+            'text': self.string(text),
+            'author': self.string(author),
+            'bookTitle': self.string(title),
+            'bookId': self.string(book_id),
+            'asin': asin,
+            'coverImageURL': cover_url(asin) if cover == DERIVED_COVER else self.string(cover),
+            'isActive': bool(flags & FLAG_ACTIVE),
+            'tags': [self.string(UINT32.unpack_from(self.data, tag_base + i * 4)[0]) for i in range(tag_count)],
+            'dateAdded': self.string(date_added),
+        }
+
+    def position_of(self, quote_id):
+        """Position of the quote with quote_id (binary search of the ID index), or None"""
+        base = self.sections['id_index']
+        low, high = 0, self.quote_count
+        while low < high:
+            middle = (low + high) // 2
+            entry_id, position = ID_ENTRY.unpack_from(self.data, base + middle * ID_ENTRY.size)
+            if entry_id == quote_id:
+                return position
+            if entry_id < quote_id:
+                low = middle + 1
+            else:
+                high = middle
+        return None
+
+    def quote_by_id(self, quote_id):
+        position = self.position_of(quote_id)
+        return None if position is None else self.quote(position)
+
+    def active_quote(self, n):
+        """The nth active quote, as the scheduler counts them"""
+        if not 0 <= n < self.active_count:
+            raise IndexError(n)
+        (position,) = UINT32.unpack_from(self.data, self.sections['active'] + n * 4)
+        return self.quote(position)
+
+    def to_doc(self):
+        """The whole bundle as a version 1 layout document"""
+        return {
+            'version': 1,
+            'lastUpdated': self.last_updated,
+            'quotes': [self.quote(position) for position in range(self.quote_count)],
+        }
+
+def verify_bundle(doc, path):
+    """Problems reading path back against doc's quotes ([] when identical)"""
+    problems = []
+    with QuoteBundle(path) as bundle:
+        if bundle.last_updated != doc['lastUpdated']:
+            problems.append("lastUpdated differs")
+        if bundle.to_doc()['quotes'] != doc['quotes']:
+            problems.append("quotes differ")
+        for quote in doc['quotes']:
+            if bundle.quote_by_id(quote['id']) != quote:
+                problems.append(f"lookup of quote {quote['id']} by ID differs")
+                break
+        active = [quote for quote in doc['quotes'] if quote['isActive']]
+        if [bundle.active_quote(n) for n in range(bundle.active_count)] != active:
+            problems.append("active rotation differs")
+    return problems
+
+def export_bundle(doc, path):
+    """Write and verify the bundle for a document, stopping on a mismatch"""
+    size = write_bundle(doc, path)
+    problems = verify_bundle(doc, path)
+    if problems:
+        print(f"❌ {path} does not round-trip: {'; '.join(problems)}")
+        sys.exit(1)
+    print(f"📦 Wrote {path}: {len(doc['quotes'])} quotes in {size / 1024:.1f} KB (round-trip verified)")
+    return size
+
+def parse_bundle_arg(argv, default_path=BUNDLE_PATH):
+    """Read --bundle [PATH] from argv; returns the bundle path or None"""
+    for i, arg in enumerate(argv):
+        if arg == '--bundle':
+            if i + 1 < len(argv) and not argv[i + 1].startswith('--'):
+                return argv[i + 1]
+            return default_path
+    return None
+
+def main():
+    if '--help' in sys.argv:
+        print("Usage: python quote_bundle.py [quotes.json] [bundle]")
+        print(f"\nWrites the binary bundle for quotes.json (default: {QUOTES_PATH} -> {BUNDLE_PATH})")
+        print("and verifies it reads back to the same quotes.")
+        sys.exit(1)
+
+    args = [arg for arg in sys.argv[1:] if not arg.startswith('--')]
+    quotes_path = args[0] if args else QUOTES_PATH
+    bundle_path = args[1] if len(args) > 1 else BUNDLE_PATH
+
+    doc, _ = load_quotes_json(quotes_path)
+    export_bundle(doc, bundle_path)
+    print(f"📊 {quotes_path}: {os.path.getsize(quotes_path) / 1024:.1f} KB as JSON")
+
+if __name__ == "__main__":
+    main()
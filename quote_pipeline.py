@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+End-to-end quote pipeline in one process
+Runs ingest -> filter/score -> tag -> dedupe -> select -> shuffle ->
+export on in-memory records, replacing the curate_real_quotes.py ->
+QUOTES_TO_CURATE.txt -> auto_select_top2.py -> retag_quotes.py ->
+shuffle_quotes.py chain. Only the final quotes.json (and, on request, the
+curation file, binary bundle and schedule table) is written; every stage
+is timed. With --stage-cache, stage outputs are reused while their
+input, settings and code are unchanged
+"""
+import sys
+import random
+from datetime import datetime
+import auto_select_top2
+import candidate_selection
+import classification_memo
+import curate_real_quotes
+import diverse_selection
+import highlight_cache
+import highlight_features
+import highlight_records
+import parallel_curation
+import quote_tagging
+import readwise_ingest
+import retag_quotes
+import shuffle_quotes
+from readwise_ingest import parse_workers_arg
+from highlight_records import BookRegistry, Highlight
+from curate_real_quotes import RealQuoteCurator
+from auto_select_top2 import clean_book_title, pageinstead_quotes
+from retag_quotes import extract_better_tags
+from shuffle_quotes import shuffle_quotes_intelligently
+from diverse_selection import PER_BOOK_CAP, select_diverse_by_book, parse_diverse_arg
+from classification_memo import ClassificationMemo, parse_memo_arg
+from stage_cache import CACHE_DIR, Stage, StagePipeline, StageTimer, file_digest
+from id_registry import IdRegistry, drop_duplicate_quotes
+from quotes_export import QUOTES_PATH, write_quotes_json, parse_format_arg
+from quote_bundle import BUNDLE_PATH, export_bundle, parse_bundle_arg
+from schedule_oracle import SCHEDULE_PATH, export_schedule, parse_schedule_arg
+
+CURATION_PATH = 'QUOTES_TO_CURATE.txt'
+MIN_HIGHLIGHTS = 5
+
+def tag_books(curated):
+    """[(book, candidates)] with cleaned titles and retag_quotes' tags
+
+    Books are in title order, as auto_select_top2 reads them from the
+    curation file; candidates stay best-first.
+    """
+    registry = BookRegistry()
+    books = []
+    for title in sorted(curated):
+        candidates = curated[title]
+        if not candidates:
+            continue
+        first = candidates[0]
+        book = registry.get(clean_book_title(title), first.author or 'Unknown', first.asin)
+        books.append((book, [
+            Highlight(book, h.text, h.note, score=h.score, tags=extract_better_tags(h.text, book.title))
+            for h in candidates
+        ]))
+    return books
+
+def dedupe_books(books, threshold):
+    """Drop near-duplicate candidates across books; returns (books, dropped)"""
+    from near_duplicates import drop_near_duplicate_candidates
+    candidates = {i: quotes for i, (_, quotes) in enumerate(books)}
+    deduped, dropped = drop_near_duplicate_candidates(candidates, lambda h: (-h.score, h.length), threshold)
+    return [(book, deduped[i]) for i, (book, _) in enumerate(books) if deduped[i]], dropped
+
+def build_stages(curator, registry, workers, cache, memo_path, dedupe, diverse_budget, seed):
+    """The pipeline's stages, each with the settings that shape its output
+
+    IDs are taken from the registry before shuffling, so new quotes are
+    numbered in title order; export re-applies them to cached output.
+    Each stage lists the modules it runs; their local imports are hashed
+    too (see stage_cache.source_digest). Modules needing NumPy are listed
+    by name, so building the stages does not import them.
+    """
+    this_module = sys.modules[__name__]
+
+    def ingest(_):
+        curator.load_csv(min_highlights=MIN_HIGHLIGHTS, workers=workers, cache=cache)
+        return curator.books
+
+    def filter_and_score(books):
+        curator.books = books
+        if memo_path:
+            curator.memo = ClassificationMemo('real', curator.rules_version(), memo_path)
+        curated = curator.select_real_quotes(workers=workers)
+        if curator.memo is not None:
+            curator.memo.report()
+            curator.memo.close()
+            curator.memo = None
+
+        # Tags come from later steps, so this output stays valid across tag rule edits
+        for highlights in curated.values():
+            for h in highlights:
+                h.tags = None
+        return curated
+
+    def tag(curated):
+        books = tag_books(curated)
+        print(f"✅ Tagged {sum(len(quotes) for _, quotes in books)} candidates in {len(books)} books")
+        return books
+
+    def drop_duplicates(books):
+        books, dropped = dedupe_books(books, dedupe)
+        print(f"✅ Dropped {dropped} near-duplicate candidates")
+        return books
+
+    def select(books):
+        if diverse_budget is not None:
+            books = select_diverse_by_book(books, diverse_budget or None)
+        else:
+            books = [(book, quotes[:PER_BOOK_CAP]) for book, quotes in books]
+        print(f"✅ Selected {sum(len(quotes) for _, quotes in books)} quotes from {len(books)} books")
+        return books
+
+    def shuffle(books):
+        if seed is not None:
+            random.seed(seed)
+        return shuffle_quotes_intelligently(pageinstead_quotes(books, registry))
+
+    stages = [
+        Stage('ingest', ingest, {'min_highlights': MIN_HIGHLIGHTS},
+              [readwise_ingest, curate_real_quotes, highlight_records, highlight_cache]),
+        Stage('filter + score', filter_and_score, {'rules': curator.rules_version()},
+              [curate_real_quotes, highlight_features, 'learned_scorer', candidate_selection,
+               parallel_curation, classification_memo, highlight_records]),
+        Stage('tag', tag, {}, [retag_quotes, quote_tagging, auto_select_top2, highlight_records],
+              scripts=[this_module]),
+    ]
+    if dedupe is not None:
+        stages.append(Stage('dedupe', drop_duplicates, {'threshold': dedupe}, ['near_duplicates'],
+                            scripts=[this_module]))
+    stages.extend([
+        Stage('select', select, {'budget': diverse_budget, 'per_book': PER_BOOK_CAP},
+              [diverse_selection], scripts=[this_module]),
+        Stage('shuffle', shuffle, {'seed': seed}, [shuffle_quotes, auto_select_top2], cacheable=seed is not None),
+    ])
+    return stages
+
+def print_plan(pipeline, wanted):
+    print("\n📋 PIPELINE PLAN:")
+    for name, status, reason in pipeline.plan(wanted):
+        icon = {'cached': '✅', 'run': '🔄', 'not needed': '⏭️ '}[status]
+        detail = f" ({reason})" if reason else ''
+        print(f"  {icon} {name:15} {status}{detail}")
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage: python quote_pipeline.py <readwise_csv> [options]")
+        print("\nBuilds quotes.json from a Readwise export in one process.")
+        print("\nOptions:")
+        print(f"  --output PATH           Where to write quotes.json (default: {QUOTES_PATH})")
+        print("  --merge                 Update the existing output in place (keeps dateAdded, writes a changeset)")
+        print("  --format-version N      Write format 1 (default) or the normalized, compact 2")
+        print(f"  --bundle [PATH]         Also write the binary quote bundle (default: {BUNDLE_PATH})")
+        print(f"  --schedule [PATH]       Also write the day x window schedule table (default: {SCHEDULE_PATH})")
+        print(f"  --curation-file [PATH]  Also write the manual curation file (default: {CURATION_PATH})")
+        print("  --diverse [N]           Select N quotes across books for coverage (default: top 2 per book)")
+        print("  --dedupe [T]            Drop near-duplicate candidates (overlap >= T, default 0.7)")
+        print("  --seed N                Seed the shuffle for a reproducible order")
+        print("  --workers N             Parse and curate with N processes (0 = all cores)")
+        print("  --cache                 Reuse parsed highlights cached from an earlier run")
+        print("  --memo [PATH]           Reuse classifications memoized by earlier runs (SQLite)")
+        print("  --model [PATH]          Rank with a learned model (see learned_scorer.py)")
+        print(f"  --stage-cache [DIR]     Reuse unchanged stages' outputs (default: {CACHE_DIR})")
+        print("  --plan                  Show which stages would be recomputed, then exit")
+        sys.exit(1)
+
+    csv_path = sys.argv[1]
+    output_path = QUOTES_PATH
+    if '--output' in sys.argv:
+        output_path = sys.argv[sys.argv.index('--output') + 1]
+    curation_path = None
+    if '--curation-file' in sys.argv:
+        i = sys.argv.index('--curation-file')
+        if i + 1 < len(sys.argv) and not sys.argv[i + 1].startswith('--'):
+            curation_path = sys.argv[i + 1]
+        else:
+            curation_path = CURATION_PATH
+    seed = None
+    if '--seed' in sys.argv:
+        seed = int(sys.argv[sys.argv.index('--seed') + 1])
+    cache_dir = None
+    if '--stage-cache' in sys.argv:
+        i = sys.argv.index('--stage-cache')
+        if i + 1 < len(sys.argv) and not sys.argv[i + 1].startswith('--'):
+            cache_dir = sys.argv[i + 1]
+        else:
+            cache_dir = CACHE_DIR
+    elif '--plan' in sys.argv:
+        cache_dir = CACHE_DIR
+    workers = parse_workers_arg(sys.argv)
+    dedupe = None
+    if '--dedupe' in sys.argv:
+        # near_duplicates needs NumPy; only load it when deduping
+        from near_duplicates import parse_dedupe_arg
+        dedupe = parse_dedupe_arg(sys.argv)
+    diverse_budget = parse_diverse_arg(sys.argv)
+
+    curator = RealQuoteCurator(csv_path)
+    if '--model' in sys.argv:
+        # learned_scorer needs NumPy; only load it when ranking with a model
+        from learned_scorer import LinearQuoteScorer, parse_model_arg
+        model_path = parse_model_arg(sys.argv)
+        curator.ranker = LinearQuoteScorer.load(model_path)
+        print(f"🧠 Ranking with learned model {model_path}")
+
+    registry = IdRegistry.load()
+    timer = StageTimer()
+    stages = build_stages(curator, registry, workers, '--cache' in sys.argv, parse_memo_arg(sys.argv),
+                          dedupe, diverse_budget, seed)
+    pipeline = StagePipeline(stages, file_digest(csv_path), cache_dir, timer)
+    wanted = ['filter + score', 'shuffle'] if curation_path else ['shuffle']
+
+    if '--plan' in sys.argv:
+        print_plan(pipeline, wanted)
+        sys.exit(0)
+
+    if curation_path:
+        curated = pipeline.output('filter + score')
+        with timer.stage('curation file'):
+            curator.export_for_manual_curation(curated, curation_path)
+
+    quotes = pipeline.output('shuffle')
+
+    with timer.stage('export'):
+        # Cached shuffle output carries the date it was built; stamp today's
+        today = datetime.now().strftime('%Y-%m-%d')
+        for quote in quotes:
+            quote['dateAdded'] = today
+        quotes = drop_duplicate_quotes(registry.assign(quotes))
+        written = write_quotes_json(quotes, output_path, merge='--merge' in sys.argv,
+                                    format_version=parse_format_arg(sys.argv))
+        print(f"✅ Exported {len(quotes)} quotes to {output_path}")
+        bundle_path = parse_bundle_arg(sys.argv)
+        if bundle_path:
+            export_bundle(written, bundle_path)
+        schedule_path = parse_schedule_arg(sys.argv)
+        if schedule_path:
+            export_schedule(written, schedule_path)
+        registry.save()
+        registry.report()
+
+    # What the app's rotation makes of this order over a year (see schedule_simulator.py)
+    try:
+        from schedule_simulator import simulate_and_summarize
+    except ImportError:
+        print("⚠️  NumPy is not installed, skipping the schedule simulation")
+    else:
+        with timer.stage('simulate'):
+            simulate_and_summarize(written['quotes'])
+
+    timer.report()
+
+if __name__ == "__main__":
+    main()
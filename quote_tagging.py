@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Shared quote tagging engine
+One tag taxonomy for every tool, compiled into a lookup of whole words
+and their regular inflections, so a single scan over a text's words
+finds every tag ("read" no longer matches inside "already")
+"""
+import re
+import textwrap
+
+# Tag -> keywords; every curator, converter and retagger uses this taxonomy
+TAXONOMY = {
+    'business': ['business', 'company', 'startup', 'entrepreneur', 'market', 'customer', 'product', 'revenue', 'profit'],
+    'leadership': ['lead', 'leader', 'leadership', 'manage', 'manager', 'team', 'organization', 'ceo', 'executive'],
+    'strategy': ['strategy', 'strategic', 'plan', 'goal', 'objective', 'vision', 'mission'],
+    'creativity': ['creative', 'create', 'innovation', 'innovate', 'design', 'invent', 'original'],
+    'success': ['success', 'achieve', 'accomplish', 'win', 'excel', 'performance'],
+    'wisdom': ['wisdom', 'wise', 'knowledge', 'truth', 'understand', 'insight', 'principle'],
+    'life': ['life', 'lives', 'living', 'alive', 'exist', 'human', 'people', 'world'],
+    'learning': ['learn', 'education', 'teach', 'study', 'skill', 'practice', 'training'],
+    'courage': ['courage', 'brave', 'strength', 'bold', 'risk', 'fear'],
+    'discipline': ['discipline', 'focus', 'habit', 'routine', 'consistent', 'commitment'],
+    'inspiration': ['inspire', 'inspiration', 'motivate', 'hope', 'aspire'],
+    'reading': ['read', 'reading', 'book', 'library', 'libraries', 'page', 'story', 'chapter', 'write', 'author'],
+    'love': ['love', 'heart', 'soul', 'passion', 'care', 'compassion'],
+    'freedom': ['free', 'freedom', 'liberty', 'independent', 'choice'],
+    'imagination': ['imagine', 'imagination', 'dream', 'vision', 'possibility'],
+    'happiness': ['happy', 'happiness', 'joy', 'delight', 'pleasure'],
+    'power': ['power', 'powerful', 'influence', 'control', 'authority'],
+    'thinking': ['think', 'thought', 'mind', 'idea', 'reflect', 'consider'],
+    'communication': ['communicate', 'speak', 'talk', 'say', 'tell', 'listen', 'conversation'],
+    'decision': ['decide', 'decision', 'choice', 'choose', 'judgment'],
+    'magic': ['magic', 'magical'],
+    'friendship': ['friend', 'friendship'],
+    'adventure': ['adventure', 'journey', 'travel'],
+}
+
+# Runs of letters; apostrophes, hyphens and digits separate words
+WORD_PATTERN = re.compile(r'[^\W\d_]+')
+
+VOWELS = 'aeiou'
+
+def word_forms(keyword):
+    """A keyword plus its regular inflections (plural, -ed, -ing, -ly)"""
+    forms = {keyword}
+    if keyword.endswith('e'):
+        forms.update([keyword + 's', keyword + 'd', keyword[:-1] + 'ing', keyword + 'ing', keyword + 'ly'])
+    elif keyword.endswith('y') and len(keyword) > 2 and keyword[-2] not in VOWELS:
+        stem = keyword[:-1]
+        forms.update([stem + 'ies', stem + 'ied', keyword + 'ing', stem + 'ily'])
+    else:
+        plural = 'es' if keyword.endswith(('s', 'x', 'z', 'ch', 'sh')) else 's'
+        forms.update([keyword + plural, keyword + 'ed', keyword + 'ing', keyword + 'ly'])
+        if keyword.endswith('ic'):
+            forms.add(keyword + 'ally')
+        # plan -> planned, win -> winning
+        if (len(keyword) >= 3 and keyword[-1] not in VOWELS + 'wxy'
+                and keyword[-2] in VOWELS and keyword[-3] not in VOWELS):
+            forms.update([keyword + keyword[-1] + 'ed', keyword + keyword[-1] + 'ing'])
+    return forms
+
+class TagMatcher:
+    """Precompiled word-form -> tags lookup for one taxonomy"""
+
+    def __init__(self, taxonomy):
+        self.tags = list(taxonomy)
+        index = {}
+        for tag, keywords in taxonomy.items():
+            for keyword in keywords:
+                for form in word_forms(keyword.lower()):
+                    index.setdefault(form, set()).add(tag)
+        self.index = {form: frozenset(tags) for form, tags in index.items()}
+
+    def match(self, text):
+        """Every tag with a keyword among text's words"""
+        found = set()
+        index = self.index
+        for word in WORD_PATTERN.findall(text.lower()):
+            tags = index.get(word)
+            if tags:
+                found |= tags
+        return found
+
+    def first_match(self, text, default=None):
+        """The earliest tag in taxonomy order that text matches"""
+        found = self.match(text)
+        for tag in self.tags:
+            if tag in found:
+                return tag
+        return default
+
+TAGGER = TagMatcher(TAXONOMY)
+
+def match_tags(text):
+    """Tags of the shared taxonomy found in text"""
+    return TAGGER.match(text)
+
+def format_tag_options(width=72):
+    """The taxonomy's tag names wrapped for curation file headers"""
+    return textwrap.fill(', '.join(TAXONOMY), width) + '\n'
@@ -0,0 +1,361 @@
+#!/usr/bin/env python3
+"""
+Shared quotes.json reader and writer, with an incremental merge mode
+A full export rewrites the document. A merge export updates an existing
+quotes.json in place: quotes keep their position and original dateAdded,
+only new or changed entries are rewritten, quotes missing from the
+build are retired (isActive false, so history lookups by ID still
+resolve) and a machine-readable changeset is written alongside.
+
+Format version 1 is what the app decodes: one flat record per quote.
+Version 2 is normalized and compact: authors and books are stored once
+and referenced by index, coverImageURL is left out when it is the one
+derived from the ASIN, isActive only when false, and the JSON has no
+indentation. Everything here works on version 1 records and converts at
+the file boundary; run this file to convert between the two.
+
+Both versions carry precomputed lookup indexes (active IDs, IDs by tag
+and by book, newest-first order, tag vocabulary), rebuilt on every
+write and checked against the quotes after export, so the app can
+answer its queries by lookup instead of rescanning all quotes. Version
+1 writes each index on one line
+"""
+import sys
+import json
+import os
+from datetime import datetime
+
+QUOTES_PATH = 'PageInstead/Resources/quotes.json'
+QUOTES_FORMAT_VERSION = 1
+QUOTES_FORMAT_VERSIONS = (1, 2)
+
+# Fields compared to decide whether an existing quote changed
+COMPARED_FIELDS = ['text', 'author', 'bookTitle', 'bookId', 'asin', 'coverImageURL', 'isActive', 'tags']
+
+def changeset_path_for(output_path):
+    """quotes.json -> quotes.changes.json"""
+    root, _ = os.path.splitext(output_path)
+    return root + '.changes.json'
+
+def cover_url(asin):
+    """The Amazon cover image URL for an ASIN (None without one)"""
+    if not asin:
+        return None
+    return f"https://m.media-amazon.com/images/P/{asin}.jpg"
+
+def build_indexes(quotes):
+    """Lookup indexes over version 1 quote records, in QuoteService's semantics
+
+    activeIds keeps file order (the scheduler's rotation order); the
+    by-tag and by-book postings cover inactive quotes too, like
+    getQuotes(byTag:)/getQuotes(byBookId:). recentIds is newest
+    dateAdded first, file order among equal dates.
+    """
+    ids_by_tag = {}
+    ids_by_book = {}
+    for quote in quotes:
+        for tag in quote['tags']:
+            ids_by_tag.setdefault(tag, []).append(quote['id'])
+        ids_by_book.setdefault(quote['bookId'], []).append(quote['id'])
+
+    tags = sorted(ids_by_tag)
+    return {
+        'activeIds': [quote['id'] for quote in quotes if quote['isActive']],
+        'tags': tags,
+        'idsByTag': {tag: ids_by_tag[tag] for tag in tags},
+        'idsByBookId': ids_by_book,
+        'recentIds': [quote['id'] for quote in sorted(quotes, key=lambda q: q['dateAdded'], reverse=True)],
+    }
+
+def validate_indexes(doc):
+    """Problems with a version 1 layout document's indexes ([] when valid)"""
+    problems = []
+    ids = [quote['id'] for quote in doc['quotes']]
+    if len(set(ids)) != len(ids):
+        problems.append(f"{len(ids) - len(set(ids))} duplicate quote IDs")
+
+    indexes = doc.get('indexes')
+    if indexes is None:
+        return problems + ['no indexes']
+    expected = build_indexes(doc['quotes'])
+    for name in expected:
+        if name not in indexes:
+            problems.append(f"index {name} is missing")
+        elif indexes[name] != expected[name]:
+            problems.append(f"index {name} does not match the quotes")
+    return problems
+
+def normalize_quotes(doc):
+    """Version 1 document -> version 2 (authors/books tables, derived fields left out)"""
+    authors = []
+    author_index = {}
+    books = []
+    book_index = {}
+    quotes = []
+
+    for record in doc['quotes']:
+        author = record['author']
+        if author not in author_index:
+            author_index[author] = len(authors)
+            authors.append(author)
+
+        book_key = (record['bookId'], record['bookTitle'], author, record['asin'])
+        if book_key not in book_index:
+            book_index[book_key] = len(books)
+            book = {'id': record['bookId'], 'title': record['bookTitle'], 'author': author_index[author]}
+            if record['asin']:
+                book['asin'] = record['asin']
+            books.append(book)
+
+        quote = {'id': record['id'], 'text': record['text'], 'book': book_index[book_key]}
+        if record['coverImageURL'] != cover_url(record['asin']):
+            quote['coverImageURL'] = record['coverImageURL']
+        if not record['isActive']:
+            quote['isActive'] = False
+        quote['tags'] = record['tags']
+        quote['dateAdded'] = record['dateAdded']
+        quotes.append(quote)
+
+    normalized = {
+        'version': 2,
+        'lastUpdated': doc['lastUpdated'],
+        'authors': authors,
+        'books': books,
+        'quotes': quotes,
+    }
+    if 'indexes' in doc:
+        normalized['indexes'] = doc['indexes']
+    return normalized
+
+def expand_quotes(doc):
+    """Version 2 document -> version 1 (one flat record per quote)"""
+    authors = doc['authors']
+    books = doc['books']
+    records = []
+    for quote in doc['quotes']:
+        book = books[quote['book']]
+        asin = book.get('asin')
+        records.append({
+            'id': quote['id'],
+            'text': quote['text'],
+            'author': authors[book['author']],
+            'bookTitle': book['title'],
+            'bookId': book['id'],
+            'asin': asin,
+            'coverImageURL': quote.get('coverImageURL', cover_url(asin)),
+            'isActive': quote.get('isActive', True),
+            'tags': quote['tags'],
+            'dateAdded': quote['dateAdded'],
+        })
+    expanded = {'version': 1, 'lastUpdated': doc['lastUpdated'], 'quotes': records}
+    if 'indexes' in doc:
+        expanded['indexes'] = doc['indexes']
+    return expanded
+
+def load_quotes_json(path):
+    """Read a quotes.json of either format version
+
+    Returns (document in version 1 layout, the file's format version).
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        doc = json.load(f)
+    version = doc.get('version')
+    if version not in QUOTES_FORMAT_VERSIONS:
+        print(f"Error: {path} is quotes format version {version}, expected one of {QUOTES_FORMAT_VERSIONS}")
+        sys.exit(1)
+    if version == 2:
+        doc = expand_quotes(doc)
+    return doc, version
+
+def save_quotes_json(doc, path, format_version=QUOTES_FORMAT_VERSION):
+    """Write a version 1 layout document to path as format_version, with fresh indexes"""
+    doc = dict(doc, indexes=build_indexes(doc['quotes']))
+    if format_version == 2:
+        _dump(normalize_quotes(doc), path, compact=True)
+    else:
+        _dump(doc, path)
+
+def _readable_json(data):
+    """Indented JSON, except that each lookup index is written on one line
+
+    Indenting the indexes would add a line per ID they list.
+    """
+    if 'indexes' not in data:
+        return json.dumps(data, indent=2, ensure_ascii=False)
+    text = json.dumps({key: value for key, value in data.items() if key != 'indexes'}, indent=2, ensure_ascii=False)
+    indexes = ',\n'.join(
+        f'    {json.dumps(name)}: {json.dumps(index, separators=(",", ":"), ensure_ascii=False)}'
+        for name, index in data['indexes'].items()
+    )
+    # Reopen the closing brace to append the indexes as the last key
+    return text[:-2] + f',\n  "indexes": {{\n{indexes}\n  }}\n}}'
+
+def _dump(data, path, compact=False):
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        if compact:
+            json.dump(data, f, separators=(',', ':'), ensure_ascii=False)
+        else:
+            f.write(_readable_json(data))
+    os.replace(tmp_path, path)
+
+def merge_quotes(existing, records, today):
+    """Merge freshly built records into existing ones, matched by id
+
+    Returns (quotes, changes): existing quotes in their order followed by
+    additions, and the ids added, changed (with old/new values), retired
+    and left unchanged.
+    """
+    built = {record['id']: record for record in records}
+    changes = {'added': [], 'changed': [], 'retired': [], 'unchanged': 0}
+    quotes = []
+
+    for old in existing:
+        new = built.get(old['id'])
+        if new is None:
+            if old.get('isActive', True):
+                old = dict(old, isActive=False)
+                changes['retired'].append(old['id'])
+            else:
+                changes['unchanged'] += 1
+            quotes.append(old)
+            continue
+
+        fields = {
+            name: {'old': old.get(name), 'new': new.get(name)}
+            for name in COMPARED_FIELDS
+            if old.get(name) != new.get(name)
+        }
+        if fields:
+            quotes.append(dict(new, dateAdded=old.get('dateAdded', today)))
+            changes['changed'].append({'id': old['id'], 'fields': fields})
+        else:
+            quotes.append(old)
+            changes['unchanged'] += 1
+
+    existing_ids = {old['id'] for old in existing}
+    for record in records:
+        if record['id'] not in existing_ids:
+            quotes.append(dict(record, dateAdded=today))
+            changes['added'].append(record['id'])
+
+    return quotes, changes
+
+def write_quotes_json(records, output_path, merge=False, format_version=None):
+    """Write PageInstead quote records to output_path
+
+    With merge, an existing file is updated incrementally (see
+    merge_quotes) and the changeset written next to it. format_version
+    defaults to 1, or to the existing file's version when merging.
+    Returns the document as written, in version 1 layout.
+    """
+    today = datetime.now().strftime('%Y-%m-%d')
+
+    if not merge:
+        data = {'version': 1, 'lastUpdated': today, 'quotes': records}
+        save_quotes_json(data, output_path, format_version or QUOTES_FORMAT_VERSION)
+        check_written_quotes(output_path)
+        return data
+
+    existing = {'version': 1, 'lastUpdated': today, 'quotes': []}
+    existing_version = format_version or QUOTES_FORMAT_VERSION
+    if os.path.exists(output_path):
+        existing, existing_version = load_quotes_json(output_path)
+
+    quotes, changes = merge_quotes(existing['quotes'], records, today)
+    modified = changes['added'] or changes['changed'] or changes['retired']
+    data = {
+        'version': 1,
+        'lastUpdated': today if modified else existing.get('lastUpdated', today),
+        'quotes': quotes,
+    }
+    version = format_version or existing_version
+    stale = existing.get('indexes') != build_indexes(quotes)
+    if modified or stale or version != existing_version or not os.path.exists(output_path):
+        save_quotes_json(data, output_path, version)
+        check_written_quotes(output_path)
+
+    changeset = {
+        'version': 1,
+        'quotes': output_path,
+        'date': today,
+        'summary': {
+            'added': len(changes['added']),
+            'changed': len(changes['changed']),
+            'retired': len(changes['retired']),
+            'unchanged': changes['unchanged'],
+        },
+        'added': changes['added'],
+        'changed': changes['changed'],
+        'retired': changes['retired'],
+    }
+    with open(changeset_path_for(output_path), 'w', encoding='utf-8') as f:
+        json.dump(changeset, f, indent=2, ensure_ascii=False)
+        f.write('\n')
+
+    summary = changeset['summary']
+    print(f"🔁 Merged into {output_path}: {summary['added']} added, {summary['changed']} changed, "
+          f"{summary['retired']} retired, {summary['unchanged']} unchanged")
+    print(f"🧾 Changeset: {changeset_path_for(output_path)}")
+    return data
+
+def check_written_quotes(path):
+    """Read an exported file back and stop if its indexes do not match its quotes"""
+    doc, _ = load_quotes_json(path)
+    problems = validate_indexes(doc)
+    if problems:
+        print(f"❌ {path} failed validation: {'; '.join(problems)}")
+        sys.exit(1)
+    indexes = doc['indexes']
+    print(f"🗂️  Indexed {len(indexes['activeIds'])} active quotes, {len(indexes['tags'])} tags, "
+          f"{len(indexes['idsByBookId'])} books")
+
+def parse_merge_arg(argv, default_path=QUOTES_PATH):
+    """Read --merge [QUOTES_JSON] from argv; returns the path to merge into or None"""
+    for i, arg in enumerate(argv):
+        if arg == '--merge':
+            if i + 1 < len(argv) and not argv[i + 1].startswith('--'):
+                return argv[i + 1]
+            return default_path
+    return None
+
+def parse_format_arg(argv):
+    """Read --format-version N from argv; returns 1, 2 or None (the writer's default)"""
+    if '--format-version' not in argv:
+        return None
+    i = argv.index('--format-version')
+    version = int(argv[i + 1]) if i + 1 < len(argv) and argv[i + 1].isdigit() else None
+    if version not in QUOTES_FORMAT_VERSIONS:
+        print(f"Error: --format-version must be one of {QUOTES_FORMAT_VERSIONS}")
+        sys.exit(1)
+    return version
+
+def main():
+    if len(sys.argv) < 3 or sys.argv[1].startswith('--') or sys.argv[2].startswith('--'):
+        print("Usage: python quotes_export.py <input.json> <output.json> [--format-version 1|2]")
+        print("\nConverts a quotes.json between format versions (default: to version 2).")
+        print("\nExample:")
+        print("  python quotes_export.py PageInstead/Resources/quotes.json quotes.v2.json")
+        sys.exit(1)
+
+    input_path, output_path = sys.argv[1], sys.argv[2]
+    format_version = parse_format_arg(sys.argv) or 2
+
+    doc, input_version = load_quotes_json(input_path)
+    save_quotes_json(doc, output_path, format_version)
+
+    # The conversion must be lossless: reading the output gives the same records back
+    converted, _ = load_quotes_json(output_path)
+    if converted['quotes'] != doc['quotes'] or converted['lastUpdated'] != doc['lastUpdated']:
+        print(f"❌ {output_path} does not round-trip to the records in {input_path}")
+        sys.exit(1)
+    check_written_quotes(output_path)
+
+    input_size = os.path.getsize(input_path)
+    output_size = os.path.getsize(output_path)
+    print(f"✅ Converted {len(doc['quotes'])} quotes from version {input_version} to {format_version}")
+    print(f"📦 {input_path}: {input_size / 1024:.1f} KB -> {output_path}: {output_size / 1024:.1f} KB "
+          f"({(output_size - input_size) / input_size * 100:+.1f}%)")
+
+if __name__ == "__main__":
+    main()
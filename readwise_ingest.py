@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+Shared streaming reader for Readwise CSV exports
+Resolves column positions once from the header, then yields compact rows
+"""
+import csv
+import io
+import mmap
+import os
+import sys
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+# Fields every reader yields (missing columns come back as None)
+ROW_FIELDS = ('book_title', 'author', 'highlight', 'asin', 'note', 'location')
+
+ReadwiseRow = namedtuple('ReadwiseRow', ROW_FIELDS)
+
+# Below this size a process pool costs more than it saves
+PARALLEL_MIN_BYTES = 4 * 1024 * 1024
+
+# Candidate column names per field, in priority order
+READWISE_COLUMNS = {
+    'book_title': ['Book Title', 'Title'],
+    'author': ['Book Author', 'Author'],
+    'highlight': ['Highlight', 'Text'],
+    'asin': ['Amazon Book ID', 'ASIN'],
+    'note': ['Note'],
+}
+
+def read_header(csv_path):
+    """Return the column headers of a Readwise CSV"""
+    with open(csv_path, 'r', encoding='utf-8') as f:
+        return next(csv.reader(f), [])
+
+def resolve_columns(header, columns):
+    """Map each field to the header positions of its candidate columns"""
+    # Duplicate headers resolve to the last occurrence (same as csv.DictReader)
+    positions = {name: i for i, name in enumerate(header)}
+
+    plan = []
+    for field in ROW_FIELDS:
+        names = columns.get(field, [])
+        plan.append(tuple(positions[name] for name in names if name in positions))
+
+    return tuple(plan)
+
+def _parse_rows(reader, plan):
+    """Turn raw csv.reader rows into ReadwiseRow records"""
+    width = max((max(p) for p in plan if p), default=-1) + 1
+    make_row = ReadwiseRow._make
+
+    for row in reader:
+        if not row:
+            continue
+
+        # Short rows read as empty for the missing columns
+        if len(row) < width:
+            row += [''] * (width - len(row))
+
+        values = []
+        for indices in plan:
+            value = None
+            for i in indices:
+                if row[i]:
+                    value = row[i].strip()
+                    break
+            values.append(value)
+
+        yield make_row(values)
+
+def iter_rows(csv_path, columns=READWISE_COLUMNS):
+    """Stream ReadwiseRow records from a Readwise CSV
+
+    Each field takes the first non-empty candidate column, stripped.
+    Empty fields are None, matching the old per-row _get_field lookup.
+    """
+    with open(csv_path, 'r', encoding='utf-8') as f:
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if header is None:
+            return
+
+        plan = resolve_columns(header, columns)
+        yield from _parse_rows(reader, plan)
+
+def _count_quotes(data, start, end, block=1 << 24):
+    """Count double quotes in data[start:end] without copying it all at once"""
+    count = 0
+    for pos in range(start, end, block):
+        count += data[pos:min(pos + block, end)].count(b'"')
+    return count
+
+def _next_record_start(data, pos, in_quotes):
+    """Find the first record boundary at or after pos
+
+    in_quotes is the quote parity of everything before pos. A newline is
+    only a record boundary when it sits outside a quoted field.
+    """
+    while True:
+        newline = data.find(b'\n', pos)
+        if newline == -1:
+            return len(data)
+        in_quotes ^= _count_quotes(data, pos, newline) & 1
+        if not in_quotes:
+            return newline + 1
+        pos = newline + 1
+
+def split_byte_ranges(csv_path, parts):
+    """Split a CSV body into quote-aware (start, end) byte ranges
+
+    The first range starts after the header. Boundaries always fall on
+    record starts, so every range can be parsed on its own. Assumes the
+    standard quoting Readwise writes (quotes only around whole fields).
+    """
+    with open(csv_path, 'rb') as f:
+        data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if os.fstat(f.fileno()).st_size else b''
+
+    try:
+        size = len(data)
+        body_start = _next_record_start(data, 0, 0)
+        step = max((size - body_start) // max(parts, 1), 1)
+
+        ranges = []
+        start = body_start
+        in_quotes = 0
+        while start < size:
+            target = min(start + step, size)
+            # Quote parity of [start, target) decides where the record ends
+            in_quotes = _count_quotes(data, start, target) & 1
+            end = _next_record_start(data, target, in_quotes) if target < size else size
+            ranges.append((start, end))
+            start = end
+        return ranges
+    finally:
+        if isinstance(data, mmap.mmap):
+            data.close()
+
+def _group_range(args):
+    """Worker: parse one byte range and group its rows by book title"""
+    csv_path, start, end, columns, keep = args
+
+    plan = resolve_columns(read_header(csv_path), columns)
+    with open(csv_path, 'rb') as f:
+        f.seek(start)
+        chunk = f.read(end - start)
+
+    # Same newline handling as open(csv_path, 'r', encoding='utf-8')
+    text = io.TextIOWrapper(io.BytesIO(chunk), encoding='utf-8')
+
+    groups = {}
+    for row in _parse_rows(csv.reader(text), plan):
+        if keep is not None and not keep(row):
+            continue
+        rows = groups.get(row.book_title)
+        if rows is None:
+            groups[row.book_title] = rows = []
+        rows.append(row)
+    return groups
+
+def group_byte_range(csv_path, start, end, columns=READWISE_COLUMNS, keep=None):
+    """Group the rows of one record-aligned byte range by book title"""
+    return _group_range((csv_path, start, end, columns, keep))
+
+def group_rows(csv_path, columns=READWISE_COLUMNS, keep=None, workers=1):
+    """Group ReadwiseRow records by book title, in file order
+
+    keep is an optional row predicate (a module-level function, so it can
+    be sent to worker processes). With workers > 1 the file is split into
+    quote-aware byte ranges that are parsed in a process pool; merging the
+    per-range groups in range order gives exactly the serial result.
+    """
+    if workers <= 1 or os.path.getsize(csv_path) < PARALLEL_MIN_BYTES:
+        return _group_range_serial(csv_path, columns, keep)
+
+    # A few ranges per worker keeps the pool busy when books cluster
+    ranges = split_byte_ranges(csv_path, workers * 4)
+    tasks = [(csv_path, start, end, columns, keep) for start, end in ranges]
+
+    groups = {}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for partial in pool.map(_group_range, tasks):
+            for title, rows in partial.items():
+                existing = groups.get(title)
+                if existing is None:
+                    groups[title] = rows
+                else:
+                    existing.extend(rows)
+    return groups
+
+def _group_range_serial(csv_path, columns, keep):
+    """Single-process version of the grouping done by _group_range"""
+    groups = {}
+    for row in iter_rows(csv_path, columns):
+        if keep is not None and not keep(row):
+            continue
+        rows = groups.get(row.book_title)
+        if rows is None:
+            groups[row.book_title] = rows = []
+        rows.append(row)
+    return groups
+
+def has_title_and_text(row):
+    """Row predicate: highlight with a book title"""
+    return bool(row.book_title and row.highlight)
+
+def is_kindle_book_row(row):
+    """Row predicate: highlight from a Kindle book (10-char ASIN)"""
+    return bool(row.book_title and row.highlight and row.asin and len(row.asin) == 10)
+
+def parse_workers_arg(argv):
+    """Read --workers N from argv (default 1, 0 means one per CPU)"""
+    for i, arg in enumerate(argv):
+        if arg == '--workers' and i + 1 < len(argv):
+            try:
+                workers = int(argv[i + 1])
+            except ValueError:
+                print("Error: --workers must be followed by a number")
+                sys.exit(1)
+            return workers if workers > 0 else (os.cpu_count() or 1)
+    return 1
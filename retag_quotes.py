@@ -2,62 +2,29 @@
 """
 Re-tag quotes with improved keyword matching
 """
-import json
+from quotes_export import QUOTES_PATH, load_quotes_json, save_quotes_json
+from quote_tagging import TagMatcher, match_tags
+
+# Book-title tag used when neither the quote nor its title match (first match wins)
+BOOK_FALLBACK_TAGS = TagMatcher({
+    'business': ['business', 'ceo', 'company', 'entrepreneur', 'startup'],
+    'leadership': ['lead', 'power', 'strategy'],
+    'wisdom': ['think', 'mind', 'wisdom'],
+})
 
 def extract_better_tags(text, book_title=''):
-    """Extract tags with improved keyword matching"""
-    tags = set()
-    text_lower = text.lower()
-    book_lower = book_title.lower()
-
-    # More comprehensive tag keywords
-    tag_keywords = {
-        'business': ['business', 'company', 'startup', 'entrepreneur', 'market', 'customer', 'product', 'revenue', 'profit'],
-        'leadership': ['lead', 'leader', 'leadership', 'manage', 'manager', 'team', 'organization', 'ceo', 'executive'],
-        'strategy': ['strategy', 'strategic', 'plan', 'goal', 'objective', 'vision', 'mission'],
-        'creativity': ['creative', 'create', 'innovation', 'innovate', 'design', 'invent', 'original'],
-        'success': ['success', 'achieve', 'accomplish', 'win', 'excel', 'performance'],
-        'wisdom': ['wisdom', 'wise', 'knowledge', 'truth', 'understand', 'insight', 'principle'],
-        'life': ['life', 'living', 'alive', 'exist', 'human', 'people'],
-        'learning': ['learn', 'education', 'teach', 'study', 'skill', 'practice', 'training'],
-        'courage': ['courage', 'brave', 'strength', 'bold', 'risk', 'fear'],
-        'discipline': ['discipline', 'focus', 'habit', 'routine', 'consistent', 'commitment'],
-        'inspiration': ['inspire', 'inspiration', 'motivate', 'hope', 'aspire'],
-        'reading': ['read', 'reading', 'book', 'books', 'library', 'page', 'story', 'chapter'],
-        'love': ['love', 'heart', 'soul', 'passion', 'care'],
-        'freedom': ['free', 'freedom', 'liberty', 'independent', 'choice'],
-        'imagination': ['imagine', 'imagination', 'dream', 'vision', 'possibility'],
-        'happiness': ['happy', 'happiness', 'joy', 'delight', 'pleasure'],
-        'power': ['power', 'powerful', 'influence', 'control', 'authority'],
-        'thinking': ['think', 'thought', 'mind', 'idea', 'reflect', 'consider'],
-        'communication': ['communicate', 'speak', 'talk', 'say', 'tell', 'listen', 'conversation'],
-        'decision': ['decide', 'decision', 'choice', 'choose', 'judgment'],
-    }
-
-    # Check quote text
-    for tag, keywords in tag_keywords.items():
-        if any(keyword in text_lower for keyword in keywords):
-            tags.add(tag)
+    """Extract tags from the quote, then its book title, via the shared taxonomy"""
+    tags = match_tags(text)
 
     # Also check book title for context (but weight less)
-    book_tags = set()
-    for tag, keywords in tag_keywords.items():
-        if any(keyword in book_lower for keyword in keywords):
-            book_tags.add(tag)
+    book_tags = match_tags(book_title)
 
     # Combine but prioritize quote content
     all_tags = list(tags) + [t for t in book_tags if t not in tags]
 
     # If still no tags, use book-based fallback
     if not all_tags:
-        if any(word in book_lower for word in ['business', 'ceo', 'company', 'entrepreneur', 'startup']):
-            all_tags = ['business']
-        elif any(word in book_lower for word in ['lead', 'power', 'strategy']):
-            all_tags = ['leadership']
-        elif any(word in book_lower for word in ['think', 'mind', 'wisdom']):
-            all_tags = ['wisdom']
-        else:
-            all_tags = ['inspiration']  # Better fallback than "reading"
+        all_tags = [BOOK_FALLBACK_TAGS.first_match(book_title, 'inspiration')]  # Better fallback than "reading"
 
     return sorted(list(set(all_tags)))[:3]  # Max 3 tags
 
@@ -65,12 +32,10 @@ def retag_all_quotes():
     """Re-tag all quotes in quotes.json"""
 
     # Load current quotes
-    with open('PageInstead/Resources/quotes.json', 'r') as f:
-        data = json.load(f)
+    data, format_version = load_quotes_json(QUOTES_PATH)
 
     # Backup original
-    with open('PageInstead/Resources/quotes.json.before-retag', 'w') as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
+    save_quotes_json(data, QUOTES_PATH + '.before-retag', format_version)
 
     print("📋 Re-tagging quotes...")
     changes = 0
@@ -84,8 +49,7 @@ def retag_all_quotes():
             changes += 1
 
     # Save updated quotes
-    with open('PageInstead/Resources/quotes.json', 'w') as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
+    save_quotes_json(data, QUOTES_PATH, format_version)
 
     print(f"✅ Re-tagged {changes} quotes")
     print(f"📊 Backed up original to: quotes.json.before-retag")
@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Schedule oracle mirroring QuoteScheduler's window rotation
+The app and the shield extension pick the quote for a time from its
+5-minute window of the day and its day of the year:
+
+    window = (hour * 60 + minute) / 5                  (0-287)
+    index  = (window + (dayOfYear * 37) % count) % count
+
+over the active quotes in file order, showing the previous window's
+quote during the first 30 seconds of a window. This reproduces that
+rotation, emits it as a day x window -> quote ID table (366 x 288,
+memory-mappable, so a consumer looks a quote up in O(1)) and checks
+the oracle against reference vectors in schedule_vectors.json. Times
+are local wall-clock datetimes, as Calendar.current sees them
+"""
+import sys
+import json
+import mmap
+import os
+import struct
+import zlib
+from array import array
+from datetime import datetime, timedelta
+from quotes_export import QUOTES_PATH, build_indexes, load_quotes_json
+
+SCHEDULE_PATH = 'PageInstead/Resources/quote_schedule.bin'
+VECTORS_PATH = 'schedule_vectors.json'
+SCHEDULE_MAGIC = b'PISCHEDL'
+SCHEDULE_VERSION = 1
+
+WINDOW_MINUTES = 5
+WINDOWS_PER_DAY = 24 * 60 // WINDOW_MINUTES
+DAYS_PER_YEAR = 366
+DAY_MULTIPLIER = 37
+GRACE_SECONDS = 30
+
+# magic, version, entry width (2 or 4 bytes), days, windows per day, active count, CRC32 of the entries
+HEADER = struct.Struct('<8sHHHHII')
+
+def window_index(moment):
+    """calculateWindowIndex(at:): the 5-minute window of the day"""
+    return (moment.hour * 60 + moment.minute) // WINDOW_MINUTES
+
+def day_of_year(moment):
+    """Calendar.ordinality(of: .day, in: .year): 1 on January 1st"""
+    return moment.timetuple().tm_yday
+
+def quote_index(day, window, count):
+    """Position in the active quotes shown in window of day"""
+    daily_offset = (day * DAY_MULTIPLIER) % count
+    return (window + daily_offset) % count
+
+def quote_index_at(moment, count):
+    """getQuote(at:) as a position in the active quotes"""
+    return quote_index(day_of_year(moment), window_index(moment), count)
+
+def current_quote_index_at(moment, count):
+    """getCurrentQuote(): the previous window's quote during the grace period"""
+    window_start = moment.replace(minute=moment.minute - moment.minute % WINDOW_MINUTES, second=0, microsecond=0)
+    if (moment - window_start).total_seconds() < GRACE_SECONDS:
+        return quote_index_at(moment - timedelta(minutes=WINDOW_MINUTES), count)
+    return quote_index_at(moment, count)
+
+def build_schedule(active_ids):
+    """Row-major day x window table of quote IDs (days 1-366, windows 0-287)"""
+    count = len(active_ids)
+    table = array('I')
+    for day in range(1, DAYS_PER_YEAR + 1):
+        daily_offset = (day * DAY_MULTIPLIER) % count
+        table.extend(active_ids[(window + daily_offset) % count] for window in range(WINDOWS_PER_DAY))
+    return table
+
+def write_schedule(active_ids, path):
+    """Write the schedule table for the active quote IDs; returns its size"""
+    if not active_ids:
+        print("Error: no active quotes to schedule")
+        sys.exit(1)
+    table = build_schedule(active_ids)
+    width = 2 if max(table) < 1 << 16 else 4
+    entries = array('H' if width == 2 else 'I', table)
+    if sys.byteorder != 'little':
+        entries.byteswap()
+    body = entries.tobytes()
+
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(HEADER.pack(SCHEDULE_MAGIC, SCHEDULE_VERSION, width, DAYS_PER_YEAR, WINDOWS_PER_DAY,
+                            len(active_ids), zlib.crc32(body)))
+        f.write(body)
+    os.replace(tmp_path, path)
+    return HEADER.size + len(body)
+
+class ScheduleTable:
+    """Reader for a schedule table: memory-maps it and looks entries up in place"""
+
+    def __init__(self, path, verify=True):
+        with open(path, 'rb') as f:
+            self.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.width, self.days, self.windows, self.active_count, checksum = \
+            HEADER.unpack_from(self.data, 0)
+        problem = None
+        if magic != SCHEDULE_MAGIC or version != SCHEDULE_VERSION:
+            problem = "not a version 1 schedule table"
+        elif len(self.data) != HEADER.size + self.days * self.windows * self.width:
+            problem = "size does not match its header"
+        elif verify and zlib.crc32(self.data[HEADER.size:]) != checksum:
+            problem = "checksum mismatch"
+        if problem:
+            self.data.close()
+            raise ValueError(f"{path}: {problem}")
+        self._entry = '<H' if self.width == 2 else '<I'
+
+    def close(self):
+        self.data.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def quote_id(self, day, window):
+        """Quote ID shown in window (0-287) of day (1-366)"""
+        offset = HEADER.size + ((day - 1) * self.windows + window) * self.width
+        return struct.unpack_from(self._entry, self.data, offset)[0]
+
+    def quote_id_at(self, moment):
+        return self.quote_id(day_of_year(moment), window_index(moment))
+
+def load_vectors(path=VECTORS_PATH):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)['vectors']
+
+def check_vectors(vectors):
+    """Vectors the oracle disagrees with: [(vector, field, got)]"""
+    failures = []
+    for vector in vectors:
+        moment = datetime.fromisoformat(vector['time'])
+        count = vector['activeCount']
+        got = {
+            'dayOfYear': day_of_year(moment),
+            'window': window_index(moment),
+            'quoteIndex': quote_index_at(moment, count),
+            'currentQuoteIndex': current_quote_index_at(moment, count),
+        }
+        for field, value in got.items():
+            if vector[field] != value:
+                failures.append((vector, field, value))
+    return failures
+
+def check_schedule(path, active_ids):
+    """Cells of the table at path that differ from the oracle (0 when in parity)"""
+    count = len(active_ids)
+    mismatches = 0
+    with ScheduleTable(path) as table:
+        if table.active_count != count:
+            return table.days * table.windows
+        for day in range(1, DAYS_PER_YEAR + 1):
+            for window in range(WINDOWS_PER_DAY):
+                if table.quote_id(day, window) != active_ids[quote_index(day, window, count)]:
+                    mismatches += 1
+    return mismatches
+
+def export_schedule(doc, path, vectors_path=VECTORS_PATH):
+    """Check the oracle against the reference vectors, then write and verify the table"""
+    if os.path.exists(vectors_path):
+        vectors = load_vectors(vectors_path)
+        failures = check_vectors(vectors)
+        if failures:
+            for vector, field, value in failures[:10]:
+                print(f"❌ {vector['time']} with {vector['activeCount']} quotes: "
+                      f"{field} {value}, expected {vector[field]}")
+            sys.exit(1)
+        print(f"✅ Oracle matches all {len(vectors)} reference vectors")
+    else:
+        print(f"⚠️  No reference vectors at {vectors_path}, skipping the parity check")
+
+    active_ids = (doc.get('indexes') or build_indexes(doc['quotes']))['activeIds']
+    size = write_schedule(active_ids, path)
+    mismatches = check_schedule(path, active_ids)
+    if mismatches:
+        print(f"❌ {path}: {mismatches} cells differ from the oracle")
+        sys.exit(1)
+    print(f"🗓️  Wrote {path}: {DAYS_PER_YEAR} x {WINDOWS_PER_DAY} schedule of {len(active_ids)} active quotes "
+          f"in {size / 1024:.1f} KB (verified)")
+    return size
+
+def parse_schedule_arg(argv, default_path=SCHEDULE_PATH):
+    """Read --schedule [PATH] from argv; returns the table path or None"""
+    for i, arg in enumerate(argv):
+        if arg == '--schedule':
+            if i + 1 < len(argv) and not argv[i + 1].startswith('--'):
+                return argv[i + 1]
+            return default_path
+    return None
+
+def main():
+    if '--help' in sys.argv:
+        print("Usage: python schedule_oracle.py [quotes.json] [table] [--vectors PATH]")
+        print(f"\nChecks the oracle against {VECTORS_PATH}, then writes the day x window schedule")
+        print(f"table for quotes.json (default: {QUOTES_PATH} -> {SCHEDULE_PATH}) and verifies it.")
+        sys.exit(1)
+
+    args = sys.argv[1:]
+    vectors_path = VECTORS_PATH
+    if '--vectors' in args:
+        i = args.index('--vectors')
+        vectors_path = args[i + 1]
+        del args[i:i + 2]
+    quotes_path = args[0] if args else QUOTES_PATH
+    table_path = args[1] if len(args) > 1 else SCHEDULE_PATH
+
+    doc, _ = load_quotes_json(quotes_path)
+    export_schedule(doc, table_path, vectors_path)
+
+if __name__ == "__main__":
+    main()
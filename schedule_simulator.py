@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Year-long schedule simulator for a quotes.json
+Expands every 5-minute window of a calendar year through QuoteScheduler's
+rotation (see schedule_oracle.py) as one NumPy array, so the daily
+dayOfYear * 37 offset and the jumps at midnight are included, then
+reports what users actually see: gaps in minutes between quotes of the
+same book and of the same author, how soon each quote repeats, how many
+quotes and books a day covers, and the worst cases with their times.
+A year simulates in under 0.1 s, cheap enough to run on every export
+"""
+import sys
+import calendar
+import numpy as np
+from datetime import date, datetime, timedelta
+from quotes_export import QUOTES_PATH, load_quotes_json
+from schedule_oracle import DAY_MULTIPLIER, WINDOW_MINUTES, WINDOWS_PER_DAY
+
+# Repeats closer than this are counted as collisions
+CLOSE_MINUTES = 60
+WORST_CASES = 5
+
+def expand_year(count, days):
+    """Active-quote position shown in every window of the year, in time order"""
+    day = np.arange(1, days + 1, dtype=np.int64)[:, None]
+    window = np.arange(WINDOWS_PER_DAY, dtype=np.int64)[None, :]
+    return ((window + (day * DAY_MULTIPLIER) % count) % count).ravel()
+
+def repeat_gaps(keys):
+    """(gaps, windows, keys) for each appearance of a key after its previous one
+
+    gaps are in windows; windows is when the repeat is shown. A stable
+    sort by key keeps each key's appearances in time order.
+    """
+    order = np.argsort(keys, kind='stable')
+    sorted_keys = keys[order]
+    same = sorted_keys[1:] == sorted_keys[:-1]
+    return (order[1:] - order[:-1])[same], order[1:][same], sorted_keys[1:][same]
+
+def gap_stats(gaps):
+    """Summary of repeat gaps, in minutes"""
+    if not gaps.size:
+        return None
+    minutes = gaps * WINDOW_MINUTES
+    return {
+        'min': int(minutes.min()),
+        'p5': float(np.percentile(minutes, 5)),
+        'median': float(np.median(minutes)),
+        'close': int((minutes < CLOSE_MINUTES).sum()),
+        'repeats': int(minutes.size),
+    }
+
+def worst_cases(gaps, windows, keys, names, year, limit=WORST_CASES):
+    """The closest repeats: [(minutes, time shown, name)]"""
+    start = datetime(year, 1, 1)
+    worst = []
+    for i in np.argsort(gaps, kind='stable')[:limit]:
+        shown = start + timedelta(minutes=int(windows[i]) * WINDOW_MINUTES)
+        worst.append((int(gaps[i]) * WINDOW_MINUTES, shown, names[keys[i]]))
+    return worst
+
+def simulate_year(quotes, year):
+    """Simulate QuoteScheduler over year for quotes (version 1 records, file order)"""
+    active = [quote for quote in quotes if quote['isActive']]
+    count = len(active)
+    if not count:
+        return None
+    days = 366 if calendar.isleap(year) else 365
+
+    positions = expand_year(count, days)
+    book_names, book_of = np.unique([f"{q['bookTitle']} ({q['author']})" for q in active], return_inverse=True)
+    author_names, author_of = np.unique([q['author'] for q in active], return_inverse=True)
+    quote_names = [f"#{q['id']} {q['bookTitle']}" for q in active]
+    books = book_of[positions]
+    authors = author_of[positions]
+
+    report = {'year': year, 'days': days, 'active': count, 'books': len(book_names), 'authors': len(author_names)}
+    for name, keys, names in (('book', books, book_names), ('author', authors, author_names),
+                              ('quote', positions, quote_names)):
+        gaps, windows, repeated = repeat_gaps(keys)
+        report[name] = gap_stats(gaps)
+        report[name + '_worst'] = worst_cases(gaps, windows, repeated, names, year)
+
+    # Shortest repeat per quote (the loop's last gaps), and how often each is shown
+    no_repeat = np.iinfo(np.int64).max
+    shortest = np.full(count, no_repeat)
+    np.minimum.at(shortest, repeated, gaps)
+    shortest = shortest[shortest != no_repeat]
+    report['quote_shortest_median'] = float(np.median(shortest)) * WINDOW_MINUTES if shortest.size else None
+    shown = np.bincount(positions, minlength=count)
+    report['shown_min'] = int(shown.min())
+    report['shown_max'] = int(shown.max())
+    report['never_shown'] = [quote_names[i] for i in np.flatnonzero(shown == 0)]
+
+    # Coverage per day: distinct quotes and books among the day's windows
+    day_of = np.repeat(np.arange(days), WINDOWS_PER_DAY)
+    seen_quotes = np.zeros((days, count), dtype=bool)
+    seen_quotes[day_of, positions] = True
+    seen_books = np.zeros((days, len(book_names)), dtype=bool)
+    seen_books[day_of, books] = True
+    quotes_per_day = seen_quotes.sum(axis=1)
+    books_per_day = seen_books.sum(axis=1)
+    report['quotes_per_day'] = (int(quotes_per_day.min()), float(quotes_per_day.mean()))
+    report['books_per_day'] = (int(books_per_day.min()), float(books_per_day.mean()))
+    report['fewest_books_day'] = date(year, 1, 1) + timedelta(days=int(books_per_day.argmin()))
+    return report
+
+def simulate_and_summarize(quotes):
+    """Simulate the current year for quotes and print the one-line digest"""
+    print_summary(simulate_year(quotes, datetime.now().year))
+
+def print_summary(report):
+    """One-line digest for exports"""
+    if report is None:
+        print("⚠️  No active quotes to simulate")
+        return
+    book, author = report['book'], report['author']
+    parts = [f"🗓️  {report['year']} simulation:"]
+    if book:
+        parts.append(f"same book ≥ {book['min']} min apart ({book['close']} within {CLOSE_MINUTES} min)")
+    if author:
+        parts.append(f"same author ≥ {author['min']} min ({author['close']} within {CLOSE_MINUTES} min)")
+    if report['quote']:
+        parts.append(f"quotes repeat after ≥ {report['quote']['min']} min")
+    parts.append(f"{report['books_per_day'][0]}+ books a day")
+    print(parts[0] + ' ' + ', '.join(parts[1:]))
+
+def print_report(report):
+    if report is None:
+        print("⚠️  No active quotes to simulate")
+        return
+
+    print(f"\n🗓️  SCHEDULE SIMULATION {report['year']} ({report['days']} days x {WINDOWS_PER_DAY} windows)")
+    print(f"  {report['active']} active quotes from {report['books']} books by {report['authors']} authors")
+
+    for name, label in (('book', 'Same book'), ('author', 'Same author'), ('quote', 'Same quote')):
+        stats = report[name]
+        if stats is None:
+            print(f"\n  {label}: never repeats")
+            continue
+        print(f"\n  {label}: {stats['repeats']:,} repeats, min {stats['min']} min, "
+              f"5th percentile {stats['p5']:.0f} min, median {stats['median']:.0f} min")
+        print(f"    within {CLOSE_MINUTES} min: {stats['close']:,}")
+        for minutes, shown, what in report[name + '_worst']:
+            print(f"    {minutes:5} min  {shown:%b %d %H:%M}  {what}")
+
+    if report['quote_shortest_median'] is not None:
+        print(f"\n  Shortest repeat per quote: median {report['quote_shortest_median']:.0f} min")
+    print(f"  Times each quote is shown: {report['shown_min']} - {report['shown_max']}")
+    if report['never_shown']:
+        print(f"  ⚠️  {len(report['never_shown'])} quotes are never shown: {', '.join(report['never_shown'][:5])}")
+
+    print(f"\n  Quotes per day: min {report['quotes_per_day'][0]}, mean {report['quotes_per_day'][1]:.1f}")
+    print(f"  Books per day: min {report['books_per_day'][0]} (on {report['fewest_books_day']:%b %d}), "
+          f"mean {report['books_per_day'][1]:.1f}")
+
+def main():
+    if '--help' in sys.argv:
+        print("Usage: python schedule_simulator.py [quotes.json] [--year N]")
+        print(f"\nSimulates a year of the app's quote rotation for quotes.json (default: {QUOTES_PATH}).")
+        sys.exit(1)
+
+    args = sys.argv[1:]
+    year = datetime.now().year
+    if '--year' in args:
+        i = args.index('--year')
+        year = int(args[i + 1])
+        del args[i:i + 2]
+    quotes_path = args[0] if args else QUOTES_PATH
+
+    doc, _ = load_quotes_json(quotes_path)
+    print_report(simulate_year(doc['quotes'], year))
+
+if __name__ == "__main__":
+    main()
@@ -2,12 +2,11 @@
 """
 Search your curated quotes
 """
-import json
 import sys
+from quotes_export import QUOTES_PATH, load_quotes_json
 
 def search_quotes(query):
-    with open('PageInstead/Resources/quotes.json', 'r') as f:
-        data = json.load(f)
+    data, _ = load_quotes_json(QUOTES_PATH)
 
     query_lower = query.lower()
     matches = []
@@ -3,9 +3,9 @@
 Shuffle quotes to ensure quotes from the same book are spread out
 Uses intelligent shuffling to maximize distance between same-book quotes
 """
-import json
 import random
 from collections import defaultdict
+from quotes_export import QUOTES_PATH, load_quotes_json, save_quotes_json
 
 def shuffle_quotes_intelligently(quotes):
     """Shuffle quotes ensuring same-book quotes are maximally separated"""
@@ -61,24 +61,20 @@ def shuffle_quotes_intelligently(quotes):
         print(f"  Average distance: {sum(distances) / len(distances):.1f} positions")
         print(f"  → Same-book quotes separated by {min(distances) * 5} - {max(distances) * 5} minutes")
 
-    # Re-assign IDs
-    for i, q in enumerate(shuffled, start=1):
-        q['id'] = i
-
+    # IDs come from the ID registry and stay with their quotes
     return shuffled
 
 def main():
     import sys
 
     if len(sys.argv) < 2:
-        input_file = 'PageInstead/Resources/quotes.json'
+        input_file = QUOTES_PATH
     else:
         input_file = sys.argv[1]
 
     print(f"📖 Loading {input_file}...")
 
-    with open(input_file, 'r', encoding='utf-8') as f:
-        data = json.load(f)
+    data, format_version = load_quotes_json(input_file)
 
     original_quotes = data['quotes']
 
@@ -102,11 +98,18 @@ def main():
 
     # Save
     output_file = input_file
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
+    save_quotes_json(data, output_file, format_version)
 
     print(f"\n✅ Saved shuffled quotes to {output_file}")
 
+    # What the app's rotation makes of this order over a year (see schedule_simulator.py)
+    try:
+        from schedule_simulator import simulate_and_summarize
+    except ImportError:
+        print("⚠️  NumPy is not installed, skipping the schedule simulation")
+    else:
+        simulate_and_summarize(shuffled_quotes)
+
     # Show examples
     print(f"\n📝 SAMPLE SHUFFLED ORDER (first 10):")
     for i, q in enumerate(shuffled_quotes[:10], 1):
@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+Make-like cache of pipeline stage outputs
+Each stage's output is pickled under a hash of its upstream stage's key,
+its configuration and the source of the modules it runs, so a rerun
+only recomputes stages whose inputs, settings or code changed. Outputs
+are loaded lazily: a cached stage never needs its upstream stages
+"""
+import ast
+import hashlib
+import importlib.util
+import json
+import os
+import pickle
+import re
+import time
+from contextlib import contextmanager
+
+CACHE_DIR = '.pipeline_cache'
+CACHE_VERSION = 1
+
+# Outputs kept per stage, so switching between a few settings stays cached
+KEEP_PER_STAGE = 3
+
+def file_digest(path):
+    """Content hash of a file"""
+    hasher = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+def local_imports(path):
+    """Paths of the sibling modules a source file imports at module level
+
+    Imports inside functions belong to optional paths (a --model or
+    --dedupe run); stages taking those paths list the modules themselves.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    with open(path, 'rb') as f:
+        tree = ast.parse(f.read(), path)
+    names = set()
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            names.update(alias.name.split('.')[0] for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            names.add(node.module.split('.')[0])
+    paths = (os.path.join(directory, name + '.py') for name in names)
+    return {path for path in paths if os.path.exists(path)}
+
+def module_path(module):
+    """Source file of a module, or of a module name without importing it"""
+    if isinstance(module, str):
+        return os.path.abspath(importlib.util.find_spec(module).origin)
+    return os.path.abspath(module.__file__)
+
+def source_files(modules, scripts=()):
+    """Source files of modules and, transitively, of the local modules they import
+
+    scripts are included without following their imports (a pipeline
+    script imports the code of every stage).
+    """
+    pending = [module_path(module) for module in modules]
+    seen = {os.path.abspath(script.__file__) for script in scripts}
+    while pending:
+        path = pending.pop()
+        if path not in seen:
+            seen.add(path)
+            pending.extend(local_imports(path) - seen)
+    return sorted(seen)
+
+def source_digest(modules, scripts=()):
+    """Hash of the code modules run, including the local modules they import
+
+    Any edit to a rule, helper or record module a stage reaches changes it.
+    """
+    hasher = hashlib.sha1()
+    for path in source_files(modules, scripts):
+        hasher.update(os.path.basename(path).encode('utf-8') + b'\x00')
+        with open(path, 'rb') as f:
+            hasher.update(f.read())
+    return hasher.hexdigest()
+
+class Stage:
+    """One pipeline step: run(upstream_output) -> output
+
+    config holds every setting that changes the output and modules those
+    whose code the step runs; the local modules they import are followed,
+    so listing the entry points is enough. Modules needing an optional
+    dependency (NumPy) are listed by name and hashed without importing
+    them. scripts (e.g. the pipeline file defining the step) are hashed
+    without following their imports. Outputs that are not reproducible (e.g. an unseeded shuffle) are
+    marked cacheable=False and always rerun.
+    """
+
+    def __init__(self, name, run, config=None, modules=(), cacheable=True, scripts=()):
+        self.name = name
+        self.run = run
+        self.config = config or {}
+        self.modules = modules
+        self.cacheable = cacheable
+        self.scripts = scripts
+
+class StageTimer:
+    """Wall time of each named pipeline stage, in run order"""
+
+    def __init__(self):
+        self.timings = []
+
+    @contextmanager
+    def stage(self, name, status='run'):
+        if status == 'run':
+            print(f"\n▶️  {name}")
+        start = time.perf_counter()
+        yield
+        self.timings.append((name, time.perf_counter() - start, status))
+
+    def report(self):
+        total = sum(seconds for _, seconds, _ in self.timings)
+        print("\n⏱️  STAGE TIMINGS:")
+        for name, seconds, status in self.timings:
+            share = seconds / total * 100 if total else 0
+            note = '  (cached)' if status == 'cached' else ''
+            print(f"  {name:15} {seconds * 1000:8.0f} ms  {share:5.1f}%{note}")
+        print(f"  {'total':15} {total * 1000:8.0f} ms")
+
+class StagePipeline:
+    """A linear chain of stages fed by one input, with cached outputs
+
+    input_key identifies the input (e.g. the export's file_digest). With
+    cache_dir None nothing is read or written.
+    """
+
+    def __init__(self, stages, input_key, cache_dir=CACHE_DIR, timer=None):
+        self.stages = stages
+        self.index = {stage.name: i for i, stage in enumerate(stages)}
+        self.cache_dir = cache_dir
+        self.timer = timer or StageTimer()
+        self._outputs = {}
+
+        # Keys chain: a stage's key covers everything upstream of it
+        self.components = []
+        self.keys = []
+        upstream = f'input:{input_key}'
+        for stage in stages:
+            if upstream is None or not stage.cacheable:
+                components = None
+                key = None
+            else:
+                components = {
+                    'upstream': upstream,
+                    'config': json.loads(json.dumps(stage.config, sort_keys=True, default=str)),
+                    'code': source_digest(stage.modules, stage.scripts),
+                }
+                key = hashlib.sha1(
+                    json.dumps([CACHE_VERSION, stage.name, components], sort_keys=True).encode('utf-8')
+                ).hexdigest()
+            self.components.append(components)
+            self.keys.append(key)
+            upstream = key
+
+    def _path(self, i):
+        return os.path.join(self.cache_dir, f"{_slug(self.stages[i].name)}-{self.keys[i]}.pickle")
+
+    def _manifest_path(self, i):
+        return os.path.join(self.cache_dir, f"{_slug(self.stages[i].name)}.json")
+
+    def is_cached(self, i):
+        return self.cache_dir is not None and self.keys[i] is not None and os.path.exists(self._path(i))
+
+    def output(self, name):
+        """The named stage's output: cached, or run on its upstream output"""
+        return self._output(self.index[name])
+
+    def _output(self, i):
+        if i in self._outputs:
+            return self._outputs[i]
+
+        stage = self.stages[i]
+        if self.is_cached(i):
+            with self.timer.stage(stage.name, 'cached'):
+                with open(self._path(i), 'rb') as f:
+                    value = pickle.load(f)
+        else:
+            upstream = self._output(i - 1) if i > 0 else None
+            with self.timer.stage(stage.name):
+                value = stage.run(upstream)
+            if self.cache_dir is not None and self.keys[i] is not None:
+                self._store(i, value)
+
+        self._outputs[i] = value
+        return value
+
+    def _store(self, i, value):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self._path(i)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+        with open(self._manifest_path(i), 'w') as f:
+            json.dump({'key': self.keys[i], 'components': self.components[i]}, f, indent=2)
+        self._prune(i)
+
+    def _prune(self, i):
+        prefix = _slug(self.stages[i].name) + '-'
+        entries = [
+            os.path.join(self.cache_dir, name) for name in os.listdir(self.cache_dir)
+            if name.startswith(prefix) and name.endswith('.pickle')
+        ]
+        entries.sort(key=os.path.getmtime, reverse=True)
+        for path in entries[KEEP_PER_STAGE:]:
+            os.remove(path)
+
+    def plan(self, wanted=None):
+        """[(stage name, status, reason)] for producing the wanted stages
+
+        wanted defaults to the last stage. Status is 'cached', 'run' or
+        'not needed' (only upstream of a cached stage).
+        """
+        wanted = [self.index[name] for name in wanted] if wanted else [len(self.stages) - 1]
+        needed = set()
+        for i in wanted:
+            while i >= 0 and i not in needed:
+                needed.add(i)
+                if self.is_cached(i):
+                    break
+                i -= 1
+
+        rows = []
+        for i, stage in enumerate(self.stages):
+            if i not in needed:
+                rows.append((stage.name, 'not needed', ''))
+            elif self.is_cached(i):
+                rows.append((stage.name, 'cached', self.keys[i][:12]))
+            else:
+                rows.append((stage.name, 'run', self._reason(i)))
+        return rows
+
+    def _reason(self, i):
+        if not self.stages[i].cacheable:
+            return 'output is not reproducible (not cached)'
+        if self.keys[i] is None:
+            return 'upstream output is not cached'
+        if self.cache_dir is None:
+            return 'stage cache disabled'
+        try:
+            with open(self._manifest_path(i), 'r') as f:
+                last = json.load(f)['components']
+        except (OSError, ValueError, KeyError):
+            return 'never cached'
+
+        current = self.components[i]
+        reasons = []
+        if last.get('code') != current['code']:
+            reasons.append('code changed')
+        if last.get('config') != current['config']:
+            changed = sorted(
+                name for name in set(last.get('config', {})) | set(current['config'])
+                if last.get('config', {}).get(name) != current['config'].get(name)
+            )
+            reasons.append('config changed: ' + ', '.join(changed))
+        if last.get('upstream') != current['upstream']:
+            reasons.append('input changed' if i == 0 else 'upstream changed')
+        return '; '.join(reasons) or 'cached output was pruned'
+
+def _slug(name):
+    return re.sub(r'\W+', '_', name).strip('_')
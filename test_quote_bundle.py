@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Round-trip test of the binary quote bundle against the shipped quotes.json
+Writes the app's quotes to a temporary bundle, reads every quote back
+through QuoteBundle (by position, by ID and through the active rotation)
+and checks that damaged files are refused. Run from the repository root:
+python -m unittest test_quote_bundle
+"""
+import os
+import shutil
+import tempfile
+import unittest
+from quotes_export import QUOTES_PATH, load_quotes_json
+from quote_bundle import BUNDLE_MAGIC, CHECKSUM_OFFSET, DATA_START, BundleError, QuoteBundle, verify_bundle, write_bundle
+
+class QuoteBundleRoundTrip(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.doc, _ = load_quotes_json(QUOTES_PATH)
+        cls.directory = tempfile.mkdtemp()
+        cls.path = os.path.join(cls.directory, 'quotes.bin')
+        write_bundle(cls.doc, cls.path)
+        with open(cls.path, 'rb') as f:
+            cls.data = f.read()
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.directory)
+
+    def damaged(self, offset, value):
+        """Path of a copy of the bundle with one byte replaced"""
+        data = bytearray(self.data)
+        data[offset] = value
+        path = os.path.join(self.directory, f'damaged_{offset}.bin')
+        with open(path, 'wb') as f:
+            f.write(data)
+        return path
+
+    def test_every_quote(self):
+        with QuoteBundle(self.path) as bundle:
+            self.assertEqual(len(bundle), len(self.doc['quotes']))
+            self.assertEqual(bundle.last_updated, self.doc['lastUpdated'])
+            for position, quote in enumerate(self.doc['quotes']):
+                self.assertEqual(bundle.quote(position), quote)
+            with self.assertRaises(IndexError):
+                bundle.quote(len(bundle))
+
+    def test_lookup_by_id(self):
+        with QuoteBundle(self.path) as bundle:
+            for quote in self.doc['quotes']:
+                self.assertEqual(bundle.quote_by_id(quote['id']), quote)
+            self.assertIsNone(bundle.quote_by_id(max(q['id'] for q in self.doc['quotes']) + 1))
+            self.assertIsNone(bundle.quote_by_id(0))
+
+    def test_active_rotation(self):
+        active = [quote for quote in self.doc['quotes'] if quote['isActive']]
+        with QuoteBundle(self.path) as bundle:
+            self.assertEqual(bundle.active_count, len(active))
+            self.assertEqual([bundle.active_quote(n) for n in range(bundle.active_count)], active)
+            with self.assertRaises(IndexError):
+                bundle.active_quote(bundle.active_count)
+
+    def test_active_rotation_skips_retired(self):
+        # Every shipped quote is active; retire every third one
+        quotes = [dict(quote, isActive=quote['isActive'] and i % 3 != 0) for i, quote in enumerate(self.doc['quotes'])]
+        doc = dict(self.doc, quotes=quotes)
+        path = os.path.join(self.directory, 'retired.bin')
+        write_bundle(doc, path)
+        with QuoteBundle(path) as bundle:
+            self.assertEqual([bundle.active_quote(n) for n in range(bundle.active_count)],
+                             [quote for quote in quotes if quote['isActive']])
+            self.assertEqual(bundle.quote_by_id(quotes[0]['id']), quotes[0])
+        self.assertEqual(verify_bundle(doc, path), [])
+
+    def test_verify_bundle(self):
+        self.assertEqual(verify_bundle(self.doc, self.path), [])
+
+    def test_corrupted_magic(self):
+        path = self.damaged(0, BUNDLE_MAGIC[0] ^ 0xFF)
+        with self.assertRaisesRegex(BundleError, 'not a quote bundle'):
+            QuoteBundle(path)
+
+    def test_corrupted_version(self):
+        path = self.damaged(len(BUNDLE_MAGIC), self.data[len(BUNDLE_MAGIC)] + 1)
+        with self.assertRaisesRegex(BundleError, 'version'):
+            QuoteBundle(path)
+
+    def test_corrupted_checksum(self):
+        path = self.damaged(CHECKSUM_OFFSET, self.data[CHECKSUM_OFFSET] ^ 0xFF)
+        with self.assertRaisesRegex(BundleError, 'checksum'):
+            QuoteBundle(path)
+
+    def test_corrupted_body(self):
+        path = self.damaged(len(self.data) - 1, self.data[-1] ^ 0xFF)
+        with self.assertRaisesRegex(BundleError, 'checksum'):
+            QuoteBundle(path)
+        # Without verification the damaged file still opens
+        QuoteBundle(path, verify=False).close()
+
+    def test_truncated(self):
+        path = os.path.join(self.directory, 'truncated.bin')
+        with open(path, 'wb') as f:
+            f.write(self.data[:DATA_START - 1])
+        with self.assertRaises(BundleError):
+            QuoteBundle(path)
+
+if __name__ == '__main__':
+    unittest.main()
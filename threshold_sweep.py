@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+Threshold sweep - compare many filter/score configurations in one pass
+Highlights are loaded and their features (and every curator filter rule)
+extracted once; each configuration's length window, filters, weights and
+per-book top K are then applied as array operations, reporting kept
+counts, the filter funnel and the selected quotes of every configuration.
+Books follow RealQuoteCurator, whose run the first default configuration
+reproduces exactly; the second reproduces QuoteCurator's on the books
+that curator keeps
+"""
+import sys
+import json
+import time
+import numpy as np
+from readwise_ingest import group_rows, is_kindle_book_row
+from highlight_records import BookRegistry, Highlight
+from batch_scoring import FeatureArrays, QUOTE_WEIGHTS, REALNESS_WEIGHTS, quote_scores, realness_scores
+from curate_real_quotes import RealQuoteCurator
+from curate_kindle_quotes import QuoteCurator
+
+# Filter rules a configuration can apply, in funnel order
+FILTERS = ['chapter_heading', 'poor_quality', 'not_quote']
+
+SCORERS = {
+    'realness': (realness_scores, REALNESS_WEIGHTS),
+    'quote': (quote_scores, QUOTE_WEIGHTS),
+}
+
+# How equal scores are ordered: RealQuoteCurator's realness_rank_key or
+# QuoteCurator's score_rank_key
+TIES = ['shortest', 'earliest']
+
+# RealQuoteCurator and QuoteCurator with their own rules, and the real
+# rules over ShortQuoteCurator's window: its own quality filter and
+# shortest-first ranking have no configuration equivalent
+DEFAULT_CONFIGS = [
+    {'name': 'real 25-250', 'min_length': 25, 'max_length': 250},
+    {'name': 'kindle 40-500', 'min_length': 40, 'max_length': 500,
+     'filters': ['not_quote'], 'scorer': 'quote', 'top_k': 10, 'ties': 'earliest'},
+    {'name': 'real rules @ 20-300', 'min_length': 20, 'max_length': 300},
+]
+
+DEFAULT_CONFIG = {
+    'min_length': 25,
+    'max_length': 250,
+    'filters': ['chapter_heading', 'poor_quality'],
+    'scorer': 'realness',
+    'weights': {},
+    'top_k': 6,
+    'ties': 'shortest',
+}
+
+def filter_rules():
+    """Feature rules of the curators, keyed by FILTERS name"""
+    real = RealQuoteCurator(None)
+    kindle = QuoteCurator(None)
+    return {
+        'chapter_heading': real._is_chapter_heading,
+        'poor_quality': real._is_poor_quality,
+        'not_quote': kindle._is_likely_not_quote,
+    }
+
+def resolve_config(config, position):
+    """A configuration with defaults filled in; exits on unknown values"""
+    resolved = dict(DEFAULT_CONFIG, name=f'config {position + 1}')
+    resolved.update(config)
+
+    unknown = [name for name in resolved['filters'] if name not in FILTERS]
+    if unknown:
+        print(f"Error: unknown filters {unknown} (choose from {', '.join(FILTERS)})")
+        sys.exit(1)
+    if resolved['scorer'] not in SCORERS:
+        print(f"Error: unknown scorer '{resolved['scorer']}' (choose from {', '.join(SCORERS)})")
+        sys.exit(1)
+
+    if resolved['ties'] not in TIES:
+        print(f"Error: unknown ties '{resolved['ties']}' (choose from {', '.join(TIES)})")
+        sys.exit(1)
+
+    base_weights = SCORERS[resolved['scorer']][1]
+    unknown = [name for name in resolved['weights'] if name not in base_weights]
+    if unknown:
+        print(f"Error: unknown {resolved['scorer']} weights {unknown}")
+        sys.exit(1)
+    resolved['weights'] = dict(base_weights, **resolved['weights'])
+    return resolved
+
+def load_configs(path):
+    """Configurations from a JSON list (or {"configs": [...]}) file"""
+    with open(path, 'r') as f:
+        data = json.load(f)
+    if isinstance(data, dict):
+        data = data['configs']
+    return data
+
+def top_k_per_book(book_ids, scores, lengths, kept, k, ties='shortest'):
+    """Indices of each book's top k kept highlights, grouped by book
+
+    Same order as the curators' TopK: highest score, then (ties
+    'shortest', as RealQuoteCurator) shortest, then earliest.
+    """
+    candidates = np.flatnonzero(kept)
+    keys = (candidates, lengths[candidates]) if ties == 'shortest' else (candidates,)
+    order = candidates[np.lexsort(keys + (-scores[candidates], book_ids[candidates]))]
+    if not len(order):
+        return order
+
+    books = book_ids[order]
+    positions = np.arange(len(order))
+    group_starts = np.maximum.accumulate(np.where(np.r_[True, books[1:] != books[:-1]], positions, 0))
+    return order[positions - group_starts < k]
+
+def run_config(arrays, book_ids, config):
+    """Apply one configuration; returns (funnel, scores, selected indices)"""
+    funnel = {'total_highlights': arrays.size}
+    length = arrays.length
+
+    remaining = np.ones(arrays.size, dtype=bool)
+    too_short = length < config['min_length']
+    funnel['filtered_too_short'] = int(too_short.sum())
+    remaining &= ~too_short
+    too_long = remaining & (length > config['max_length'])
+    funnel['filtered_too_long'] = int(too_long.sum())
+    remaining &= ~too_long
+
+    for name in FILTERS:
+        if name in config['filters']:
+            hit = remaining & (getattr(arrays, name) == 1)
+            funnel[f'filtered_{name}'] = int(hit.sum())
+            remaining &= ~hit
+    funnel['kept'] = int(remaining.sum())
+
+    scorer = SCORERS[config['scorer']][0]
+    scores = scorer(arrays, config['weights'])
+    selected = top_k_per_book(book_ids, scores, length, remaining, config['top_k'], config['ties'])
+    return funnel, scores, selected
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage: python threshold_sweep.py <readwise_csv> [--config SWEEP_JSON] [--output RESULTS_JSON]")
+        print("\nEvaluates many filter/score configurations over one feature pass.")
+        print("  --config   JSON list of configurations (default: the real and kindle curators,")
+        print("             and the real rules over the short curator's 20-300 window)")
+        print(f"             keys: name, min_length, max_length, filters ({', '.join(FILTERS)}),")
+        print(f"             scorer ({', '.join(SCORERS)}), weights, top_k, ties ({', '.join(TIES)})")
+        print("  --output   Where to write each configuration's funnel and selected quotes")
+        sys.exit(1)
+
+    csv_path = sys.argv[1]
+    configs = DEFAULT_CONFIGS
+    if '--config' in sys.argv:
+        configs = load_configs(sys.argv[sys.argv.index('--config') + 1])
+    configs = [resolve_config(config, i) for i, config in enumerate(configs)]
+    output_path = 'sweep_results.json'
+    if '--output' in sys.argv:
+        output_path = sys.argv[sys.argv.index('--output') + 1]
+
+    print("📖 Loading Readwise CSV...")
+    registry = BookRegistry()
+    titles = []
+    highlights = []
+    book_ids = []
+    for title, rows in group_rows(csv_path, keep=is_kindle_book_row).items():
+        if len(rows) < 5:
+            continue
+        for _, author, highlight, asin, note, _ in rows:
+            highlights.append(Highlight(registry.get(title, author, asin), highlight, note))
+            book_ids.append(len(titles))
+        titles.append(title)
+    book_ids = np.array(book_ids, dtype=np.int64)
+    print(f"✅ Loaded {len(highlights):,} highlights from {len(titles)} books with 5+ highlights")
+
+    start = time.perf_counter()
+    arrays = FeatureArrays(highlights, flags=filter_rules())
+    print(f"\n🧮 Extracted features once in {time.perf_counter() - start:.1f}s")
+
+    print(f"\n🔍 Sweeping {len(configs)} configurations...")
+    start = time.perf_counter()
+    results = []
+    baseline = None
+    for config in configs:
+        funnel, scores, selected = run_config(arrays, book_ids, config)
+
+        books = {}
+        for index in selected.tolist():
+            books.setdefault(titles[book_ids[index]], []).append(
+                {'text': highlights[index].text, 'score': int(scores[index])}
+            )
+        selected_set = set(selected.tolist())
+        if baseline is None:
+            baseline = selected_set
+
+        results.append({
+            'config': config,
+            'funnel': funnel,
+            'selected': len(selected_set),
+            'shared_with_first': len(selected_set & baseline),
+            'books': books,
+        })
+    print(f"✅ Swept in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    for result in results:
+        config = result['config']
+        funnel = result['funnel']
+        print(f"\n📊 {config['name']} ({config['min_length']}-{config['max_length']} chars, "
+              f"{config['scorer']} score, top {config['top_k']})")
+        for key, value in funnel.items():
+            if key.startswith('filtered_'):
+                print(f"  ❌ {key.replace('filtered_', '').replace('_', ' ').capitalize()}: {value}")
+        print(f"  ✅ Kept: {funnel['kept']}")
+        print(f"  📚 Selected {result['selected']} quotes in {len(result['books'])} books "
+              f"({result['shared_with_first']} shared with '{results[0]['config']['name']}')")
+
+    with open(output_path, 'w') as f:
+        json.dump({'configs': results}, f, indent=2, ensure_ascii=False)
+    print(f"\n💾 Wrote {output_path}")
+
+if __name__ == "__main__":
+    main()